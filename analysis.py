@@ -2,8 +2,8 @@
 """
 analysis.py - Differential uplift analysis for Axial Seamount
 
-Loads BPR data from MJ03E and MJ03F, computes differential uplift,
-and generates figures.
+Loads BPR data from MJ03E and MJ03F (or any stations in stations.py),
+computes differential uplift, and generates figures.
 
 Depth Source:
     Uses OOI's 'botsflu_meandepth' variable from the NetCDF files, which provides
@@ -28,33 +28,140 @@ Instrument Drift:
     Any differential drift between sensors would appear as a spurious trend.
     This analysis does not apply drift corrections; users should validate
     long-term trends against campaign pressure measurements when available.
+    trends.py fits segment rates and per-deployment offsets to the exported
+    products.
 
 Usage:
-    uv run python analysis.py
+    uv run python analysis.py [--workers N] [--no-cache] [--incremental] [--raw-qc] [--no-catalog]
+                              [--from-store] [--profile {cprofile,pyinstrument}]
+                              [--pairs REFERENCE:TARGET ...] [--overlap {newer,average}]
+                              [--skip-gaps] [--lean] [--partition-years] [--no-plots]
+    uv run python analysis.py convert [--workers N]
+    uv run python analysis.py plot [--workers N]
+    uv run python analysis.py pyramid [--from-store]
 """
 
+import argparse
+import contextlib
+import cProfile
+import hashlib
+import inspect
+import json
+import os
+import pstats
 import re
+import resource
+import shutil
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
-import xarray as xr
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numpy.lib.stride_tricks import sliding_window_view
 
-# Data paths
-MJ03E_PATH = Path("/home/jovyan/ooi/kdata/RS03ECAL-MJ03E-06-BOTPTA302-streamed-botpt_nano_sample_15s")
-MJ03F_PATH = Path("/home/jovyan/ooi/kdata/RS03CCAL-MJ03F-05-BOTPTA301-streamed-botpt_nano_sample_15s")
+# netCDF4 and matplotlib are imported where they are used, so commands that only
+# read the Parquet products start quickly
 
-# Output directories
-OUTPUT_DIR = Path("/home/jovyan/repos/specKitScience/my-analysis_botpt/outputs")
+import config
+from stations import STATIONS, DIFFERENTIAL_PAIRS, depth_column, differential_column, station_path
+
+# Data paths (other stations: see stations.py)
+MJ03E_PATH = station_path("MJ03E")
+MJ03F_PATH = station_path("MJ03F")
+
+# Output directories ([paths] output_dir in botpt.toml)
+OUTPUT_DIR = config.OUTPUT_DIR
 DATA_DIR = OUTPUT_DIR / "data"
 FIGURES_DIR = OUTPUT_DIR / "figures"
-
-# Time range
-TIME_START = "2015-01-01"
-TIME_END = "2026-01-16"
-TIME_START_YEAR = 2015
-TIME_END_YEAR = 2026
+PYRAMID_DIR = DATA_DIR / "pyramid"
+CACHE_DIR = OUTPUT_DIR / "cache"
+CATALOG_PATH = CACHE_DIR / "catalog.sqlite"
+RUN_REPORT_PATH = OUTPUT_DIR / "run_report.json"
+# Columnar 15s store: STORE_DIR/station=<name>/year=<YYYY>/month=<MM>/<source file>.parquet
+STORE_DIR = OUTPUT_DIR / "store"
+
+# Time range ([time] start/end in botpt.toml)
+TIME_START = config.TIME_START
+TIME_END = config.TIME_END
+TIME_START_YEAR = int(TIME_START[:4])
+TIME_END_YEAR = int(TIME_END[:4])
+
+# Worker processes used for per-file NetCDF ingestion (1 = serial)
+INGEST_WORKERS = min(8, os.cpu_count() or 1)
+
+# Per-file hourly cache: least recently used chunks are evicted above this size
+HOURLY_CACHE_MAX_BYTES = 2 * 1024**3
+# Bump when the per-file extraction changes so stale chunks are not reused
+HOURLY_CACHE_VERSION = 3
+
+# Exported products are sorted by time and written one calendar period per Parquet row
+# group (numpy datetime unit: a month of hourly rows, a year of daily rows), with min/max
+# statistics. Time-range queries read only the overlapping row groups, and an incremental
+# export only rewrites the trailing ones.
+PARQUET_ROW_GROUP_PERIODS = {"hourly": "M", "daily": "Y"}
+
+# Incremental export: the rolling filters count rows, not hours, so the margins are rows
+# of each pair in the exported product (hours where both its stations have data). The
+# last INCREMENTAL_REWRITE_ROWS rows are recomputed: the 24-point station filter followed
+# by the 24-point differential filter reaches 48 rows. Data is reloaded from a further
+# INCREMENTAL_REWRITE_ROWS rows back so the recomputed rows see full windows; station rows
+# are a superset of a pair's rows, so this covers the station filters too.
+INCREMENTAL_REWRITE_ROWS = 2 * 24
+
+# Rolling median/MAD engine: windows up to ROLLING_BLOCK_MAX_WINDOW points use a blocked
+# NumPy sort (ROLLING_BLOCK_ROWS rows at a time); larger windows, such as 24 h of raw
+# 15 s samples, use pandas' O(n log w) skiplist median
+ROLLING_BLOCK_MAX_WINDOW = 64
+ROLLING_BLOCK_ROWS = 16384
+
+# For normally distributed data, std ≈ 1.4826 * MAD
+MAD_SCALE = 1.4826
+
+# Hourly spike filters: rolling window (hours) and threshold (scaled MADs) for each
+# station's depth and for the differential (qc_sweep.py compares other settings)
+STATION_SPIKE_WINDOW = 24
+STATION_SPIKE_THRESHOLD = 5.0
+DIFFERENTIAL_SPIKE_WINDOW = 24
+DIFFERENTIAL_SPIKE_THRESHOLD = 3.5
+
+# Figures: saved at PLOT_DPI; line plots are decimated to the figure's pixel columns.
+# Bump PLOT_RENDER_VERSION when plot code changes so unchanged data is redrawn anyway.
+PLOT_DPI = 150
+PLOT_RENDER_VERSION = 1
+
+# Run report: a file is called out as slow when it takes this many times the median
+SLOW_FILE_FACTOR = 5.0
+
+# Resolution pyramid: bin widths built in one pass from the 15 s samples. All but the
+# weekly level nest inside calendar months; weeks start on Monday.
+PYRAMID_LEVELS = ["15s", "1min", "1h", "1D", "1W"]
+
+# Raw-sample QC (--raw-qc): despike native 15 s samples before hourly averaging,
+# using a 24-hour window
+RAW_SAMPLE_SECONDS = 15
+RAW_QC_WINDOW_SAMPLES = 24 * 3600 // RAW_SAMPLE_SECONDS
+RAW_QC_THRESHOLD = 5.0
+
+# Hourly merge of per-file chunks (see `merge_hourly_chunks`). An hour with samples from
+# more than one deployment was recorded by overlapping files; OVERLAP_POLICY then keeps the
+# newer deployment's hour ("newer") or the count-weighted mean of all files ("average").
+# Hours with fewer than HOURLY_MIN_SAMPLES valid samples are flagged as gaps.
+SAMPLES_PER_HOUR = 3600 // RAW_SAMPLE_SECONDS
+OVERLAP_POLICIES = ["newer", "average"]
+OVERLAP_POLICY = "newer"
+HOURLY_MIN_SAMPLES = SAMPLES_PER_HOUR // 2
+
+# Lean mode (--lean): hourly depths and differentials are stored as float32. Its spacing
+# near 1500 m is 0.12 mm, well inside the mm precision of the depth product; the rolling
+# filter statistics are still computed in float64. Peak RSS target for a full 2015-2026
+# run of both stations, checked by `benchmarks.py memory`
+LEAN_DTYPE = "float32"
+LEAN_PEAK_RSS_TARGET_MB = 256
 
 
 def pressure_to_depth(pressure_psia):
@@ -67,42 +174,459 @@ def pressure_to_depth(pressure_psia):
     return (pressure_psia - 14.7) * 0.670
 
 
-def remove_spikes(series: pd.Series, window_hours: int = 24, threshold: float = 5.0) -> pd.Series:
+def _bytes_read() -> int | None:
+    """Bytes this process has read so far (Linux /proc/self/io `rchar`), or None."""
+    try:
+        with open("/proc/self/io") as io_stats:
+            for line in io_stats:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    """Peak resident set size in MB (ru_maxrss is in kilobytes on Linux)."""
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+class RunReport:
+    """Timing, memory and row counts for one pipeline run, per stage and per file.
+
+    Stages are timed with the `stage` context manager. Per-file records come from
+    the loaders (including worker processes, which measure themselves and return
+    their numbers). `write` saves everything as JSON and flags slow files.
+    """
+
+    def __init__(self):
+        self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.stages = []
+        self.files = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows_in: int | None = None):
+        """Time a stage; the yielded dict can be updated with `rows_out` and notes."""
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        bytes_before = _bytes_read()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            bytes_after = _bytes_read()
+            record.update({
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.process_time() - cpu,
+                # Worker processes report CPU once they have exited
+                "child_cpu_s": (children_after.ru_utime + children_after.ru_stime
+                                - children.ru_utime - children.ru_stime),
+                "peak_rss_mb": _peak_rss_mb(),
+                "child_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+                "bytes_read": None if bytes_before is None else bytes_after - bytes_before,
+            })
+            with self._lock:
+                self.stages.append(record)
+
+    def add_file(self, record: dict):
+        """Record one file's load statistics (see `_file_stats`)."""
+        with self._lock:
+            self.files.append(record)
+
+    def slow_files(self) -> list[dict]:
+        """Decoded files taking more than SLOW_FILE_FACTOR times the median time."""
+        decoded = [f for f in self.files if not f.get("cached")]
+        if len(decoded) < 2:
+            return []
+        median = float(np.median([f["wall_s"] for f in decoded]))
+        return sorted((f for f in decoded if f["wall_s"] > SLOW_FILE_FACTOR * median),
+                      key=lambda f: -f["wall_s"])
+
+    def write(self, path: Path):
+        """Write the report as JSON and print the slow files."""
+        slow = self.slow_files()
+        report = {
+            "started": self.started,
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": self.stages,
+            "slow_files": slow,
+            "files": self.files,
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, default=str))
+        print(f"Saved: {path.name}")
+        for f in slow:
+            print(f"  Slow file: {Path(f['file']).name} ({f['wall_s']:.2f} s, "
+                  f"{f['bytes'] / 1024**2:.1f} MB, {f['rows_in']} samples)")
+
+
+# Report for the current run, set by main(); loaders record per-file statistics into it
+_run_report: RunReport | None = None
+
+
+def _file_stats(f: Path, wall: float, cpu: float, bytes_before: int | None,
+                rows_in: int, rows_out: int) -> dict:
+    """Per-file statistics, measured in whichever process loaded the file."""
+    bytes_after = _bytes_read()
+    return {
+        "file": str(f),
+        "bytes": f.stat().st_size,
+        "bytes_read": None if bytes_before is None else bytes_after - bytes_before,
+        "wall_s": time.perf_counter() - wall,
+        "cpu_s": time.process_time() - cpu,
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+    }
+
+
+def _window_medians(values: np.ndarray, window: int) -> np.ndarray:
+    """Median of every length-`window` run of rows in a 2-D array, ignoring NaN.
+
+    Returns an array of shape (len(values) - window + 1, n_columns); windows with no
+    valid values give NaN. The even-count median is (a + b) / 2, as in pandas.
+    """
+    sorted_windows = np.sort(sliding_window_view(values, window, axis=0), axis=-1)  # NaN sorts last
+    count = np.count_nonzero(~np.isnan(sorted_windows), axis=-1)
+    lo = (np.maximum(count, 1) - 1) // 2
+    hi = count // 2
+    a = np.take_along_axis(sorted_windows, lo[..., np.newaxis], axis=-1)[..., 0]
+    b = np.take_along_axis(sorted_windows, hi[..., np.newaxis], axis=-1)[..., 0]
+    # For odd counts a == b, and (a + a) / 2 == a exactly
+    median = (a + b) / 2
+    median[count == 0] = np.nan
+    return median
+
+
+def rolling_median_mad(values: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """Centered rolling median and MAD in one pass, for one or more columns.
+
+    Matches `Series.rolling(window, center=True, min_periods=1).median()` applied to the
+    values and then to their absolute deviations, bit for bit (NaN and inf are skipped).
+
+    Small windows are processed in row blocks: each block computes the median over a
+    halo wide enough to feed the MAD window, so memory stays bounded by the block size.
+    Large windows use pandas' O(n log w) skiplist median over all columns at once.
+
+    Args:
+        values: Array of shape (n,) or (n, n_columns)
+        window: Window length in samples
+
+    Returns:
+        Tuple of (rolling_median, rolling_mad), each shaped like `values`
+    """
+    x = np.asarray(values, dtype="float64")
+    squeeze = x.ndim == 1
+    if squeeze:
+        x = x[:, np.newaxis]
+    if np.isinf(x).any():
+        # pandas' rolling aggregations treat inf as missing
+        x = np.where(np.isinf(x), np.nan, x)
+    n = len(x)
+
+    if window > ROLLING_BLOCK_MAX_WINDOW:
+        rolling = dict(window=window, center=True, min_periods=1)
+        median = pd.DataFrame(x).rolling(**rolling).median().to_numpy()
+        mad = pd.DataFrame(np.abs(x - median)).rolling(**rolling).median().to_numpy()
+    else:
+        # Row i's window covers rows i - left .. i + offset (pandas' centering)
+        offset = (window - 1) // 2
+        left = window - 1 - offset
+        # Pad twice: once for the median windows, once more for the MAD windows
+        nan_rows = lambda m: np.full((m, x.shape[1]), np.nan)
+        padded = np.concatenate([nan_rows(2 * left), x, nan_rows(2 * offset)])
+
+        median = np.empty_like(x)
+        mad = np.empty_like(x)
+        for start in range(0, n, ROLLING_BLOCK_ROWS):
+            stop = min(start + ROLLING_BLOCK_ROWS, n)
+            # Medians for rows start - left .. stop + offset - 1 (the MAD halo)
+            halo_median = _window_medians(padded[start:stop + 2 * (window - 1)], window)
+            halo_values = padded[start + left:stop + offset + 2 * left]
+            halo_deviation = np.abs(halo_values - halo_median)
+            median[start:stop] = halo_median[left:left + stop - start]
+            mad[start:stop] = _window_medians(halo_deviation, window)
+
+    if squeeze:
+        return median[:, 0], mad[:, 0]
+    return median, mad
+
+
+def spike_mask(values: np.ndarray, window: int, threshold: float) -> np.ndarray:
+    """Flag values more than `threshold` scaled MADs from the centered rolling median.
+
+    Args:
+        values: Array of shape (n,) or (n, n_columns); columns are filtered independently
+        window: Rolling window length in samples
+        threshold: Number of scaled MADs for the spike threshold
+
+    Returns:
+        Boolean array shaped like `values`
+    """
+    median, mad = rolling_median_mad(values, window)
+    # The deviation and threshold overwrite the rolling buffers instead of allocating new
+    # arrays (pandas' long-window results are read-only, so those are still copied).
+    # Same operations as the original pandas implementation, for identical masks
+    if not (median.flags.writeable and mad.flags.writeable):
+        median, mad = median.copy(), mad.copy()
+    deviation = np.subtract(values, median, out=median)
+    np.abs(deviation, out=deviation)
+    mad *= MAD_SCALE
+    mad *= threshold
+    return deviation > mad
+
+
+def remove_spikes(series: pd.Series, window_hours: int = 24, threshold: float = 5.0,
+                  inplace: bool = False) -> pd.Series:
     """Remove spikes using rolling median and MAD (median absolute deviation).
 
-    MAD is more robust to outliers than standard deviation.
+    MAD is more robust to outliers than standard deviation. The rolling statistics
+    come from `rolling_median_mad`, which gives the same masks as pandas' rolling
+    median in a single fused pass.
 
     Args:
         series: Hourly depth time series
         window_hours: Rolling window size in hours
         threshold: Number of MADs for spike threshold
+        inplace: Replace spikes in `series` itself instead of in a copy
 
     Returns:
         Series with spikes replaced by NaN
     """
-    cleaned = series.copy()
-
-    # Use median (robust to outliers)
-    rolling_median = cleaned.rolling(window=window_hours, center=True, min_periods=1).median()
-
-    # Calculate MAD (median absolute deviation) - more robust than std
-    deviation = (cleaned - rolling_median).abs()
-    rolling_mad = deviation.rolling(window=window_hours, center=True, min_periods=1).median()
+    cleaned = series if inplace else series.copy()
 
-    # Scale MAD to be comparable to std (for normal distribution, std ≈ 1.4826 * MAD)
-    scaled_mad = 1.4826 * rolling_mad
-
-    # Flag values more than threshold MADs from rolling median
-    is_spike = deviation > (threshold * scaled_mad)
+    # Flag values more than threshold scaled MADs from the rolling median
+    is_spike = spike_mask(cleaned.to_numpy(dtype="float64", na_value=np.nan), window_hours, threshold)
 
     n_spikes = is_spike.sum()
     if n_spikes > 0:
         print(f"    Removed {n_spikes} spikes ({100*n_spikes/len(series):.2f}%)")
-        cleaned[is_spike] = pd.NA
+        cleaned[is_spike] = np.nan
 
     return cleaned
 
 
+class StreamingDespiker:
+    """MAD despiker over a stream of (times, values) chunks, carrying window state.
+
+    Produces exactly the mask `spike_mask` would give on the concatenated stream.
+    A sample's flag depends on the samples up to about one window either side, so
+    each `push` emits only the samples whose look-ahead is complete and keeps the
+    tail (plus one window of look-back) for the next chunk. Memory is bounded by
+    the chunk size plus two windows, not by the length of the stream.
+    """
+
+    def __init__(self, window: int, threshold: float):
+        self.window = window
+        self.threshold = threshold
+        offset = (window - 1) // 2
+        # The MAD window reads deviations whose median windows reach twice as far
+        self.lookback = 2 * (window - 1 - offset)
+        self.lookahead = 2 * offset
+        self._times = np.array([], dtype="datetime64[ns]")
+        self._values = np.array([], dtype="float64")
+        self._n_context = 0  # leading buffered samples already emitted
+        self.n_samples = 0
+        self.n_spikes = 0
+
+    def _clean(self, stop: int) -> tuple[np.ndarray, np.ndarray]:
+        """Despike the buffer and return the not-yet-emitted samples before `stop`."""
+        is_spike = spike_mask(self._values, self.window, self.threshold)
+        values = self._values[self._n_context:stop].copy()
+        spikes = is_spike[self._n_context:stop]
+        values[spikes] = np.nan
+        self.n_samples += len(values)
+        self.n_spikes += int(spikes.sum())
+        return self._times[self._n_context:stop], values
+
+    def peek(self, times: np.ndarray | None = None,
+             values: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Provisional cleaned values of the samples not yet emitted, plus an optional extra chunk.
+
+        Flags them as `flush` would if the stream ended now, but leaves the state
+        untouched, so later pushes still emit the final flags. This gives
+        low-latency estimates for the newest samples, whose look-ahead is incomplete.
+        """
+        all_times, all_values = self._times, self._values
+        if times is not None:
+            all_times = np.concatenate([all_times, times])
+            all_values = np.concatenate([all_values, np.asarray(values, dtype="float64")])
+        if len(all_values) <= self._n_context:
+            return all_times[:0], all_values[:0]
+        is_spike = spike_mask(all_values, self.window, self.threshold)
+        out = all_values[self._n_context:].copy()
+        out[is_spike[self._n_context:]] = np.nan
+        return all_times[self._n_context:], out
+
+    def push(self, times: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Add a chunk and return the samples whose spike flags are now final."""
+        self._times = np.concatenate([self._times, times])
+        self._values = np.concatenate([self._values, np.asarray(values, dtype="float64")])
+
+        stop = len(self._values) - self.lookahead
+        if stop <= self._n_context:
+            return self._times[:0], self._values[:0]
+
+        out = self._clean(stop)
+        keep_from = max(0, stop - self.lookback)
+        self._times = self._times[keep_from:]
+        self._values = self._values[keep_from:]
+        self._n_context = stop - keep_from
+        return out
+
+    def flush(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return the remaining samples, treating the end of the buffer as the end of the stream."""
+        out = self._clean(len(self._values))
+        self._times = self._times[:0]
+        self._values = self._values[:0]
+        self._n_context = 0
+        return out
+
+
+def despike_stream(chunks: Iterable[tuple[np.ndarray, np.ndarray]], window: int = RAW_QC_WINDOW_SAMPLES,
+                   threshold: float = RAW_QC_THRESHOLD,
+                   despiker: StreamingDespiker | None = None) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Despike a stream of (times, values) chunks, yielding cleaned chunks with spikes as NaN.
+
+    Args:
+        chunks: Time-ordered (times, values) chunks, e.g. one per NetCDF file
+        window: Rolling window length in samples
+        threshold: Number of scaled MADs for the spike threshold
+        despiker: Optional despiker to use, so callers can read its spike counts
+    """
+    if despiker is None:
+        despiker = StreamingDespiker(window, threshold)
+    for times, values in chunks:
+        out_times, out_values = despiker.push(times, values)
+        if len(out_times):
+            yield out_times, out_values
+    out_times, out_values = despiker.flush()
+    if len(out_times):
+        yield out_times, out_values
+
+
+def _hourly_frame(hours: np.ndarray, means: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+    """Hourly record with `depth_m`, `count` (valid samples) and `gap` columns."""
+    return pd.DataFrame({"depth_m": means, "count": counts.astype("int64"),
+                         "gap": counts < HOURLY_MIN_SAMPLES},
+                        index=pd.DatetimeIndex(hours.astype("datetime64[ns]")))
+
+
+def hourly_means(chunks: Iterable[tuple[np.ndarray, np.ndarray]]) -> pd.DataFrame:
+    """Average a time-ordered stream of (times, values) chunks into hourly bins.
+
+    NaN samples are ignored; an hour whose samples were all rejected is NaN.
+    The last hour of each chunk is carried into the next one, so hours that
+    straddle file boundaries are averaged once.
+
+    Returns:
+        DataFrame indexed by hour with `depth_m`, `count` and `gap`, as from
+        `merge_hourly_chunks`
+    """
+    hours_out, sums_out, counts_out = [], [], []
+    carry = None  # (hour, sum, count) of the last, possibly incomplete, hour
+
+    for times, values in chunks:
+        hours = times.astype("datetime64[h]")
+        starts = np.flatnonzero(np.r_[True, hours[1:] != hours[:-1]])
+        valid = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        counts = np.add.reduceat(valid.astype("int64"), starts)
+        bin_hours = hours[starts]
+
+        if carry is not None:
+            if carry[0] == bin_hours[0]:
+                sums[0] += carry[1]
+                counts[0] += carry[2]
+            else:
+                hours_out.append([carry[0]])
+                sums_out.append([carry[1]])
+                counts_out.append([carry[2]])
+        carry = (bin_hours[-1], sums[-1], counts[-1])
+        hours_out.append(bin_hours[:-1])
+        sums_out.append(sums[:-1])
+        counts_out.append(counts[:-1])
+
+    if carry is not None:
+        hours_out.append([carry[0]])
+        sums_out.append([carry[1]])
+        counts_out.append([carry[2]])
+    if not hours_out:
+        return _hourly_frame(np.array([], dtype="datetime64[h]"), np.array([]), np.array([], dtype="int64"))
+
+    sums = np.concatenate(sums_out).astype("float64")
+    counts = np.concatenate(counts_out)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return _hourly_frame(np.concatenate(hours_out), means, counts)
+
+
+def merge_hourly_chunks(chunks: list[tuple[int, pd.DataFrame]], policy: str = OVERLAP_POLICY) -> pd.DataFrame:
+    """Merge per-file hourly chunks into one hourly record, with sample counts and gap flags.
+
+    Each chunk is already time-sorted, so the chunks are merged as sorted runs and
+    every hour is resolved in one grouped pass, without reindexing:
+
+    - an hour from a single file is kept as is;
+    - an hour split between files of one deployment (at a file boundary) is the
+      count-weighted mean of its parts, i.e. the mean of all its samples;
+    - an hour with samples from more than one deployment follows `policy`:
+      "newer" keeps the highest-ranked deployment's part (pooled over its files),
+      "average" takes the count-weighted mean across files. This holds however
+      many samples each part has, so partial hours at a handover are not pooled.
+
+    Args:
+        chunks: (rank, chunk) pairs; each chunk has `depth_m` and `count` columns on
+            an hourly index. Chunks of the same deployment share a rank; higher
+            ranks are newer deployments.
+        policy: One of OVERLAP_POLICIES
+
+    Returns:
+        DataFrame indexed by hour with `depth_m` (in the chunks' dtype), `count`
+        (valid samples) and `gap` (fewer than HOURLY_MIN_SAMPLES valid samples)
+    """
+    if policy not in OVERLAP_POLICIES:
+        raise ValueError(f"unknown overlap policy {policy!r}; expected one of {OVERLAP_POLICIES}")
+    chunks = [(rank, chunk) for rank, chunk in chunks if len(chunk) > 0]
+    if not chunks:
+        return _hourly_frame(np.array([], dtype="datetime64[h]"), np.array([]), np.array([], dtype="int64"))
+
+    hours = np.concatenate([chunk.index.to_numpy() for _, chunk in chunks])
+    ranks = np.concatenate([np.full(len(chunk), rank) for rank, chunk in chunks])
+    means = np.concatenate([chunk["depth_m"].to_numpy() for _, chunk in chunks])
+    counts = np.concatenate([chunk["count"].to_numpy() for _, chunk in chunks])
+
+    # Order by hour, then rank, so the newest deployment's parts of each hour come last
+    order = np.lexsort((ranks, hours))
+    hours, ranks, means, counts = hours[order], ranks[order], means[order], counts[order]
+    new_hour = np.r_[True, hours[1:] != hours[:-1]]
+    starts = np.flatnonzero(new_hour)
+    ends = np.r_[starts[1:], len(hours)] - 1
+
+    def pool(bounds):
+        """Count-weighted mean and total count of the rows from each bound to the next."""
+        totals = np.add.reduceat(counts, bounds)
+        sums = np.add.reduceat(np.where(counts > 0, means.astype("float64") * counts, 0.0), bounds)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pooled = np.where(totals > 0, sums / totals, np.nan)
+        # Single-file parts keep their own mean exactly
+        single = np.r_[bounds[1:], len(hours)] - bounds == 1
+        return np.where(single, means[bounds], pooled), totals
+
+    value, count = pool(starts)
+    if policy == "newer":
+        # Parts of one (hour, deployment); the last part of each hour is the newest deployment's
+        parts = np.flatnonzero(new_hour | np.r_[True, ranks[1:] != ranks[:-1]])
+        newest = np.searchsorted(parts, ends, side="right") - 1
+        part_value, part_count = pool(parts)
+        overlap = ranks[starts] != ranks[ends]
+        value = np.where(overlap, part_value[newest], value)
+        count = np.where(overlap, part_count[newest], count)
+    return _hourly_frame(hours[starts], value.astype(means.dtype), count)
+
+
 def filter_files_by_time_range(nc_files: list[Path]) -> list[Path]:
     """Filter NetCDF files to those covering the target time range (15s data only)."""
     filtered = []
@@ -124,63 +648,774 @@ def filter_files_by_time_range(nc_files: list[Path]) -> list[Path]:
     return sorted(filtered)
 
 
-def load_station(data_path: Path, station_name: str) -> pd.Series:
+def _file_time_span(f: Path) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """Start and end timestamps encoded in an OOI 15s filename, if present."""
+    match = re.search(r"_15s_(\d{8}T\d{6})-(\d{8}T\d{6})", f.name)
+    if match is None:
+        return None
+    return pd.Timestamp(match.group(1)), pd.Timestamp(match.group(2))
+
+
+# Unit names accepted in CF "<unit> since <epoch>" time attributes
+_CF_TIME_UNITS = {"days": "D", "hours": "h", "minutes": "min", "seconds": "s",
+                  "milliseconds": "ms", "microseconds": "us"}
+
+
+def _time_bounds() -> tuple[pd.Timestamp, pd.Timestamp]:
+    """TIME_START/TIME_END as inclusive bounds.
+
+    Like xarray's `.sel(time=slice(...))`, a date string selects its whole period,
+    so TIME_END = "2026-01-16" includes all of that day.
+    """
+    return pd.Period(TIME_START).start_time, pd.Period(TIME_END).end_time
+
+
+def _parse_time_units(units: str) -> tuple[pd.Timestamp, pd.Timedelta]:
+    """Split a CF time attribute such as "seconds since 1900-01-01 0:00:00" into (epoch, step)."""
+    unit, _, epoch = units.partition(" since ")
+    epoch = pd.Timestamp(epoch.strip())
+    if epoch.tzinfo is not None:
+        epoch = epoch.tz_convert(None)
+    return epoch, pd.Timedelta(1, unit=_CF_TIME_UNITS[unit.strip().lower()])
+
+
+def _read_file_samples(f: Path, since: pd.Timestamp | None = None, end: pd.Timestamp | None = None,
+                       bounds: tuple[pd.Timestamp, pd.Timestamp] | None = None
+                       ) -> tuple[np.ndarray, np.ndarray] | None:
+    """Read one NetCDF file's 15s samples inside the time range.
+
+    Reads only the `time` and `botsflu_meandepth` variables through the netCDF4
+    handle, without building an xarray Dataset. The time coordinate is sorted, so
+    the time range maps to one index range and only that slice of depth is read.
+
+    Args:
+        f: NetCDF file
+        since: Optional start; earlier samples are not read
+        end: Optional inclusive end replacing TIME_END (the monitor follows live data)
+        bounds: Time range as from `_time_bounds`, which is read if not given. Worker
+            processes are passed the parent's range, as spawned workers do not see
+            changes to TIME_START/TIME_END
+
+    Returns:
+        Tuple of (times, depth) arrays, or None if the file has no data in the time range
+    """
+    import netCDF4
+
+    with netCDF4.Dataset(f) as nc:
+        time_var = nc.variables["time"]
+        raw_time = np.ma.filled(time_var[:].astype("float64"), np.nan)
+        epoch, step = _parse_time_units(time_var.units)
+
+        # Time range in the file's own units, so it can be located before decoding
+        start, time_end = _time_bounds() if bounds is None else bounds
+        if since is not None:
+            start = max(start, since)
+        end = time_end if end is None else end
+        raw_start = (start - epoch) / step
+        raw_end = (end - epoch) / step
+
+        depth_var = nc.variables["botsflu_meandepth"]
+        if np.all(raw_time[1:] >= raw_time[:-1]):
+            i0 = np.searchsorted(raw_time, raw_start, side="left")
+            i1 = np.searchsorted(raw_time, raw_end, side="right")
+            if i1 <= i0:
+                return None
+            raw_time = raw_time[i0:i1]
+            raw_depth = depth_var[i0:i1]
+        else:
+            # Unsorted file: fall back to a mask over the full record
+            in_range = (raw_time >= raw_start) & (raw_time <= raw_end)
+            if not in_range.any():
+                return None
+            raw_time = raw_time[in_range]
+            raw_depth = depth_var[:][in_range]
+
+    # Get OOI-calculated depth (negative convention: below sea surface)
+    # Take absolute value to get positive depth; fill values become NaN
+    depth = np.abs(np.ma.filled(raw_depth.astype("float64"), np.nan))
+    offsets = np.round(raw_time * (step / pd.Timedelta(1, "ns"))).astype("int64")
+    time = epoch.to_datetime64().astype("datetime64[ns]") + offsets.astype("timedelta64[ns]")
+    return time, depth
+
+
+def _load_file_hourly(f: Path, bounds: tuple[pd.Timestamp, pd.Timestamp]
+                      ) -> tuple[pd.DataFrame | None, dict]:
+    """Load one NetCDF file and return its hourly-mean depth and sample counts.
+
+    Kept at module level so it can be pickled into worker processes. The time
+    range `bounds` (from `_time_bounds`) is passed in rather than read from the
+    module globals, which worker processes may not share.
+
+    Returns:
+        Tuple of (hourly chunk with `depth_m` and `count` columns, or None if the
+        file has no data in the time range; per-file statistics for the run report)
+    """
+    wall, cpu, bytes_before = time.perf_counter(), time.process_time(), _bytes_read()
+    samples = _read_file_samples(f, bounds=bounds)
+    if samples is None:
+        return None, _file_stats(f, wall, cpu, bytes_before, 0, 0)
+    time_values, depth = samples
+
+    # Create series and resample to hourly
+    series = pd.Series(depth, index=pd.DatetimeIndex(time_values))
+    resampled = series.resample("1h")
+    hourly = pd.DataFrame({"depth_m": resampled.mean(), "count": resampled.count()})
+    return hourly, _file_stats(f, wall, cpu, bytes_before, len(series), len(hourly))
+
+
+def _resolve_overlaps(pieces: Iterable[tuple[int, np.ndarray, np.ndarray]], policy: str = OVERLAP_POLICY
+                      ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Merge per-file (rank, times, depth) pieces, given in file order, into one time-ordered stream.
+
+    Hours with samples from more than one rank follow `policy`, as in
+    `merge_hourly_chunks`: "newer" keeps only the highest rank's samples of the
+    hour, "average" keeps them all. Each hour then averages to the same value as
+    on the hourly-chunk path. An hour is resolved once a later piece starts after
+    it, so only the samples from the newest piece's start on are held back.
+    Samples of a piece that fall in hours already yielded (a file that starts
+    before an earlier one's resolved hours) are dropped.
+    """
+    if policy not in OVERLAP_POLICIES:
+        raise ValueError(f"unknown overlap policy {policy!r}; expected one of {OVERLAP_POLICIES}")
+    held = (np.array([], dtype="datetime64[ns]"), np.array([], dtype="float64"), np.array([], dtype="int64"))
+    resolved_until = None
+
+    def resolve(times, depth, ranks):
+        if policy == "newer":
+            hours = times.astype("datetime64[h]")
+            order = np.argsort(hours, kind="stable")
+            starts = np.flatnonzero(np.r_[True, hours[order][1:] != hours[order][:-1]])
+            newest = np.maximum.reduceat(ranks[order], starts)
+            keep = np.empty(len(times), dtype=bool)
+            keep[order] = ranks[order] == np.repeat(newest, np.diff(np.r_[starts, len(times)]))
+            times, depth = times[keep], depth[keep]
+        order = np.argsort(times, kind="stable")
+        return times[order], depth[order]
+
+    for rank, times, depth in pieces:
+        hours = times.astype("datetime64[h]")
+        if resolved_until is not None:
+            keep = hours >= resolved_until
+            times, depth, hours = times[keep], depth[keep], hours[keep]
+        if len(times) == 0:
+            continue
+        ready = held[0].astype("datetime64[h]") < hours.min()
+        if ready.any():
+            yield resolve(*(a[ready] for a in held))
+        resolved_until = hours.min()
+        held = tuple(np.concatenate([a[~ready], b])
+                     for a, b in zip(held, (times, depth, np.full(len(times), rank))))
+    if len(held[0]):
+        yield resolve(*held)
+
+
+def iter_raw_samples(nc_files: list[Path], since: pd.Timestamp | None = None,
+                     end: pd.Timestamp | None = None, overlap: str = OVERLAP_POLICY
+                     ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield the files' (times, depth) samples in time order, reading one file at a time.
+
+    Only samples from `since` on are read from each file (see `_read_file_samples`,
+    which also takes `end`). Hours recorded by overlapping files follow `overlap`
+    (see `_resolve_overlaps`), with files ranked by `_file_ranks`.
+    """
+    def pieces():
+        for f, rank in zip(nc_files, _file_ranks(nc_files)):
+            wall, cpu, bytes_before = time.perf_counter(), time.process_time(), _bytes_read()
+            samples = _read_file_samples(f, since, end)
+            if _run_report is not None:
+                n = 0 if samples is None else len(samples[0])
+                _run_report.add_file(_file_stats(f, wall, cpu, bytes_before, n, n))
+            if samples is not None:
+                yield rank, *samples
+
+    yield from _resolve_overlaps(pieces(), overlap)
+
+
+def _deployment_of(f: Path) -> int | None:
+    """OOI deployment number from a filename such as 'deployment0005_RS03ECAL-...nc'."""
+    match = re.search(r"deployment(\d+)", f.name)
+    return int(match.group(1)) if match else None
+
+
+def _file_ranks(files: list[Path]) -> list[int]:
+    """Overlap ranks of files in filename order; higher ranks are newer.
+
+    Consecutive files of one deployment share a rank. Every other file, including
+    any file without a deployment number in its name, ranks above the files
+    before it, so "newer" still means later in file order.
+    """
+    ranks = []
+    for i, f in enumerate(files):
+        deployment = _deployment_of(f)
+        same = i > 0 and deployment is not None and deployment == _deployment_of(files[i - 1])
+        ranks.append(ranks[-1] if same else (ranks[-1] + 1 if ranks else 0))
+    return ranks
+
+
+def _scan_file(f: Path) -> tuple[int | None, int | None, int]:
+    """Actual (first, last) sample time in ns since the Unix epoch, and sample count.
+
+    Only the time variable is read.
+    """
+    import netCDF4
+
+    with netCDF4.Dataset(f) as nc:
+        time_var = nc.variables["time"]
+        raw_time = np.ma.filled(time_var[:].astype("float64"), np.nan)
+        epoch, step = _parse_time_units(time_var.units)
+
+    raw_time = raw_time[~np.isnan(raw_time)]
+    if len(raw_time) == 0:
+        return None, None, 0
+    step_ns = step / pd.Timedelta(1, "ns")
+    first = epoch.value + int(round(raw_time.min() * step_ns))
+    last = epoch.value + int(round(raw_time.max() * step_ns))
+    return first, last, len(raw_time)
+
+
+@contextlib.contextmanager
+def _connect_catalog(catalog_path: Path) -> Iterator[sqlite3.Connection]:
+    """Open the file catalog, creating its tables on first use.
+
+    The transaction is committed if the block succeeds and rolled back if it
+    raises; the connection is closed either way.
+    """
+    catalog_path.parent.mkdir(parents=True, exist_ok=True)
+    with contextlib.closing(sqlite3.connect(catalog_path, timeout=60)) as conn, conn:
+        _create_catalog_tables(conn)
+        yield conn
+
+
+def _create_catalog_tables(conn: sqlite3.Connection):
+    """Create the catalog tables and index if they do not exist."""
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            station TEXT NOT NULL,
+            deployment INTEGER,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            first_time INTEGER,  -- ns since 1970-01-01
+            last_time INTEGER,
+            n_samples INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_station_time ON files (station, first_time, last_time);
+        CREATE TABLE IF NOT EXISTS scans (
+            directory TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        );
+    """)
+
+
+def update_catalog(data_path: Path, station_name: str, catalog_path: Path = CATALOG_PATH) -> list[Path]:
+    """Bring the catalog up to date with a station's data directory.
+
+    The directory is only listed when its modification time has changed (a file
+    was added, removed or renamed). Only new files, or files whose size or mtime
+    changed, are opened, and then only their time variable is read.
+
+    Returns:
+        Files that were added or re-scanned
+    """
+    directory = str(data_path.resolve())
+    dir_mtime = data_path.stat().st_mtime_ns
+
+    with _connect_catalog(catalog_path) as conn:
+        row = conn.execute("SELECT mtime_ns FROM scans WHERE directory = ?", (directory,)).fetchone()
+        known = {path: (size, mtime) for path, size, mtime in conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE station = ?", (station_name,))}
+
+        if row is not None and row[0] == dir_mtime:
+            # No files added or removed; only check known files for in-place changes
+            candidates = [Path(p) for p in known if os.path.dirname(p) == directory]
+        else:
+            candidates = [f.resolve() for f in data_path.glob("*.nc") if "_15s_" in f.name]
+            present = {str(f) for f in candidates}
+            removed = [p for p in known if os.path.dirname(p) == directory and p not in present]
+            conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in removed])
+
+        changed = []
+        for f in candidates:
+            stat = f.stat()
+            if known.get(str(f)) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            first, last, n_samples = _scan_file(f)
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (str(f), station_name, _deployment_of(f), stat.st_size,
+                          stat.st_mtime_ns, first, last, n_samples))
+            changed.append(f)
+
+        conn.execute("INSERT OR REPLACE INTO scans VALUES (?, ?)", (directory, dir_mtime))
+
+    if changed:
+        print(f"  {station_name}: catalogued {len(changed)} new or changed files")
+    return changed
+
+
+def catalog_files(station_name: str, start: pd.Timestamp, end: pd.Timestamp,
+                  catalog_path: Path = CATALOG_PATH, data_path: Path | None = None) -> list[Path]:
+    """Files whose actual sample times overlap [start, end], in filename order.
+
+    With `data_path`, only files directly in that directory are returned (rows left
+    from an earlier location of the station's data are ignored).
+    """
+    with _connect_catalog(catalog_path) as conn:
+        rows = conn.execute(
+            "SELECT path FROM files WHERE station = ? AND n_samples > 0"
+            " AND first_time <= ? AND last_time >= ?",
+            (station_name, pd.Timestamp(end).value, pd.Timestamp(start).value)).fetchall()
+    files = [Path(path) for (path,) in rows]
+    if data_path is not None:
+        directory = data_path.resolve()
+        files = [f for f in files if f.parent == directory]
+    return sorted(files, key=lambda f: f.name)
+
+
+def _convert_file(f: Path, station_dir: Path, bounds: tuple[pd.Timestamp, pd.Timestamp]) -> list[str]:
+    """Write one NetCDF file's in-range 15s samples into the store, one part per month.
+
+    Kept at module level so it can be pickled into worker processes; the time
+    range `bounds` is passed in, as for `_load_file_hourly`.
+
+    Returns:
+        Paths of the written parts, relative to `station_dir`
+    """
+    samples = _read_file_samples(f, bounds=bounds)
+    if samples is None:
+        return []
+    times, depth = samples
+    order = np.argsort(times, kind="stable")
+    times, depth = times[order], depth[order]
+
+    months = times.astype("datetime64[M]")
+    bounds = np.r_[0, np.flatnonzero(months[1:] != months[:-1]) + 1, len(times)]
+    parts = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        month = pd.Timestamp(months[lo])
+        part = Path(f"year={month.year}") / f"month={month.month:02d}" / f"{f.stem}.parquet"
+        (station_dir / part).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.table({"time": times[lo:hi], "depth_m": depth[lo:hi]}), station_dir / part)
+        parts.append(str(part))
+    return parts
+
+
+def convert_to_store(data_path: Path, station_name: str, store_dir: Path = STORE_DIR,
+                     executor: Executor | None = None, catalog_path: Path | None = None):
+    """Convert a station's NetCDF archive into the time-partitioned Parquet store.
+
+    Uses the same extraction as `load_station` (in-range `botsflu_meandepth` as
+    positive depth). Conversion is incremental: a manifest records each source
+    file's size and mtime, and only new or changed files are (re)written.
+
+    Args:
+        data_path: Directory holding the station's 15s NetCDF files
+        station_name: Station name used for the `station=` partition
+        store_dir: Root of the store
+        executor: Optional process pool for converting files in parallel
+        catalog_path: Optional file catalog used to list the station's files
+    """
+    station_dir = store_dir / f"station={station_name}"
+    station_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = station_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    nc_files = select_files(data_path, station_name, catalog_path=catalog_path)
+
+    def identity(f: Path) -> list:
+        stat = f.stat()
+        return [stat.st_size, stat.st_mtime_ns, TIME_START, TIME_END]
+
+    to_convert = [f for f in nc_files
+                  if manifest.get(str(f.resolve()), {}).get("identity") != identity(f)]
+    print(f"{station_name}: {len(nc_files) - len(to_convert)} files already in store, "
+          f"{len(to_convert)} to convert")
+
+    # Drop parts written from earlier versions of the files being reconverted
+    for f in to_convert:
+        for part in manifest.pop(str(f.resolve()), {}).get("parts", []):
+            (station_dir / part).unlink(missing_ok=True)
+
+    mapper = map if executor is None else executor.map
+    results = mapper(_convert_file, to_convert, [station_dir] * len(to_convert),
+                     [_time_bounds()] * len(to_convert))
+    for i, (f, parts) in enumerate(zip(to_convert, results)):
+        if i % 50 == 0:
+            print(f"  {station_name}: converting file {i+1}/{len(to_convert)}...")
+        manifest[str(f.resolve())] = {"identity": identity(f), "parts": parts}
+
+    manifest_path.write_text(json.dumps(manifest))
+
+
+def iter_store_samples(station_name: str, start: pd.Timestamp, end: pd.Timestamp,
+                       store_dir: Path = STORE_DIR, overlap: str = OVERLAP_POLICY
+                       ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield a station's (times, depth) samples from the store in time order, month by month.
+
+    Only month partitions overlapping [start, end] are opened, and parts are read
+    memory-mapped. Parts are named after their source file, so overlapping files
+    are ranked and resolved exactly as in `iter_raw_samples`.
+    """
+    station_dir = store_dir / f"station={station_name}"
+    month_dirs = sorted(station_dir.glob("year=*/month=*"))
+    sources = sorted({part.stem for month_dir in month_dirs for part in month_dir.glob("*.parquet")})
+    ranks = dict(zip(sources, _file_ranks([Path(stem) for stem in sources])))
+
+    def pieces():
+        time_filter = [("time", ">=", start), ("time", "<=", end)]
+        for month_dir in month_dirs:
+            year = int(month_dir.parent.name.split("=")[1])
+            month = int(month_dir.name.split("=")[1])
+            month_start = pd.Timestamp(year=year, month=month, day=1)
+            if month_start > end or month_start + pd.offsets.MonthBegin(1) <= start:
+                continue
+            for part in sorted(month_dir.glob("*.parquet"), key=lambda p: p.name):
+                table = pq.read_table(part, memory_map=True, filters=time_filter)
+                yield ranks[part.stem], table.column("time").to_numpy(), table.column("depth_m").to_numpy()
+
+    yield from _resolve_overlaps(pieces(), overlap)
+
+
+class HourlyChunkCache:
+    """On-disk cache of per-file hourly depth chunks.
+
+    OOI only appends new deployment files, so a file whose path, size and
+    modification time are unchanged always resamples to the same hourly chunk.
+    Chunks are stored as Parquet files under `cache_dir` with a JSON manifest;
+    a changed file gets a new key and its stale chunk is dropped. When the
+    cache grows beyond `max_bytes`, least recently used chunks are evicted.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = HOURLY_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.manifest_path = cache_dir / "manifest.json"
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self.manifest_path.exists():
+            self.entries = json.loads(self.manifest_path.read_text())
+        else:
+            self.entries = {}
+
+    @staticmethod
+    def key(f: Path) -> str:
+        """Cache key from file identity, time range and extraction version."""
+        stat = f.stat()
+        identity = (f"{f.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|"
+                    f"{TIME_START}|{TIME_END}|{HOURLY_CACHE_VERSION}")
+        return hashlib.sha1(identity.encode()).hexdigest()
+
+    def get(self, f: Path) -> pd.DataFrame | None:
+        """Return the cached hourly chunk (`depth_m`, `count`) for a file, or None on a miss."""
+        key = self.key(f)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        chunk_path = self.cache_dir / entry["chunk"]
+        if not chunk_path.exists():
+            with self._lock:
+                self.entries.pop(key, None)
+            return None
+        with self._lock:
+            entry["last_used"] = time.time()
+        return pd.read_parquet(chunk_path)
+
+    def put(self, f: Path, hourly: pd.DataFrame | None):
+        """Store a file's hourly chunk (an empty chunk if the file had no data in range)."""
+        key = self.key(f)
+        source = str(f.resolve())
+        if hourly is None:
+            hourly = pd.DataFrame({"depth_m": pd.Series([], dtype="float64"),
+                                   "count": pd.Series([], dtype="int64")}, index=pd.DatetimeIndex([]))
+        chunk_path = self.cache_dir / f"{key}.parquet"
+        hourly.to_parquet(chunk_path)
+
+        with self._lock:
+            # A changed file invalidates its previous chunk
+            stale = [k for k, e in self.entries.items() if e["source"] == source and k != key]
+            for k in stale:
+                (self.cache_dir / self.entries.pop(k)["chunk"]).unlink(missing_ok=True)
+            self.entries[key] = {
+                "source": source,
+                "chunk": chunk_path.name,
+                "bytes": chunk_path.stat().st_size,
+                "last_used": time.time(),
+            }
+
+    def save(self):
+        """Evict least recently used chunks above `max_bytes` and write the manifest."""
+        with self._lock:
+            total = sum(e["bytes"] for e in self.entries.values())
+            for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                entry = self.entries.pop(key)
+                (self.cache_dir / entry["chunk"]).unlink(missing_ok=True)
+                total -= entry["bytes"]
+
+            tmp_path = self.manifest_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(self.entries))
+            os.replace(tmp_path, self.manifest_path)
+
+
+def select_files(data_path: Path, station_name: str, since: pd.Timestamp | None = None,
+                 catalog_path: Path | None = None) -> list[Path]:
+    """A station's 15s NetCDF files covering the time range, in filename order.
+
+    Args:
+        data_path: Directory holding the station's 15s NetCDF files
+        station_name: Station name used in the catalog
+        since: Optional start time; files ending before it are skipped
+        catalog_path: Optional file catalog; when given, files are selected by their
+            actual time coverage instead of the year in their filename
+    """
+    if catalog_path is not None:
+        update_catalog(data_path, station_name, catalog_path)
+        start, end = _time_bounds()
+        if since is not None:
+            start = max(start, since)
+        return catalog_files(station_name, start, end, catalog_path, data_path)
+
+    nc_files = filter_files_by_time_range(sorted(data_path.glob("*.nc")))
+    if since is not None:
+        nc_files = [f for f in nc_files
+                    if (span := _file_time_span(f)) is None or span[1] >= since]
+    return nc_files
+
+
+def _hourly_from_samples(samples: Iterable[tuple[np.ndarray, np.ndarray]], station_name: str,
+                         raw_qc: bool, dtype: str = "float64", skip_gaps: bool = False,
+                         despike: bool = True) -> pd.Series:
+    """Average a stream of 15s samples to hourly (stored as `dtype`) and despike.
+
+    With `raw_qc` the samples are despiked before averaging; otherwise the hourly
+    means are despiked (unless `despike` is False), as for NetCDF input. With
+    `skip_gaps`, hours flagged as gaps are set to NaN before despiking.
+    """
+    if raw_qc:
+        despiker = StreamingDespiker(RAW_QC_WINDOW_SAMPLES, RAW_QC_THRESHOLD)
+        hourly = hourly_means(despike_stream(samples, despiker=despiker))
+    else:
+        hourly = hourly_means(samples)
+    result = _hourly_depth(hourly, dtype, skip_gaps)
+    print(f"{station_name}: {len(result)} hourly observations")
+
+    if raw_qc:
+        if despiker.n_spikes > 0:
+            print(f"    Removed {despiker.n_spikes} raw spikes "
+                  f"({100*despiker.n_spikes/despiker.n_samples:.2f}%)")
+        return result
+    if not despike:
+        return result
+
+    # Remove spikes using 24-hour rolling window, MAD threshold
+    return remove_spikes(result, window_hours=STATION_SPIKE_WINDOW, threshold=STATION_SPIKE_THRESHOLD,
+                         inplace=True)
+
+
+def _hourly_depth(hourly: pd.DataFrame, dtype: str, skip_gaps: bool) -> pd.Series:
+    """Depth column of an hourly record as `dtype`, optionally with gap hours set to NaN."""
+    depth = hourly["depth_m"].astype(dtype).rename(None)
+    return depth.where(~hourly["gap"]) if skip_gaps else depth
+
+
+def load_station(data_path: Path, station_name: str, executor: Executor | None = None,
+                 cache: HourlyChunkCache | None = None, since: pd.Timestamp | None = None,
+                 raw_qc: bool = False, catalog_path: Path | None = None,
+                 store_dir: Path | None = None, dtype: str = "float64",
+                 overlap: str = OVERLAP_POLICY, skip_gaps: bool = False, despike: bool = True) -> pd.Series:
     """Load depth data for a station, filtered to time range, resampled to hourly.
 
     Uses OOI's 'botsflu_meandepth' variable which provides precalculated depth
     using a proper equation of state (more accurate than simple linear conversion).
     The values are negative (below sea surface convention); we take absolute value.
-    """
-    all_files = sorted(data_path.glob("*.nc"))
-    nc_files = filter_files_by_time_range(all_files)
 
+    Args:
+        data_path: Directory holding the station's 15s NetCDF files
+        station_name: Station label used in progress messages
+        executor: Optional process pool; per-file loading is spread across it.
+            Results are consumed in file order, so the output is identical to
+            a serial load.
+        cache: Optional per-file hourly cache; only new or changed files are decoded
+        since: Optional start time; files ending before it are skipped and
+            earlier hours are dropped (used for incremental exports)
+        raw_qc: Despike the native 15s samples in one streaming pass across file
+            boundaries before averaging to hourly, instead of despiking the hourly
+            means. Files are read one at a time; the pool and cache are not used.
+        catalog_path: Optional file catalog; when given, files are selected by their
+            actual time coverage instead of the year in their filename
+        store_dir: Optional columnar store (see `convert_to_store`); when given,
+            15s samples are read from it instead of from the NetCDF files
+        dtype: Storage dtype of the hourly series (LEAN_DTYPE for lean runs). Each
+            file's chunk is cast before the chunks are joined.
+        overlap: How hours recorded by overlapping files are resolved, one of
+            OVERLAP_POLICIES (see `merge_hourly_chunks`), on every input path;
+            files are ranked by `_file_ranks`
+        skip_gaps: Set hours with fewer than HOURLY_MIN_SAMPLES valid samples to
+            NaN before despiking
+        despike: Remove spikes from the hourly means; False returns them as merged
+            (qc_sweep.py applies its own settings). Ignored with `raw_qc`.
+    """
+    if store_dir is not None:
+        start, end = _time_bounds()
+        if since is not None:
+            start = max(start, since)
+        print(f"{station_name}: Loading from store")
+        return _hourly_from_samples(iter_store_samples(station_name, start, end, store_dir, overlap),
+                                    station_name, raw_qc, dtype, skip_gaps, despike)
+
+    nc_files = select_files(data_path, station_name, since, catalog_path)
     print(f"{station_name}: Loading {len(nc_files)} files")
 
+    if raw_qc:
+        return _hourly_from_samples(iter_raw_samples(nc_files, since, overlap=overlap), station_name, True,
+                                    dtype, skip_gaps)
+
+    # Look up cached chunks first; only misses are decoded
+    chunks = [cache.get(f) if cache is not None else None for f in nc_files]
+    to_decode = [f for f, chunk in zip(nc_files, chunks) if chunk is None]
+    if cache is not None:
+        print(f"  {station_name}: {len(nc_files) - len(to_decode)} cached, {len(to_decode)} to decode")
+
+    bounds = [_time_bounds()] * len(to_decode)
+    if executor is None:
+        results = map(_load_file_hourly, to_decode, bounds)
+    else:
+        results = executor.map(_load_file_hourly, to_decode, bounds)
+
+    if _run_report is not None:
+        for f, chunk in zip(nc_files, chunks):
+            if chunk is not None:
+                _run_report.add_file({"file": str(f), "station": station_name, "cached": True})
+
+    decoded = {}
+    for i, (f, (hourly, stats)) in enumerate(zip(to_decode, results)):
+        if i % 50 == 0:
+            print(f"  {station_name}: processing file {i+1}/{len(to_decode)}...")
+        if _run_report is not None:
+            _run_report.add_file({**stats, "station": station_name})
+        if cache is not None:
+            cache.put(f, hourly)
+        decoded[f] = hourly
+
+    # Merge decoded and cached chunks; files rank by deployment, newer deployments higher
     hourly_chunks = []
+    for f, chunk, rank in zip(nc_files, chunks, _file_ranks(nc_files)):
+        hourly = decoded[f] if chunk is None else chunk
+        if hourly is not None and len(hourly) > 0:
+            hourly_chunks.append((rank, hourly.astype({"depth_m": dtype})))
 
-    for i, f in enumerate(nc_files):
-        if i % 50 == 0:
-            print(f"  Processing file {i+1}/{len(nc_files)}...")
+    if not hourly_chunks:
+        print(f"{station_name}: no data in time range")
+        return pd.Series([], index=pd.DatetimeIndex([]), dtype=dtype)
 
-        # Load single file
-        ds = xr.open_dataset(f, engine="netcdf4")
-        ds = ds.swap_dims({"obs": "time"})
+    merged = merge_hourly_chunks(hourly_chunks, overlap)
+    if since is not None:
+        merged = merged[merged.index >= since]
+    result = _hourly_depth(merged, dtype, skip_gaps)
 
-        # Filter to time range
-        ds = ds.sel(time=slice(TIME_START, TIME_END))
+    n_gaps = int(merged["gap"].sum())
+    print(f"{station_name}: {len(result)} hourly observations ({n_gaps} sparse hours)")
+    if not despike:
+        return result
 
-        if len(ds.time) == 0:
-            ds.close()
-            continue
+    # Remove spikes using 24-hour rolling window, MAD threshold (the series is our own copy)
+    result = remove_spikes(result, window_hours=STATION_SPIKE_WINDOW, threshold=STATION_SPIKE_THRESHOLD,
+                           inplace=True)
 
-        # Get OOI-calculated depth (negative convention: below sea surface)
-        # Take absolute value to get positive depth
-        depth = np.abs(ds["botsflu_meandepth"].values)
-        time = ds["time"].values
-        ds.close()
+    return result
 
-        # Create series and resample to hourly
-        series = pd.Series(depth, index=pd.DatetimeIndex(time))
-        hourly = series.resample("1h").mean()
-        hourly_chunks.append(hourly)
 
-    # Concatenate all chunks
-    result = pd.concat(hourly_chunks).sort_index()
-    result = result[~result.index.duplicated(keep="first")]
+def load_stations(stations: dict[str, Path], workers: int = INGEST_WORKERS,
+                  cache: HourlyChunkCache | None = None,
+                  since: pd.Timestamp | None = None, raw_qc: bool = False,
+                  catalog_path: Path | None = None, store_dir: Path | None = None,
+                  dtype: str = "float64", overlap: str = OVERLAP_POLICY,
+                  skip_gaps: bool = False, despike: bool = True) -> dict[str, pd.Series]:
+    """Load several stations at once, sharing one process pool across their files.
 
-    print(f"{station_name}: {len(result)} hourly observations")
+    Args:
+        stations: Mapping of station name to data directory
+        workers: Number of worker processes (1 loads everything serially)
+        cache: Optional per-file hourly cache shared by all stations
+        since: Optional start time passed to `load_station`
+        raw_qc: Despike raw 15s samples while streaming (see `load_station`)
+        catalog_path: Optional file catalog used to select files by time coverage
+        store_dir: Optional columnar store to read 15s samples from instead of NetCDF
+        dtype: Storage dtype of the hourly series (see `load_station`)
+        overlap: Overlap policy for hours recorded by several files (see `load_station`)
+        skip_gaps: Set sparse hours to NaN before despiking
+        despike: Remove hourly spikes (see `load_station`)
 
-    # Remove spikes using 24-hour rolling window, MAD threshold
-    result = remove_spikes(result, window_hours=24, threshold=5.0)
+    Returns:
+        Mapping of station name to cleaned hourly depth series
+    """
+    options = dict(cache=cache, since=since, raw_qc=raw_qc, catalog_path=catalog_path,
+                   store_dir=store_dir, dtype=dtype, overlap=overlap, skip_gaps=skip_gaps,
+                   despike=despike)
+    if workers <= 1:
+        return {name: load_station(path, name, **options) for name, path in stations.items()}
 
-    return result
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            ThreadPoolExecutor(max_workers=len(stations)) as threads:
+        futures = {name: threads.submit(load_station, path, name, pool, **options)
+                   for name, path in stations.items()}
+        return {name: future.result() for name, future in futures.items()}
 
 
-def plot_depth(depth: pd.Series, station: str, filename: str, color: str):
+def decimate_minmax(x: np.ndarray, y: np.ndarray, n_columns: int) -> tuple[np.ndarray, np.ndarray]:
+    """Reduce a line to what can be drawn in `n_columns` pixel columns (M4 decimation).
+
+    For each column the first, last, minimum and maximum samples are kept in their
+    original order, so the rendered line is the same as drawing every point: spikes
+    and steps such as the 2015 eruption drop stay visible. One NaN per column that
+    has gaps is kept too, so breaks in the line still show.
+
+    Args:
+        x: Sorted sample times (datetime64) or positions
+        y: Sample values, NaN for gaps
+        n_columns: Horizontal pixel columns available for the line
+
+    Returns:
+        Tuple of (x, y) with at most 5 samples per column
+    """
+    n = len(x)
+    if n <= 4 * n_columns:
+        return x, y
+    xi = x.astype("int64").astype(float)
+    span = xi[-1] - xi[0]
+    cols = np.minimum((xi - xi[0]) / span * n_columns, n_columns - 1).astype(np.int64)
+
+    boundaries = np.flatnonzero(np.diff(cols)) + 1
+    starts = np.r_[0, boundaries]
+    ends = np.r_[boundaries, n]
+
+    gaps = np.isnan(y)
+    by_min = np.lexsort((np.where(gaps, np.inf, y), cols))
+    by_max = np.lexsort((np.where(gaps, -np.inf, y), cols))
+    nan_idx = np.flatnonzero(gaps)
+    first_nan = nan_idx[np.r_[True, cols[nan_idx][1:] != cols[nan_idx][:-1]]] if len(nan_idx) else nan_idx
+
+    keep = np.unique(np.concatenate([starts, ends - 1, by_min[starts], by_max[ends - 1], first_nan]))
+    return x[keep], y[keep]
+
+
+def _decimated(series: pd.Series, width_in: float) -> tuple[np.ndarray, np.ndarray]:
+    """Decimate a time series to the pixel width of a `width_in` inch figure."""
+    return decimate_minmax(series.index.to_numpy(), series.to_numpy(dtype=float),
+                           int(width_in * PLOT_DPI))
+
+
+def plot_depth(depth: pd.Series, station: str, filename: str, color: str,
+               figures_dir: Path | None = None):
     """Plot depth time series for a single station."""
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    figures_dir = FIGURES_DIR if figures_dir is None else figures_dir
     fig, ax = plt.subplots(figsize=(10, 4))
 
-    ax.plot(depth.index, depth.values, color=color, linewidth=0.5)
+    ax.plot(*_decimated(depth, 10), color=color, linewidth=0.5)
     ax.set_xlabel("Date")
     ax.set_ylabel("Depth (m)")
     ax.set_title(f"{station} Depth")
@@ -190,11 +1425,81 @@ def plot_depth(depth: pd.Series, station: str, filename: str, color: str):
     ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig(FIGURES_DIR / filename, dpi=150)
+    plt.savefig(figures_dir / filename, dpi=PLOT_DPI)
     plt.close()
     print(f"Saved: figures/{filename}")
 
 
+def pair_stations(pairs: list[tuple[str, str]]) -> list[str]:
+    """Stations needed for a set of (reference, target) pairs, in order of first use."""
+    return list(dict.fromkeys(name for pair in pairs for name in pair))
+
+
+def compute_differentials(depths: dict[str, pd.Series],
+                          pairs: list[tuple[str, str]] = DIFFERENTIAL_PAIRS
+                          ) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Compute every requested differential at once and return hourly and daily DataFrames.
+
+    Each pair is aligned on its own two stations: its differential covers the hours
+    where both have data, so a short-lived station only shortens the pairs it is in.
+    The shared index is the union of those hours over all pairs. For each pair,
+    depth[reference] - depth[target], i.e. uplift_target - uplift_reference (see
+    `compute_differential` for the sign convention), is written at its own hours
+    and despiked over just those rows, as a single-pair run would.
+
+    Depths and differentials share one preallocated column-major matrix in the
+    depths' dtype (float32 in lean runs), which the hourly DataFrame wraps without
+    copying; differentials are written and masked in place.
+
+    Args:
+        depths: Mapping of station name to cleaned hourly depth series
+        pairs: (reference, target) station pairs
+
+    Returns:
+        Tuple of (hourly_df, daily_df) with a depth column per station
+        (`depth_<station>_m`, NaN where the station has no data) and a column per
+        differential (see `stations.differential_column`)
+    """
+    names = pair_stations(pairs)
+    columns = [depth_column(name) for name in names] + [differential_column(*pair) for pair in pairs]
+
+    # Union over the pairs of the hours where both of a pair's stations have data
+    valid = {name: depths[name].index[depths[name].notna().to_numpy()] for name in names}
+    index = None
+    for ref, tgt in pairs:
+        both = valid[ref].intersection(valid[tgt])
+        index = both if index is None else index.union(both)
+
+    values = np.full((len(index), len(columns)), np.nan, order="F",
+                     dtype=np.result_type(*(depths[name].dtype for name in names)))
+    for i, name in enumerate(names):
+        positions = depths[name].index.get_indexer(index)
+        found = positions >= 0
+        values[found, i] = depths[name].to_numpy()[positions[found]]
+
+    # Calculate differentials: -(depth_target - depth_reference) so positive = inflation,
+    # then remove spikes over each pair's own rows
+    print("  Filtering spikes from differential signal...")
+    position = {name: i for i, name in enumerate(names)}
+    for i, (ref, tgt) in enumerate(pairs):
+        rows = ~np.isnan(values[:, position[ref]]) & ~np.isnan(values[:, position[tgt]])
+        differential = values[rows, position[ref]] - values[rows, position[tgt]]
+        is_spike = spike_mask(differential, DIFFERENTIAL_SPIKE_WINDOW, DIFFERENTIAL_SPIKE_THRESHOLD)
+        n_spikes = int(is_spike.sum())
+        if n_spikes > 0:
+            label = "" if len(pairs) == 1 else f" {tgt}-{ref}:"
+            print(f"   {label} Removed {n_spikes} spikes ({100*n_spikes/len(differential):.2f}%)")
+        differential[is_spike] = np.nan
+        values[rows, len(names) + i] = differential
+
+    combined = pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+    # Create daily version
+    daily = combined.resample("1D").mean()
+
+    return combined, daily
+
+
 def compute_differential(depth_e: pd.Series, depth_f: pd.Series) -> tuple[pd.DataFrame, pd.DataFrame]:
     """Compute differential uplift and return hourly and daily DataFrames.
 
@@ -212,48 +1517,442 @@ def compute_differential(depth_e: pd.Series, depth_f: pd.Series) -> tuple[pd.Dat
     Returns:
         Tuple of (hourly_df, daily_df) with columns for both stations and differential
     """
-    # Align on common time index
-    combined = pd.DataFrame({
-        "depth_mj03e_m": depth_e,
-        "depth_mj03f_m": depth_f
-    }).dropna()
+    return compute_differentials({"MJ03E": depth_e, "MJ03F": depth_f}, [("MJ03E", "MJ03F")])
 
-    # Calculate differential: -(depth_F - depth_E) so positive = inflation
-    # Equivalent to: uplift_F - uplift_E (Axial team convention)
-    combined["differential_m"] = -(combined["depth_mj03f_m"] - combined["depth_mj03e_m"])
 
-    # Remove spikes from the differential signal
-    print("  Filtering spikes from differential signal...")
-    combined["differential_m"] = remove_spikes(combined["differential_m"], window_hours=24, threshold=3.5)
+def _index_column(schema: pa.Schema) -> str:
+    """Name of the column holding a pandas-written product's time index."""
+    return schema.pandas_metadata["index_columns"][0]
 
-    # Create daily version
-    daily = combined.resample("1D").mean()
 
-    return combined, daily
+def _product_writer(path: Path, schema: pa.Schema) -> pq.ParquetWriter:
+    """Parquet writer for an exported product, declaring the rows sorted by time."""
+    sorting = [pq.SortingColumn(schema.get_field_index(_index_column(schema)))]
+    return pq.ParquetWriter(path, schema, write_statistics=True, sorting_columns=sorting)
+
+
+def _write_periods(writer: pq.ParquetWriter, table: pa.Table, period: str):
+    """Write a time-sorted table as one row group per calendar period ("M" or "Y")."""
+    keys = table.column(_index_column(table.schema)).to_numpy().astype(f"datetime64[{period}]")
+    bounds = np.r_[0, np.flatnonzero(keys[1:] != keys[:-1]) + 1, len(keys)]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        writer.write_table(table.slice(lo, hi - lo))
+
+
+def _write_product(df: pd.DataFrame, path: Path, period: str):
+    """Write a product sorted by time in period-aligned row groups (atomically)."""
+    table = pa.Table.from_pandas(df.sort_index(), preserve_index=True)
+    tmp_path = path.with_suffix(".tmp")
+    with _product_writer(tmp_path, table.schema) as writer:
+        _write_periods(writer, table, period)
+    os.replace(tmp_path, path)
+
+
+def _partition_dir(path: Path) -> Path:
+    """Root of a product's year-partitioned copy (hive layout, `year=YYYY/part-0.parquet`)."""
+    return path.with_suffix("")
+
+
+def _write_year_partitions(df: pd.DataFrame, path: Path, period: str, first_year: int | None = None):
+    """Write each calendar year of `df` to the product's year partition, replacing it.
+
+    `df` holds every row from `first_year` on (all rows if None); partitions of
+    those years that have no rows in `df` are removed.
+    """
+    years = set(df.index.year)
+    for year_dir in _partition_dir(path).glob("year=*"):
+        year = int(year_dir.name.split("=")[1])
+        if year not in years and (first_year is None or year >= first_year):
+            shutil.rmtree(year_dir)
+    for year, rows in df.groupby(df.index.year):
+        part = _partition_dir(path) / f"year={year}" / "part-0.parquet"
+        part.parent.mkdir(parents=True, exist_ok=True)
+        _write_product(rows, part, period)
 
 
-def export_parquet(hourly_df: pd.DataFrame, daily_df: pd.DataFrame):
-    """Export cleaned data to Parquet files for easy integration with other datasets."""
+def export_parquet(hourly_df: pd.DataFrame, daily_df: pd.DataFrame, partition_years: bool = False):
+    """Export cleaned data to Parquet files for easy integration with other datasets.
+
+    Args:
+        hourly_df: Hourly product
+        daily_df: Daily product
+        partition_years: Also write a year-partitioned copy of each product
+            (`data/differential_uplift_<product>/year=YYYY/part-0.parquet`).
+            Without it, a copy left by an earlier export is removed, as it no
+            longer matches the product and `query_products` would read it.
+    """
     hourly_path = DATA_DIR / "differential_uplift_hourly.parquet"
     daily_path = DATA_DIR / "differential_uplift_daily.parquet"
 
-    hourly_df.to_parquet(hourly_path)
-    daily_df.to_parquet(daily_path)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    for df, path, period in ((hourly_df, hourly_path, PARQUET_ROW_GROUP_PERIODS["hourly"]),
+                             (daily_df, daily_path, PARQUET_ROW_GROUP_PERIODS["daily"])):
+        _write_product(df, path, period)
+        if partition_years:
+            _write_year_partitions(df, path, period)
+        elif _partition_dir(path).is_dir():
+            shutil.rmtree(_partition_dir(path))
+            print(f"Removed stale year partitions: data/{_partition_dir(path).name}/")
 
     print(f"Exported: data/{hourly_path.name} ({len(hourly_df)} rows)")
     print(f"Exported: data/{daily_path.name} ({len(daily_df)} rows)")
+    if partition_years:
+        print(f"Exported: year partitions in data/{_partition_dir(hourly_path).name}/, "
+              f"data/{_partition_dir(daily_path).name}/")
 
 
-def plot_differential(daily_df: pd.DataFrame, filename: str):
-    """Plot differential uplift with eruption threshold and annotations.
+def incremental_bounds(path: Path, pairs: list[tuple[str, str]] = DIFFERENTIAL_PAIRS
+                       ) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+    """Where an incremental export starts rewriting a product, and where it reloads data from.
+
+    Counted in rows of each pair, from the end of the exported hourly product (see
+    INCREMENTAL_REWRITE_ROWS); the earliest bound over the pairs wins. Only the
+    trailing row groups needed to count the rows are read. A pair that ended long
+    before the others pulls the bounds back to its own last rows.
+
+    Args:
+        path: Exported hourly product
+        pairs: (reference, target) station pairs of the run
+
+    Returns:
+        Tuple of (rewrite_from, since), or None if the product is missing, lacks a
+        station of `pairs`, or is too short for an incremental run
+    """
+    if not path.exists():
+        return None
+    pf = pq.ParquetFile(path)
+    index_col = _index_column(pf.schema_arrow)
+    columns = [depth_column(name) for name in pair_stations(pairs)]
+    if any(column not in pf.schema_arrow.names for column in columns):
+        return None
+
+    needed = 2 * INCREMENTAL_REWRITE_ROWS
+    tables = []
+    for i in reversed(range(pf.metadata.num_row_groups)):
+        tables.insert(0, pf.read_row_group(i, columns=[index_col, *columns]))
+        tail = pa.concat_tables(tables)
+        present = {column: ~np.isnan(tail.column(column).to_numpy().astype("float64")) for column in columns}
+        rows = [np.flatnonzero(present[depth_column(ref)] & present[depth_column(tgt)]) for ref, tgt in pairs]
+        if all(len(r) > needed for r in rows):
+            break
+    else:
+        return None
+
+    times = tail.column(index_col).to_numpy()
+    rewrite_from = min(times[r[-INCREMENTAL_REWRITE_ROWS]] for r in rows)
+    since = min(times[r[-needed]] for r in rows)
+    return pd.Timestamp(rewrite_from), pd.Timestamp(since)
+
+
+def last_exported_timestamp(path: Path) -> pd.Timestamp | None:
+    """Latest timestamp in an exported product, read from row-group statistics."""
+    if not path.exists():
+        return None
+
+    pf = pq.ParquetFile(path)
+    col = pf.schema_arrow.get_field_index(_index_column(pf.schema_arrow))
+    maxima = []
+    for i in range(pf.metadata.num_row_groups):
+        stats = pf.metadata.row_group(i).column(col).statistics
+        if stats is None or not stats.has_min_max:
+            # No statistics; fall back to reading the time column
+            times = pf.read(columns=[_index_column(pf.schema_arrow)]).column(0)
+            return pd.Timestamp(pa.compute.max(times).as_py()) if len(times) else None
+        maxima.append(pd.Timestamp(stats.max))
+
+    return max(maxima) if maxima else None
+
+
+def _rewrite_tail(path: Path, tail: pd.DataFrame, rewrite_from: pd.Timestamp, period: str):
+    """Replace the rows at or after `rewrite_from` in a product with `tail`.
+
+    Row groups that end before `rewrite_from` are copied across unchanged. Only the
+    remaining row groups are decoded, trimmed and rewritten, one per `period`, together
+    with the new rows.
+    """
+    pf = pq.ParquetFile(path)
+    schema = pf.schema_arrow
+    index_col = _index_column(schema)
+    col = schema.get_field_index(index_col)
+    tmp_path = path.with_suffix(".tmp")
+
+    with _product_writer(tmp_path, schema) as writer:
+        affected = []
+        for i in range(pf.metadata.num_row_groups):
+            stats = pf.metadata.row_group(i).column(col).statistics
+            if stats is not None and stats.has_min_max and pd.Timestamp(stats.max) < rewrite_from:
+                writer.write_table(pf.read_row_group(i))
+            else:
+                affected.append(pf.read_row_group(i))
+
+        kept = pa.concat_tables(affected) if affected else schema.empty_table()
+        kept = kept.filter(pa.compute.less(kept.column(index_col),
+                                           pa.scalar(rewrite_from, type=schema.field(index_col).type)))
+        new_rows = pa.Table.from_pandas(tail.sort_index(), preserve_index=True)
+        new_rows = new_rows.rename_columns(schema.names).cast(schema)
+        _write_periods(writer, pa.concat_tables([kept, new_rows]), period)
+
+    os.replace(tmp_path, path)
+
+
+def append_parquet(hourly_df: pd.DataFrame, rewrite_from: pd.Timestamp):
+    """Incrementally update the exported Parquet products.
+
+    Hourly rows at or after `rewrite_from` are replaced by those in `hourly_df`;
+    daily rows are recomputed from the first affected day onward. Year partitions,
+    if the products have them, are rewritten from the first affected year onward.
+
+    Args:
+        hourly_df: Recomputed hourly rows (may start before `rewrite_from`)
+        rewrite_from: First timestamp whose values may have changed
+    """
+    hourly_path = DATA_DIR / "differential_uplift_hourly.parquet"
+    daily_path = DATA_DIR / "differential_uplift_daily.parquet"
+
+    tail = hourly_df[hourly_df.index >= rewrite_from]
+    _rewrite_tail(hourly_path, tail, rewrite_from, PARQUET_ROW_GROUP_PERIODS["hourly"])
+
+    # Daily means for every day touched by the rewritten hours
+    day_start = rewrite_from.floor("1D")
+    index_col = _index_column(pq.read_schema(hourly_path))
+    hourly_days = pd.read_parquet(hourly_path, filters=[(index_col, ">=", day_start)])
+    daily_tail = hourly_days.resample("1D").mean()
+    _rewrite_tail(daily_path, daily_tail, day_start, PARQUET_ROW_GROUP_PERIODS["daily"])
+
+    print(f"Updated: data/{hourly_path.name} ({len(tail)} rows from {rewrite_from})")
+    print(f"Updated: data/{daily_path.name} ({len(daily_tail)} rows from {day_start.date()})")
+
+    year_start = pd.Timestamp(year=rewrite_from.year, month=1, day=1)
+    for product, path in (("hourly", hourly_path), ("daily", daily_path)):
+        if _partition_dir(path).is_dir():
+            rows = pd.read_parquet(path, filters=[(_index_column(pq.read_schema(path)), ">=", year_start)])
+            _write_year_partitions(rows, path, PARQUET_ROW_GROUP_PERIODS[product], year_start.year)
+            print(f"Updated: data/{_partition_dir(path).name}/ from year={year_start.year}")
+
+
+def _product_path(product: str, data_dir: Path) -> Path:
+    """Exported product file: "hourly", "daily" or a pyramid level (PYRAMID_LEVELS)."""
+    if product in PYRAMID_LEVELS:
+        return data_dir / PYRAMID_DIR.name / f"differential_uplift_{product}.parquet"
+    if product in PARQUET_ROW_GROUP_PERIODS:
+        return data_dir / f"differential_uplift_{product}.parquet"
+    raise ValueError(f"Unknown product {product!r}: use one of "
+                     f"{list(PARQUET_ROW_GROUP_PERIODS) + PYRAMID_LEVELS}")
+
+
+def query_products(start: str | pd.Timestamp | None = None, end: str | pd.Timestamp | None = None,
+                   columns: list[str] | None = None, product: str = "hourly",
+                   data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Read a time range and a subset of columns of an exported product.
+
+    The time range is pushed down to pyarrow, which skips the row groups (and year
+    partitions, when present) whose min/max statistics lie outside it, and reads
+    only the requested columns of the rest. A month of the hourly differential
+    reads one row group of two columns.
+
+    Args:
+        start: First timestamp (inclusive), or None for the beginning of the record
+        end: End of the range (exclusive), or None for the end of the record
+        columns: Columns to read besides the time index (default: all)
+        product: "hourly", "daily" or a pyramid level ("15s", "1min", "1h", "1D", "1W")
+        data_dir: Directory holding the products (default: DATA_DIR)
+
+    Returns:
+        DataFrame indexed by time, sorted
+    """
+    path = _product_path(product, data_dir)
+    partitions = _partition_dir(path)
+    source = partitions if partitions.is_dir() else path
+    if not source.exists():
+        raise FileNotFoundError(f"No exported product at {path}: run the analysis first")
+
+    schema = pq.read_schema(next(partitions.rglob("*.parquet")) if source is partitions else path)
+    index_col = _index_column(schema)
+    filters = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters.append((index_col, ">=", start))
+        if source is partitions:
+            filters.append(("year", ">=", start.year))
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append((index_col, "<", end))
+        if source is partitions:
+            filters.append(("year", "<=", end.year))
+
+    read_columns = None if columns is None else [index_col, *columns]
+    if read_columns is None and source is partitions:
+        read_columns = schema.names
+    table = pq.read_table(source, columns=read_columns, filters=filters or None,
+                          partitioning="hive" if source is partitions else None)
+    return table.to_pandas().sort_index()
+
+
+def _bin_keys(index: pd.DatetimeIndex, freq: str) -> pd.DatetimeIndex:
+    """Start of the pyramid bin containing each timestamp (weeks start on Monday)."""
+    if freq == "1W":
+        days = index.normalize()
+        return days - pd.to_timedelta(days.weekday, unit="D")
+    return index.floor(freq)
+
+
+def _base_moments(times: np.ndarray, values: np.ndarray, freq: str) -> pd.DataFrame:
+    """Count, mean, M2 (sum of squared deviations), min and max of valid values per bin."""
+    valid = ~np.isnan(values)
+    keys = _bin_keys(pd.DatetimeIndex(times[valid]), freq)
+    grouped = pd.Series(values[valid], index=keys).groupby(level=0)
+    moments = grouped.agg(["count", "mean", "min", "max"])
+    moments["m2"] = grouped.var(ddof=0) * moments["count"]
+    return moments
+
+
+def _coarsen_moments(moments: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """Merge per-bin moments into coarser bins without revisiting the samples.
+
+    Uses the pairwise update for M2: the coarse M2 is the sum of the fine M2s plus
+    each fine bin's count times its squared offset from the coarse mean.
+    """
+    keys = _bin_keys(moments.index, freq)
+    count = moments["count"].groupby(keys).sum()
+    mean = (moments["count"] * moments["mean"]).groupby(keys).sum() / count
+    offset = moments["mean"].to_numpy() - mean.reindex(keys).to_numpy()
+    m2 = (moments["m2"] + moments["count"] * offset**2).groupby(keys).sum()
+    return pd.DataFrame({
+        "count": count,
+        "mean": mean,
+        "min": moments["min"].groupby(keys).min(),
+        "max": moments["max"].groupby(keys).max(),
+        "m2": m2,
+    })
+
+
+def _flatten_moments(moments: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Combine per-column moments into one frame of {column}_{mean,min,max,count,std}."""
+    frames = []
+    for column, m in moments.items():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std = np.sqrt(m["m2"] / (m["count"] - 1)).where(m["count"] > 1)
+        frames.append(pd.DataFrame({
+            f"{column}_mean": m["mean"],
+            f"{column}_min": m["min"],
+            f"{column}_max": m["max"],
+            f"{column}_count": m["count"],
+            f"{column}_std": std,
+        }))
+    flat = pd.concat(frames, axis=1)
+    counts = [c for c in flat.columns if c.endswith("_count")]
+    flat[counts] = flat[counts].fillna(0).astype("int64")
+    flat.index.name = "time"
+    return flat.sort_index()
+
+
+def _month_chunks(chunks: Iterable[tuple[np.ndarray, np.ndarray]]
+                  ) -> Iterator[tuple[np.datetime64, np.ndarray, np.ndarray]]:
+    """Regroup a time-ordered (times, values) stream into calendar-month chunks."""
+    current = None
+    pending = []
+    for times, values in chunks:
+        months = times.astype("datetime64[M]")
+        bounds = np.r_[0, np.flatnonzero(months[1:] != months[:-1]) + 1, len(times)]
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if current is not None and months[lo] != current:
+                yield current, np.concatenate([t for t, _ in pending]), np.concatenate([v for _, v in pending])
+                pending = []
+            current = months[lo]
+            pending.append((times[lo:hi], values[lo:hi]))
+    if pending:
+        yield current, np.concatenate([t for t, _ in pending]), np.concatenate([v for _, v in pending])
+
+
+def build_pyramid(samples: dict[str, Iterable[tuple[np.ndarray, np.ndarray]]],
+                  out_dir: Path = PYRAMID_DIR, reference: str = "MJ03E", target: str = "MJ03F"):
+    """Build the multi-resolution pyramid (15s/1min/1h/1D/1W) in one pass over the samples.
+
+    Each station's 15s stream is despiked with the raw-sample QC, regrouped by
+    calendar month, and reduced to per-bin count/mean/min/max/std. The differential
+    -(depth_target - depth_reference) is formed on the aligned 15 s bins. Coarser
+    levels are merged from the finer level's moments rather than the samples, and
+    each month is appended to `differential_uplift_<level>.parquet` as one row group.
+    The weekly level straddles months, so it is built from the daily moments at the end.
+
+    The QC is therefore that of `--raw-qc` runs (RAW_QC_WINDOW_SAMPLES, RAW_QC_THRESHOLD),
+    not the hourly despiking of the exported products: the 1h level holds the means of
+    the samples passing the raw filter, and its differential is not despiked hourly, so
+    it can differ from `differential_uplift_hourly.parquet` around spikes.
+
+    Args:
+        samples: Mapping of station name to its time-ordered (times, depth) chunks
+        out_dir: Output directory for the pyramid levels
+        reference: Station subtracted from in the differential (MJ03E, caldera rim)
+        target: Station whose uplift is measured (MJ03F, caldera center)
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    columns = {name: depth_column(name) for name in samples}
+    streams = {name: _month_chunks(despike_stream(chunks)) for name, chunks in samples.items()}
+    heads = {name: next(stream, None) for name, stream in streams.items()}
+    writers = {}
+    daily = []
+
+    def write(level: str, moments: dict[str, pd.DataFrame]):
+        table = pa.Table.from_pandas(_flatten_moments(moments), preserve_index=True)
+        if level not in writers:
+            writers[level] = pq.ParquetWriter(out_dir / f"differential_uplift_{level}.parquet", table.schema)
+        writers[level].write_table(table.cast(writers[level].schema))
+
+    def empty_moments() -> pd.DataFrame:
+        return pd.DataFrame({"count": pd.Series(dtype="int64"), "mean": [], "min": [], "max": [], "m2": []},
+                            index=pd.DatetimeIndex([], name="time"))
+
+    try:
+        while any(head is not None for head in heads.values()):
+            month = min(head[0] for head in heads.values() if head is not None)
+            moments = {}
+            for name, head in heads.items():
+                if head is not None and head[0] == month:
+                    moments[columns[name]] = _base_moments(head[1], head[2], PYRAMID_LEVELS[0])
+                    heads[name] = next(streams[name], None)
+                else:
+                    moments[columns[name]] = empty_moments()
+
+            # Differential on the 15 s bins where both stations have data
+            ref, tgt = moments[columns[reference]], moments[columns[target]]
+            both = ref.index.intersection(tgt.index)
+            diff = -(tgt.loc[both, "mean"] - ref.loc[both, "mean"])
+            moments[differential_column(reference, target)] = pd.DataFrame(
+                {"count": 1, "mean": diff, "min": diff, "max": diff, "m2": 0.0}, index=both)
+
+            print(f"  Pyramid: {pd.Timestamp(month):%Y-%m}")
+            write(PYRAMID_LEVELS[0], moments)
+            for level in PYRAMID_LEVELS[1:-1]:
+                moments = {column: _coarsen_moments(m, level) for column, m in moments.items()}
+                write(level, moments)
+            daily.append(moments)
+
+        if daily:
+            weekly = {column: _coarsen_moments(pd.concat([d[column] for d in daily]), PYRAMID_LEVELS[-1])
+                      for column in daily[0]}
+            write(PYRAMID_LEVELS[-1], weekly)
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    for level in writers:
+        print(f"Exported: data/{out_dir.name}/differential_uplift_{level}.parquet")
+
+
+def differential_metrics(daily_df: pd.DataFrame) -> dict:
+    """Reference the daily differential to the 2015 eruption threshold.
 
     Data is referenced to the 2015 pre-eruption threshold, so:
     - 0 = the 2015 eruption threshold
     - Positive values = inflation above threshold
     - Negative values = deflation below threshold
 
-    The plotted quantity is (uplift_F - uplift_E), equivalent to -(depth_F - depth_E).
-    This matches the Axial team convention where positive = inflation at caldera center.
+    Returns:
+        Dict with the referenced series (`uplift_referenced`), the raw threshold
+        (`threshold_2015`), the post-eruption low (`low_2015_ref`), the
+        co-eruption deflation (`deflation_magnitude`) and the latest value
+        (`current_value`)
     """
     uplift_daily = daily_df["differential_m"]
 
@@ -269,10 +1968,34 @@ def plot_differential(daily_df: pd.DataFrame, filename: str):
     # Find post-eruption low for deflation magnitude (in referenced coordinates)
     post_eruption = uplift_referenced["2015-04-24":"2015-06-01"]
     low_2015_ref = post_eruption.min()
-    deflation_magnitude = -low_2015_ref  # Make positive for display
 
-    # Current state relative to threshold
-    current_value = uplift_referenced.iloc[-1]
+    return {
+        "uplift_referenced": uplift_referenced,
+        "threshold_2015": threshold_2015,
+        "low_2015_ref": low_2015_ref,
+        "deflation_magnitude": -low_2015_ref,  # Make positive for display
+        # Current state relative to threshold
+        "current_value": uplift_referenced.iloc[-1],
+    }
+
+
+def plot_differential(daily_df: pd.DataFrame, filename: str, figures_dir: Path | None = None):
+    """Plot differential uplift with eruption threshold and annotations.
+
+    The plotted quantity is (uplift_F - uplift_E), equivalent to -(depth_F - depth_E),
+    referenced to the 2015 eruption threshold (see `differential_metrics`).
+    This matches the Axial team convention where positive = inflation at caldera center.
+    """
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    figures_dir = FIGURES_DIR if figures_dir is None else figures_dir
+    metrics = differential_metrics(daily_df)
+    uplift_referenced = metrics["uplift_referenced"]
+    threshold_2015 = metrics["threshold_2015"]
+    low_2015_ref = metrics["low_2015_ref"]
+    deflation_magnitude = metrics["deflation_magnitude"]
+    current_value = metrics["current_value"]
 
     print(f"  2015 eruption threshold (reference datum): {threshold_2015:.2f} m (raw)")
     print(f"  Co-eruption deflation: {deflation_magnitude:.2f} m below threshold")
@@ -292,7 +2015,7 @@ def plot_differential(daily_df: pd.DataFrame, filename: str):
     fig, ax = plt.subplots(figsize=(12, 5))
 
     # Plot the referenced data
-    ax.plot(uplift_referenced.index, uplift_referenced.values,
+    ax.plot(*_decimated(uplift_referenced, 12),
             color="#2E86AB", linewidth=1, label="Daily mean")
 
     # Add reference line at threshold (0)
@@ -336,7 +2059,7 @@ def plot_differential(daily_df: pd.DataFrame, filename: str):
     ax.legend(loc="upper left", framealpha=0.9, fontsize=9)
 
     plt.tight_layout()
-    plt.savefig(FIGURES_DIR / filename, dpi=150, facecolor="white", edgecolor="none")
+    plt.savefig(figures_dir / filename, dpi=PLOT_DPI, facecolor="white", edgecolor="none")
     plt.close()
 
     # Reset rcParams
@@ -345,34 +2068,290 @@ def plot_differential(daily_df: pd.DataFrame, filename: str):
     print(f"Saved: figures/{filename}")
 
 
-def main():
+def _content_hash(*parts) -> str:
+    """Hash plot inputs: index and values of Series/DataFrames, repr of anything else."""
+    digest = hashlib.sha256(str(PLOT_RENDER_VERSION).encode())
+    for part in parts:
+        if isinstance(part, (pd.Series, pd.DataFrame)):
+            digest.update(part.index.to_numpy().tobytes())
+            frame = part.to_frame() if isinstance(part, pd.Series) else part
+            for name, column in frame.items():
+                digest.update(str(name).encode())
+                digest.update(column.to_numpy().tobytes())
+        else:
+            digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+
+def render_figures(figures: list[tuple], workers: int = 1, figures_dir: Path | None = None):
+    """Render figures in parallel, skipping those whose inputs have not changed.
+
+    Input hashes are kept in `render_manifest.json` in the figures directory; a
+    figure is redrawn only if its hash changed or its file is missing. Each plot
+    runs in its own process, as pyplot is not thread-safe.
+
+    Args:
+        figures: (plot function, positional args) pairs, e.g. (plot_depth, (depth, station,
+            filename, color)); the plot function must take `filename` and `figures_dir`
+        workers: Processes to render with (1 = serial)
+        figures_dir: Output directory (default: FIGURES_DIR)
+    """
+    figures_dir = FIGURES_DIR if figures_dir is None else figures_dir
+    manifest_path = figures_dir / "render_manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    pending = {}
+    for plot, args in figures:
+        filename = inspect.signature(plot).bind(*args).arguments["filename"]
+        digest = _content_hash(plot.__name__, *args)
+        if manifest.get(filename) == digest and (figures_dir / filename).exists():
+            print(f"Unchanged: figures/{filename}")
+            continue
+        pending[filename] = (plot, args, digest)
+
+    figures_dir.mkdir(parents=True, exist_ok=True)
+    if workers <= 1 or len(pending) <= 1:
+        for plot, args, _ in pending.values():
+            plot(*args, figures_dir=figures_dir)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = [pool.submit(plot, *args, figures_dir=figures_dir)
+                       for plot, args, _ in pending.values()]
+            for future in futures:
+                future.result()
+
+    manifest.update({filename: digest for filename, (_, _, digest) in pending.items()})
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+
+def _parse_pair(text: str) -> tuple[str, str]:
+    """Parse a REFERENCE:TARGET station pair from the command line."""
+    pair = tuple(text.split(":"))
+    if len(pair) != 2 or any(name not in STATIONS for name in pair):
+        raise argparse.ArgumentTypeError(f"expected REFERENCE:TARGET with stations from {list(STATIONS)}")
+    return pair
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Differential uplift analysis for Axial Seamount")
+    parser.add_argument("command", nargs="?", choices=["run", "convert", "pyramid", "plot"], default="run",
+                        help="run the analysis (default), convert the NetCDF archive to the 15s store, "
+                             "build the resolution pyramid (despiked with the raw-sample QC of --raw-qc, "
+                             "so its 1h level differs from the hourly product around spikes), "
+                             "or redraw the figures from the exported products")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS,
+                        help=f"worker processes for NetCDF ingestion (default: {INGEST_WORKERS}, 1 = serial)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="decode every NetCDF file instead of reusing cached hourly chunks")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only process data newer than the existing Parquet exports")
+    parser.add_argument("--raw-qc", action="store_true",
+                        help="despike the raw 15s samples (streaming) instead of the hourly means")
+    parser.add_argument("--no-catalog", action="store_true",
+                        help="select files by the year in their name instead of the time-coverage catalog")
+    parser.add_argument("--from-store", action="store_true",
+                        help="read 15s samples from the columnar store built by 'convert'")
+    parser.add_argument("--pairs", type=_parse_pair, nargs="+", default=DIFFERENTIAL_PAIRS,
+                        metavar="REFERENCE:TARGET",
+                        help="station pairs to difference (default: "
+                             + " ".join(f"{ref}:{tgt}" for ref, tgt in DIFFERENTIAL_PAIRS)
+                             + "); stations are listed in stations.py")
+    parser.add_argument("--overlap", choices=OVERLAP_POLICIES, default=OVERLAP_POLICY,
+                        help="for hours recorded by overlapping files, keep the newer deployment "
+                             f"or average them (default: {OVERLAP_POLICY})")
+    parser.add_argument("--skip-gaps", action="store_true",
+                        help=f"drop hours with fewer than {HOURLY_MIN_SAMPLES} valid samples")
+    parser.add_argument("--lean", action="store_true",
+                        help=f"store hourly depths and differentials as {LEAN_DTYPE} to reduce memory")
+    parser.add_argument("--partition-years", action="store_true",
+                        help="also export year-partitioned copies of the products (data/<product>/year=YYYY/)")
+    parser.add_argument("--no-plots", action="store_true", help="export the products without drawing figures")
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"], default=None,
+                        help="profile the run and save the profile next to the run report")
+    config.apply_defaults(parser, "analysis")
+    return parser.parse_args(argv)
+
+
+def convert(workers: int = INGEST_WORKERS, catalog_path: Path | None = CATALOG_PATH,
+            names: list[str] | None = None):
+    """Convert stations' NetCDF archives (default: those in DIFFERENTIAL_PAIRS) into the 15s store."""
+    names = pair_stations(DIFFERENTIAL_PAIRS) if names is None else names
+    stations = {name: station_path(name) for name in names}
+    print(f"Converting NetCDF archive to {STORE_DIR} with {workers} worker(s)...")
+    if workers <= 1:
+        for name, path in stations.items():
+            convert_to_store(path, name, STORE_DIR, catalog_path=catalog_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            ThreadPoolExecutor(max_workers=len(stations)) as threads:
+        futures = [threads.submit(convert_to_store, path, name, STORE_DIR, pool, catalog_path)
+                   for name, path in stations.items()]
+        for future in futures:
+            future.result()
+
+
+@contextlib.contextmanager
+def _profiled(profiler: str | None):
+    """Profile the enclosed block with cProfile or pyinstrument, saving next to the run report."""
+    if profiler is None:
+        yield
+    elif profiler == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            path = RUN_REPORT_PATH.with_suffix(".prof")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(path)
+            print(f"\nSaved: {path.name} (top functions by cumulative time)")
+            pstats.Stats(profile).sort_stats("cumulative").print_stats(15)
+    else:
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("--profile pyinstrument needs pyinstrument (pip install pyinstrument)")
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            path = RUN_REPORT_PATH.with_suffix(".html")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(profile.output_html())
+            print(f"\nSaved: {path.name}")
+
+
+def run(args: argparse.Namespace, report: RunReport):
+    """Run the analysis, timing each stage into `report`."""
     print("=" * 60)
     print("Differential Uplift Analysis - Axial Seamount")
     print(f"Time range: {TIME_START} to {TIME_END}")
     print("Convention: Positive = inflation at caldera center")
     print("=" * 60)
 
-    # Load data (processes file by file to manage memory)
-    print("\nLoading MJ03E (Eastern Caldera)...")
-    depth_e = load_station(MJ03E_PATH, "MJ03E")
-
-    print("\nLoading MJ03F (Central Caldera)...")
-    depth_f = load_station(MJ03F_PATH, "MJ03F")
+    # Incremental mode: only reload data overlapping the trailing rolling windows
+    hourly_path = DATA_DIR / "differential_uplift_hourly.parquet"
+    bounds = incremental_bounds(hourly_path, args.pairs) if args.incremental else None
+    since = None
+    if bounds is not None:
+        rewrite_from, since = bounds
+        if args.raw_qc:
+            # The raw filter counts 15 s samples; reach back a further full window of them
+            since -= pd.Timedelta(seconds=RAW_QC_WINDOW_SAMPLES * RAW_SAMPLE_SECONDS)
+        print(f"\nIncremental run: last exported {last_exported_timestamp(hourly_path)}, "
+              f"recomputing from {rewrite_from}")
+    elif args.incremental:
+        print("\nNo usable exported product for an incremental run; processing the full range")
+
+    # Load all stations at once (each file is still processed on its own to manage memory)
+    names = pair_stations(args.pairs)
+    described = ", ".join(f"{name} ({STATIONS[name]['name']})" for name in names)
+    print(f"\nLoading {described} with {args.workers} worker(s)...")
+    cache = None if args.no_cache else HourlyChunkCache(CACHE_DIR / "hourly")
+    with report.stage("load") as stage:
+        depths = load_stations({name: station_path(name) for name in names}, workers=args.workers,
+                               cache=cache, since=since, raw_qc=args.raw_qc,
+                               catalog_path=None if args.no_catalog else CATALOG_PATH,
+                               store_dir=STORE_DIR if args.from_store else None,
+                               dtype=LEAN_DTYPE if args.lean else "float64",
+                               overlap=args.overlap, skip_gaps=args.skip_gaps)
+        if cache is not None:
+            cache.save()
+        stage["rows_in"] = sum(f.get("rows_in", 0) for f in report.files)
+        stage["rows_out"] = sum(len(depth) for depth in depths.values())
 
     # Compute differential uplift
     print("\nComputing differential uplift...")
-    hourly_df, daily_df = compute_differential(depth_e, depth_f)
+    with report.stage("differential", rows_in=sum(len(depth) for depth in depths.values())) as stage:
+        hourly_df, daily_df = compute_differentials(depths, args.pairs)
+        stage["rows_out"] = len(hourly_df)
 
     # Export to Parquet
     print("\nExporting data...")
-    export_parquet(hourly_df, daily_df)
+    with report.stage("export", rows_in=len(hourly_df)) as stage:
+        if bounds is None:
+            export_parquet(hourly_df, daily_df, args.partition_years)
+        else:
+            append_parquet(hourly_df, rewrite_from)
+            # Plots need the full record, so read it back from the updated products
+            hourly_df = pd.read_parquet(hourly_path)
+            daily_df = pd.read_parquet(DATA_DIR / "differential_uplift_daily.parquet")
+            depths = {name: hourly_df[depth_column(name)] for name in names}
+        stage["rows_out"] = len(hourly_df) + len(daily_df)
+
+    if args.no_plots:
+        return
 
     # Generate plots
     print("\nGenerating plots...")
-    plot_depth(depth_e, "MJ03E (Eastern Caldera)", "depth_mj03e.png", "blue")
-    plot_depth(depth_f, "MJ03F (Central Caldera)", "depth_mj03f.png", "red")
-    plot_differential(daily_df, "differential_uplift.png")
+    with report.stage("plots", rows_in=len(hourly_df) * len(names) + len(daily_df)):
+        render_figures(_figures(depths, daily_df), workers=args.workers)
+
 
+def _figures(depths: dict[str, pd.Series], daily_df: pd.DataFrame) -> list[tuple]:
+    """Figure list for `render_figures`: each station's depth, then the headline differential."""
+    figures = [(plot_depth, (depth, f"{name} ({STATIONS[name]['name']})",
+                             f"depth_{name.lower()}.png", STATIONS[name]["color"]))
+               for name, depth in depths.items()]
+    if "differential_m" in daily_df:
+        figures.append((plot_differential, (daily_df, "differential_uplift.png")))
+    return figures
+
+
+def plot_products(names: list[str], workers: int = 1):
+    """Redraw the figures from the exported Parquet products, without reprocessing."""
+    hourly_path = DATA_DIR / "differential_uplift_hourly.parquet"
+    if not hourly_path.exists():
+        raise SystemExit(f"No exported products in {DATA_DIR}: run the analysis first")
+    hourly_df = pd.read_parquet(hourly_path)
+    daily_df = pd.read_parquet(DATA_DIR / "differential_uplift_daily.parquet")
+    depths = {name: hourly_df[depth_column(name)] for name in names if depth_column(name) in hourly_df}
+    render_figures(_figures(depths, daily_df), workers=workers)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
+    if args.command == "convert":
+        convert(args.workers, None if args.no_catalog else CATALOG_PATH, pair_stations(args.pairs))
+        print("\nDone!")
+        return
+
+    if args.command == "plot":
+        print("Generating plots from the exported products...")
+        plot_products(pair_stations(args.pairs), args.workers)
+        print("\nDone!")
+        return
+
+    if args.command == "pyramid":
+        # The pyramid holds the headline (first) pair
+        reference, target = args.pairs[0]
+        stations = {name: station_path(name) for name in (reference, target)}
+        if args.from_store:
+            start, end = _time_bounds()
+            samples = {name: iter_store_samples(name, start, end, overlap=args.overlap) for name in stations}
+        else:
+            catalog_path = None if args.no_catalog else CATALOG_PATH
+            samples = {name: iter_raw_samples(select_files(path, name, catalog_path=catalog_path),
+                                              overlap=args.overlap)
+                       for name, path in stations.items()}
+        print("Building resolution pyramid...")
+        build_pyramid(samples, reference=reference, target=target)
+        print("\nDone!")
+        return
+
+    global _run_report
+    _run_report = RunReport()
+    try:
+        with _profiled(args.profile):
+            run(args, _run_report)
+        _run_report.write(RUN_REPORT_PATH)
+    finally:
+        _run_report = None
     print("\nDone!")
 
 
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+benchmarks.py - Performance benchmarks for the BOTPT analysis pipeline
+
+Pipeline suite:
+    Generates synthetic OOI-style archives (see synthetic_botpt.py) at several
+    sizes and times each pipeline stage: filter_files_by_time_range,
+    load_station, remove_spikes, compute_differential, export_parquet and the
+    plots. Reports wall time, throughput and peak traced memory per stage, and
+    saves the results as JSON under outputs/benchmarks/. Pass --compare with an
+    earlier results file to flag regressions.
+
+Reader benchmark:
+    Compares the original xarray reader (open the full Dataset, swap_dims,
+    .sel the time range) with the lean netCDF4 reader in analysis.py, which
+    reads only `time` and the in-range slice of `botsflu_meandepth`. Each reader
+    runs in its own process so peak RSS is measured independently.
+
+Memory benchmark:
+    Runs load, differential and export over a synthetic archive covering the
+    full TIME_START..TIME_END range (15 s samples, both stations), once per
+    mode (hourly or raw-sample QC, float64 or --lean) in its own process, and
+    checks the lean runs' peak RSS against LEAN_PEAK_RSS_TARGET_MB.
+
+Usage:
+    uv run python benchmarks.py suite [--days 30 180 365] [--repeat 3] [--compare results.json]
+    uv run python benchmarks.py reader <netcdf file or directory> [--files N] [--repeat N]
+    uv run python benchmarks.py memory [--days N]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+
+import analysis
+import synthetic_botpt
+
+BENCHMARK_DIR = analysis.OUTPUT_DIR / "benchmarks"
+
+# Archive sizes (days of 15s data per station) for the pipeline suite
+SUITE_DAYS = [30, 180, 365]
+
+# A stage is flagged as a regression when it is this much slower than the baseline
+REGRESSION_TOLERANCE = 1.2
+
+
+def read_file_samples_xarray(f: Path) -> tuple[np.ndarray, np.ndarray] | None:
+    """Original per-file reader, kept as the benchmark baseline."""
+    import xarray as xr
+
+    ds = xr.open_dataset(f, engine="netcdf4")
+    ds = ds.swap_dims({"obs": "time"})
+    ds = ds.sel(time=slice(analysis.TIME_START, analysis.TIME_END))
+
+    if len(ds.time) == 0:
+        ds.close()
+        return None
+
+    depth = np.abs(ds["botsflu_meandepth"].values)
+    time_values = ds["time"].values
+    ds.close()
+    return time_values, depth
+
+
+READERS = {
+    "xarray": read_file_samples_xarray,
+    "netcdf4": analysis._read_file_samples,
+}
+
+
+def _time_reader(reader: str, files: list[Path], repeat: int, results):
+    """Run one reader over the files in a fresh process and report timing and peak RSS."""
+    read = READERS[reader]
+    timings = []
+    n_samples = 0
+    for _ in range(repeat):
+        for f in files:
+            t0 = time.perf_counter()
+            samples = read(f)
+            timings.append(time.perf_counter() - t0)
+            if samples is not None:
+                n_samples += len(samples[0])
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put({
+        "reader": reader,
+        "files": len(files),
+        "median_s_per_file": float(np.median(timings)),
+        "total_s": float(np.sum(timings)),
+        "samples_per_s": n_samples / float(np.sum(timings)),
+        "peak_rss_mb": peak_rss_mb,
+    })
+
+
+def benchmark_reader(path: Path, n_files: int | None = None, repeat: int = 1) -> list[dict]:
+    """Compare the xarray and netCDF4 readers on the same files."""
+    files = sorted(path.glob("*.nc")) if path.is_dir() else [path]
+    files = files[:n_files] if n_files else files
+    print(f"Reader benchmark: {len(files)} file(s), {repeat} repeat(s)")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for reader in READERS:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_time_reader, args=(reader, files, repeat, queue))
+        proc.start()
+        results.append(queue.get())
+        proc.join()
+
+    print(f"  {'reader':<10} {'median s/file':>14} {'samples/s':>14} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"  {r['reader']:<10} {r['median_s_per_file']:>14.4f} "
+              f"{r['samples_per_s']:>14,.0f} {r['peak_rss_mb']:>12.1f}")
+    return results
+
+
+def _pipeline_peak_rss(paths: dict[str, Path], data_dir: Path, raw_qc: bool, dtype: str, results):
+    """Run load, differential and export in a fresh process and report peak RSS."""
+    analysis.DATA_DIR = data_dir
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        depths = analysis.load_stations(paths, workers=1, raw_qc=raw_qc, dtype=dtype)
+        hourly_df, daily_df = analysis.compute_differentials(depths)
+        analysis.export_parquet(hourly_df, daily_df)
+    results.put({
+        "raw_qc": raw_qc,
+        "dtype": dtype,
+        "wall_s": time.perf_counter() - t0,
+        "hourly_rows": len(hourly_df),
+        "hourly_mb": hourly_df.memory_usage(deep=True).sum() / 1024**2,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    })
+
+
+def benchmark_memory(days: int | None = None) -> list[dict]:
+    """Peak RSS of the pipeline at 15 s resolution, default and lean, over the full time range."""
+    start = pd.Timestamp(analysis.TIME_START)
+    days = days or (pd.Timestamp(analysis.TIME_END) - start).days
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"Synthetic archive: {days} days per station from {start:%Y-%m-%d}")
+        paths = {station: tmp / "kdata" / station for station in ("MJ03E", "MJ03F")}
+        for station, path in paths.items():
+            synthetic_botpt.write_synthetic_archive(path, station, start=analysis.TIME_START,
+                                                    days=days, file_days=30)
+        (tmp / "data").mkdir()
+
+        for raw_qc in (False, True):
+            for dtype in ("float64", analysis.LEAN_DTYPE):
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_pipeline_peak_rss, args=(paths, tmp / "data", raw_qc, dtype, queue))
+                proc.start()
+                results.append(queue.get())
+                proc.join()
+
+    print(f"  {'mode':<18} {'wall s':>8} {'hourly MB':>10} {'peak RSS MB':>12}")
+    for r in results:
+        mode = f"{'raw-qc' if r['raw_qc'] else 'hourly'} {r['dtype']}"
+        over = r["dtype"] == analysis.LEAN_DTYPE and r["peak_rss_mb"] > analysis.LEAN_PEAK_RSS_TARGET_MB
+        print(f"  {mode:<18} {r['wall_s']:>8.1f} {r['hourly_mb']:>10.1f} {r['peak_rss_mb']:>12.1f}"
+              + ("  OVER TARGET" if over else ""))
+    print(f"Lean target: {analysis.LEAN_PEAK_RSS_TARGET_MB} MB peak RSS")
+    return results
+
+
+def _measure(fn, *args, repeat: int = 3):
+    """Best-of-`repeat` wall time, then one traced run for peak Python/NumPy memory.
+
+    Stage output is suppressed so progress messages do not skew timings.
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            result = fn(*args)
+            timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, min(timings), peak / 1024**2
+
+
+def benchmark_suite(sizes_days: list[int], repeat: int = 3) -> list[dict]:
+    """Time every pipeline stage on synthetic archives of each size."""
+    results = []
+    for days in sizes_days:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            print(f"\nSynthetic archive: {days} days per station")
+            paths = {station: tmp / "kdata" / station for station in ("MJ03E", "MJ03F")}
+            for station, path in paths.items():
+                synthetic_botpt.write_synthetic_archive(path, station, days=days, file_days=30)
+
+            analysis.DATA_DIR = tmp / "data"
+            analysis.FIGURES_DIR = tmp / "figures"
+            analysis.DATA_DIR.mkdir()
+            analysis.FIGURES_DIR.mkdir()
+
+            all_files = sorted(paths["MJ03E"].glob("*.nc"))
+            n_raw = sum(analysis._read_file_samples(f)[0].size for f in all_files)
+
+            def record(stage: str, fn, *args, items: int, unit: str):
+                result, wall, peak_mb = _measure(fn, *args, repeat=repeat)
+                throughput = items / wall if wall > 0 else float("inf")
+                results.append({
+                    "days": days, "stage": stage, "wall_s": wall, "items": items, "unit": unit,
+                    "throughput_per_s": throughput, "peak_traced_mb": peak_mb,
+                })
+                print(f"  {stage:<28} {wall:>9.4f} s {throughput:>14,.0f} {unit}/s {peak_mb:>9.1f} MB")
+                return result
+
+            record("filter_files_by_time_range", analysis.filter_files_by_time_range, all_files,
+                   items=len(all_files), unit="files")
+            depth_e = record("load_station", analysis.load_station, paths["MJ03E"], "MJ03E",
+                             items=n_raw, unit="samples")
+            with contextlib.redirect_stdout(io.StringIO()):
+                depth_f = analysis.load_station(paths["MJ03F"], "MJ03F")
+            record("remove_spikes", analysis.remove_spikes, depth_e,
+                   items=len(depth_e), unit="samples")
+            hourly_df, daily_df = record("compute_differential", analysis.compute_differential,
+                                         depth_e, depth_f, items=len(depth_e), unit="samples")
+            record("export_parquet", analysis.export_parquet, hourly_df, daily_df,
+                   items=len(hourly_df), unit="rows")
+            record("plot_depth", analysis.plot_depth, depth_e, "MJ03E", "depth_mj03e.png", "blue",
+                   items=len(depth_e), unit="samples")
+            record("plot_differential", analysis.plot_differential, daily_df, "differential_uplift.png",
+                   items=len(daily_df), unit="rows")
+
+    # ru_maxrss is in kilobytes on Linux
+    print(f"\nPeak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    return results
+
+
+def save_results(results: list[dict]) -> Path:
+    """Write suite results with run metadata to BENCHMARK_DIR."""
+    BENCHMARK_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    path = BENCHMARK_DIR / f"suite_{stamp}.json"
+    path.write_text(json.dumps({
+        "created": stamp,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "results": results,
+    }, indent=2))
+    print(f"Saved: {path}")
+    return path
+
+
+def compare_results(results: list[dict], baseline_path: Path) -> list[dict]:
+    """Print per-stage time ratios against a baseline file and return the regressions."""
+    baseline = {(r["days"], r["stage"]): r for r in json.loads(baseline_path.read_text())["results"]}
+    regressions = []
+    print(f"\nCompared with {baseline_path.name}:")
+    for r in results:
+        base = baseline.get((r["days"], r["stage"]))
+        if base is None:
+            continue
+        ratio = r["wall_s"] / base["wall_s"] if base["wall_s"] > 0 else float("inf")
+        flag = "  REGRESSION" if ratio > REGRESSION_TOLERANCE else ""
+        print(f"  {r['days']:>5} d {r['stage']:<28} {ratio:>6.2f}x{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BOTPT pipeline benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    suite = sub.add_parser("suite", help="time each pipeline stage on synthetic archives")
+    suite.add_argument("--days", type=int, nargs="+", default=SUITE_DAYS,
+                       help=f"archive sizes in days per station (default: {SUITE_DAYS})")
+    suite.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is kept)")
+    suite.add_argument("--compare", type=Path, default=None, help="earlier results file to compare against")
+
+    reader = sub.add_parser("reader", help="compare the xarray and netCDF4 file readers")
+    reader.add_argument("path", type=Path, help="NetCDF file or directory of 15s files")
+    reader.add_argument("--files", type=int, default=None, help="limit the number of files")
+    reader.add_argument("--repeat", type=int, default=1, help="passes over the files")
+
+    memory = sub.add_parser("memory", help="peak RSS of default and lean runs over the full time range")
+    memory.add_argument("--days", type=int, default=None,
+                        help="archive length in days per station (default: TIME_START to TIME_END)")
+
+    args = parser.parse_args()
+    if args.command == "suite":
+        results = benchmark_suite(args.days, args.repeat)
+        save_results(results)
+        if args.compare is not None and compare_results(results, args.compare):
+            raise SystemExit(1)
+    elif args.command == "reader":
+        benchmark_reader(args.path, args.files, args.repeat)
+    elif args.command == "memory":
+        results = benchmark_memory(args.days)
+        if any(r["dtype"] == analysis.LEAN_DTYPE and r["peak_rss_mb"] > analysis.LEAN_PEAK_RSS_TARGET_MB
+               for r in results):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+botpt.py - Command-line entry point for the Axial Seamount BOTPT tools
+
+Subcommands:
+    ingest        Update the file catalog and convert new NetCDF files into the
+                  15s store (analysis.py convert)
+    differential  Load, despike and difference the stations and export the
+                  products, without drawing figures (analysis.py run --no-plots)
+    plot          Redraw the figures from the exported products (analysis.py plot)
+    map           Draw the caldera map (make_caldera_map.py)
+    status        Current differential relative to the 2015 eruption threshold,
+                  read from the exported daily product
+
+Options after the subcommand go to the tool it runs, e.g.
+`botpt.py differential --incremental --lean` or `botpt.py plot --help`.
+Modules are imported only by the subcommands that use them: `status` reads
+one Parquet column and the row-group statistics with pyarrow, without loading
+pandas, matplotlib or netCDF4.
+
+Paths, the time range and default options come from botpt.toml (see config.py
+and botpt.example.toml); --config selects another file.
+
+Usage:
+    uv run python botpt.py [--config FILE] {ingest,differential,plot,map,status} [options]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+COMMANDS = {
+    "ingest": "convert new NetCDF files into the 15s store",
+    "differential": "compute and export the differential products",
+    "plot": "redraw the figures from the exported products",
+    "map": "draw the caldera map",
+    "status": "current differential vs the 2015 threshold",
+}
+
+# Pre-eruption days whose maximum is the 2015 reference datum, as in
+# analysis.differential_metrics (end exclusive)
+THRESHOLD_WINDOW = ("2015-01-01", "2015-04-24")
+
+
+def read_status(output_dir: Path) -> dict:
+    """Current state of the exported products, read with pyarrow only.
+
+    Args:
+        output_dir: Output root holding data/ and cache/ (analysis.OUTPUT_DIR)
+
+    Returns:
+        Dict with the latest day that has a differential and that value relative
+        to the 2015 threshold, the raw threshold, the latest hourly timestamp and
+        the monitor's zone when a monitor state exists. The day and value are None
+        when the product has no differential data, and the value and threshold
+        are None when there are no pre-eruption days to set the threshold.
+    """
+    import numpy as np
+    import pyarrow.parquet as pq
+
+    daily_path = output_dir / "data" / "differential_uplift_daily.parquet"
+    hourly_path = output_dir / "data" / "differential_uplift_hourly.parquet"
+    if not daily_path.exists():
+        raise SystemExit(f"No exported products in {daily_path.parent}: run 'botpt.py differential' first")
+
+    index_col = pq.read_schema(daily_path).pandas_metadata["index_columns"][0]
+    table = pq.read_table(daily_path, columns=[index_col, "differential_m"])
+    days = table.column(index_col).to_numpy().astype("datetime64[ns]")
+    differential = table.column("differential_m").to_numpy(zero_copy_only=False).astype("float64")
+    pre_eruption = differential[(days >= np.datetime64(THRESHOLD_WINDOW[0]))
+                                & (days < np.datetime64(THRESHOLD_WINDOW[1]))]
+    threshold = float(np.nanmax(pre_eruption)) if np.isfinite(pre_eruption).any() else None
+
+    valid = np.flatnonzero(np.isfinite(differential))
+    latest = valid[-1] if len(valid) else None
+    result = {
+        "latest_day": None if latest is None else str(days[latest].astype("datetime64[D]")),
+        "current_m": None if latest is None or threshold is None else float(differential[latest] - threshold),
+        "threshold_2015_m": threshold,
+    }
+
+    # The hourly product is sorted, so its last row group holds the newest hour
+    metadata = pq.ParquetFile(hourly_path).metadata if hourly_path.exists() else None
+    if metadata is not None and metadata.num_row_groups:
+        hourly_index = pq.read_schema(hourly_path).pandas_metadata["index_columns"][0]
+        position = pq.read_schema(hourly_path).get_field_index(hourly_index)
+        stats = metadata.row_group(metadata.num_row_groups - 1).column(position).statistics
+        if stats is not None and stats.has_min_max:
+            result["latest_hour"] = stats.max.isoformat()
+
+    state_path = output_dir / "cache" / "monitor_state.json"
+    if state_path.exists():
+        result["monitor_zone"] = json.loads(state_path.read_text()).get("zone")
+    return result
+
+
+def print_status(result: dict):
+    """Print a `read_status` result."""
+    value = result["current_m"]
+    print(f"Latest day:      {result['latest_day'] or 'no differential data in the daily product'}"
+          + (f" (hourly data to {result['latest_hour'][:16]})" if "latest_hour" in result else ""))
+    if value is not None:
+        relation = "above" if value > 0 else "below"
+        print(f"Current state:   {value:+.3f} m ({relation} the 2015 eruption threshold)")
+    else:
+        print("Current state:   unknown")
+    if result["threshold_2015_m"] is not None:
+        print(f"2015 threshold:  {result['threshold_2015_m']:.3f} m differential")
+    else:
+        print(f"2015 threshold:  unknown (no data from {THRESHOLD_WINDOW[0]} to {THRESHOLD_WINDOW[1]})")
+    if result.get("monitor_zone"):
+        print(f"Monitor zone:    {result['monitor_zone']}")
+
+
+def status(argv: list[str]):
+    parser = argparse.ArgumentParser(prog="botpt.py status", description=COMMANDS["status"])
+    parser.add_argument("--json", action="store_true", help="print the status as JSON")
+    args = parser.parse_args(argv)
+
+    import config
+
+    t0 = time.perf_counter()
+    result = read_status(config.OUTPUT_DIR)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_status(result)
+        print(f"({time.perf_counter() - t0:.2f} s)")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Axial Seamount BOTPT differential uplift tools",
+        epilog="Options after the subcommand are passed to the tool it runs "
+               "(e.g. 'botpt.py differential --help').")
+    parser.add_argument("--config", type=Path, default=None,
+                        help="TOML config file (default: botpt.toml next to this script)")
+    parser.add_argument("command", choices=list(COMMANDS),
+                        help="; ".join(f"{name}: {text}" for name, text in COMMANDS.items()))
+
+    # Everything after the subcommand belongs to the tool it runs
+    argv = sys.argv[1:] if argv is None else argv
+    split = next((i for i, arg in enumerate(argv) if arg in COMMANDS), len(argv))
+    args = parser.parse_args(argv[:split + 1])
+    rest = argv[split + 1:]
+
+    # Set before the first import of config, which reads it at import time
+    if args.config is not None:
+        os.environ["BOTPT_CONFIG"] = str(args.config.resolve())
+
+    if args.command == "status":
+        status(rest)
+    elif args.command == "map":
+        import make_caldera_map
+        make_caldera_map.main(rest)
+    else:
+        import analysis
+        command = {"ingest": ["convert"], "differential": ["run", "--no-plots"], "plot": ["plot"]}
+        analysis.main(command[args.command] + rest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+config.py - Optional TOML configuration for paths, time range and run options
+
+Values in botpt.toml next to this file (or the file named by $BOTPT_CONFIG)
+override the defaults below and the default options of the command-line tools.
+Relative paths are resolved against the config file's directory. Only the
+standard library is imported, so light commands (`botpt.py status`) can read
+the configuration without loading the analysis stack.
+
+See botpt.example.toml for every supported key.
+"""
+
+import argparse
+import os
+import tomllib
+from pathlib import Path
+
+CONFIG_ENV = "BOTPT_CONFIG"
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent / "botpt.toml"
+
+
+def config_path() -> Path:
+    """Config file in use: $BOTPT_CONFIG, else botpt.toml next to this module."""
+    return Path(os.environ.get(CONFIG_ENV, DEFAULT_CONFIG_PATH)).resolve()
+
+
+def load_config(path: Path | None = None) -> dict:
+    """Parse the config file; a missing file is an empty config."""
+    path = config_path() if path is None else path
+    if not path.exists():
+        if CONFIG_ENV in os.environ:
+            raise SystemExit(f"Config file not found: {path}")
+        return {}
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+CONFIG = load_config()
+
+
+def setting(section: str, key: str, default=None):
+    """Value of `key` in a config section, or `default`."""
+    return CONFIG.get(section, {}).get(key, default)
+
+
+def resolve_path(value: str) -> Path:
+    """A path from the config file; relative paths are relative to the file's directory."""
+    path = Path(value).expanduser()
+    return path if path.is_absolute() else config_path().parent / path
+
+
+def path_setting(section: str, key: str, default: Path) -> Path:
+    """Path value of `key` in a config section, or `default`."""
+    value = setting(section, key)
+    return default if value is None else resolve_path(value)
+
+
+def apply_defaults(parser: argparse.ArgumentParser, section: str):
+    """Use a config section as defaults for a parser's options.
+
+    Keys are option names (`raw_qc` or `raw-qc` for --raw-qc). Values go through
+    the option's type, element-wise for lists; options given on the command line
+    still win.
+    """
+    actions = {action.dest: action for action in parser._actions if action.dest != "help"}
+    defaults = {}
+    for key, value in CONFIG.get(section, {}).items():
+        dest = key.replace("-", "_")
+        action = actions.get(dest)
+        if action is None:
+            raise SystemExit(f"{config_path()}: unknown option {key!r} in [{section}]")
+        if action.type is not None:
+            try:
+                value = [action.type(v) for v in value] if isinstance(value, list) else action.type(value)
+            except (TypeError, ValueError, argparse.ArgumentTypeError) as err:
+                raise SystemExit(f"{config_path()}: [{section}] {key}: {err}")
+        if action.choices is not None and value not in action.choices:
+            raise SystemExit(f"{config_path()}: [{section}] {key} must be one of {list(action.choices)}")
+        defaults[dest] = value
+    parser.set_defaults(**defaults)
+
+
+# Shared locations and time range (module constants in analysis.py read these)
+OUTPUT_DIR = path_setting("paths", "output_dir", Path("/home/jovyan/repos/specKitScience/my-analysis_botpt/outputs"))
+TIME_START = str(setting("time", "start", "2015-01-01"))
+TIME_END = str(setting("time", "end", "2026-01-16"))
@@ -5,27 +5,82 @@ make_caldera_map.py - Generate shaded relief map of Axial Seamount caldera
 Creates a publication-quality bathymetric map showing the summit caldera
 with shaded relief illumination, depth contours, and instrument locations.
 
+The shaded relief is computed in overlapping tiles (in parallel) and cached
+on disk as 8-bit RGBA tiles, keyed by the grid, extent, illumination and
+colormap, so redrawing annotations does not recompute the relief.
+
+Depth contours are traced once per grid, extent and output resolution with
+contourpy, snapped to the output pixel grid and cached as NumPy arrays;
+`caldera_contours` returns them for any figure that overlays the caldera.
+
+The map reads the coarsest level of a bathymetry overview pyramid (built
+with the `pyramid` command) that still has a cell per output pixel, so
+regional maps never touch the 1 m grid.
+
 Usage:
-    uv run python make_caldera_map.py
+    uv run python make_caldera_map.py [--dpi 600] [--subsample N]
+    uv run python make_caldera_map.py pyramid
 """
 
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import netCDF4
 import numpy as np
-import xarray as xr
+from scipy.io import netcdf_file
 import matplotlib.pyplot as plt
 from matplotlib.colors import LightSource
 from matplotlib.patches import Polygon
 from matplotlib.collections import PatchCollection
 from pathlib import Path
 
-# Paths
-BATHY_PATH = Path("/home/jovyan/my_data/axial/axial_bathy/MBARI_AxialSeamount_V2506_AUV_Summit_AUVOverShip_Topo1mSq.grd")
-OUTPUT_DIR = Path("/home/jovyan/repos/specKitScience/my-analysis_botpt/outputs/figures")
+import contourpy
+from matplotlib.contour import ContourSet
 
-# BPR station locations (verified from OOI NetCDF metadata)
-STATIONS = {
-    "MJ03F": {"lon": -130.008772, "lat": 45.95485, "label": "MJ03F\n(Central Caldera)"},
-    "MJ03E": {"lon": -129.974113, "lat": 45.939888, "label": "MJ03E\n(Eastern Caldera)"},
-}
+import config
+from stations import mapped_stations
+
+# Paths
+BATHY_PATH = config.path_setting("paths", "bathy_path", Path(
+    "/home/jovyan/my_data/axial/axial_bathy/MBARI_AxialSeamount_V2506_AUV_Summit_AUVOverShip_Topo1mSq.grd"))
+OUTPUT_DIR = config.OUTPUT_DIR / "figures"
+HILLSHADE_CACHE_DIR = OUTPUT_DIR.parent / "cache" / "hillshade"
+CONTOUR_CACHE_DIR = OUTPUT_DIR.parent / "cache" / "contours"
+BATHY_PYRAMID_DIR = OUTPUT_DIR.parent / "data" / "bathy_pyramid"
+
+# Shaded relief: illumination, colormap and clip percentiles for the color scale
+LIGHT_AZDEG = 315
+LIGHT_ALTDEG = 45
+RELIEF_CMAP = "terrain"
+RELIEF_PERCENTILES = (2, 98)
+
+# Depth contours (m); every CONTOUR_LABEL_EVERY-th level is labeled
+CONTOUR_LEVELS = np.arange(-2200, -1400, 50)
+CONTOUR_LABEL_EVERY = 2
+CONTOUR_CACHE_VERSION = 1
+
+# Hillshade tiles: rows/columns per tile, and processes to shade them with
+HILLSHADE_TILE = 1024
+HILLSHADE_WORKERS = min(8, os.cpu_count() or 1)
+HILLSHADE_CACHE_VERSION = 1
+
+# Bathymetry reads: grid rows read per band (rounded to the decimation factor)
+BATHY_BAND_ROWS = 2048
+
+# Bathymetry overview pyramid: levels decimate the source by 2, 4, ... 2**BATHY_PYRAMID_LEVELS;
+# stored as NetCDF-4 with BATHY_CHUNK x BATHY_CHUNK compressed chunks
+BATHY_PYRAMID_LEVELS = 6
+BATHY_CHUNK = 512
+
+# Map figure width (inches) and output resolution
+MAP_WIDTH_IN = 10
+MAP_DPI = 600
+
+# BPR station locations (verified from OOI NetCDF metadata), from the station registry
+STATIONS = mapped_stations()
 
 # Vent field locations (from user-provided coordinates, converted to decimal degrees)
 # Format: degrees + minutes/60
@@ -47,25 +102,128 @@ LAT_PER_KM = 1 / 111.0
 LON_PER_KM = 1 / 77.0
 
 
-def load_bathymetry(path: Path, subsample: int = 1, extent: dict = None) -> tuple:
-    """Load bathymetry data, optionally subsampling and clipping to extent."""
+def _index_range(coord: np.ndarray, lo: float, hi: float) -> slice:
+    """Index slice of an ascending coordinate between `lo` and `hi` (inclusive, like .sel)."""
+    return slice(int(np.searchsorted(coord, lo, side="left")),
+                 int(np.searchsorted(coord, hi, side="right")))
+
+
+def _block_mean(a: np.ndarray, factor: int) -> np.ndarray:
+    """Mean over factor x factor blocks, ignoring NaN (all-NaN blocks stay NaN).
+
+    Trailing rows/columns that do not fill a block are dropped.
+    """
+    rows, cols = a.shape[0] // factor, a.shape[1] // factor
+    blocks = a[:rows * factor, :cols * factor].reshape(rows, factor, cols, factor)
+    valid = ~np.isnan(blocks)
+    with np.errstate(invalid="ignore"):
+        return np.where(valid, blocks, 0).sum(axis=(1, 3)) / valid.sum(axis=(1, 3))
+
+
+def _open_grid(path: Path):
+    """Open a grid for windowed reads.
+
+    NetCDF-3 (classic GMT) grids are memory-mapped with scipy, so only the pages
+    under the window are read. NetCDF-4/HDF5 grids go through netCDF4, which
+    reads only the requested hyperslab (and chunks) from disk.
+
+    Returns:
+        Tuple of (dataset to close, lon, lat, z variable, function decoding a raw
+        slice of z to float with NaN for missing cells)
+    """
+    with netCDF4.Dataset(path) as probe:
+        classic = probe.data_model.startswith("NETCDF3")
+    if classic:
+        ds = netcdf_file(path, mmap=True)
+        variables = ds.variables
+    else:
+        ds = netCDF4.Dataset(path)
+        variables = ds.variables
+    lon_name = "lon" if "lon" in variables else "x"
+    lat_name = "lat" if "lat" in variables else "y"
+    lon = np.asarray(variables[lon_name][:], dtype=float)
+    lat = np.asarray(variables[lat_name][:], dtype=float)
+    z = variables["z"]
+
+    if classic:
+        # scipy returns raw values; apply the CF fill value and packing like xarray
+        fill = getattr(z, "_FillValue", None)
+        scale = getattr(z, "scale_factor", None)
+        offset = getattr(z, "add_offset", None)
+
+        def decode(raw):
+            values = raw.astype(np.result_type(raw.dtype, np.float32))
+            if fill is not None:
+                values[raw == fill] = np.nan
+            if scale is not None:
+                values = values * scale
+            if offset is not None:
+                values = values + offset
+            return values
+    else:
+        def decode(raw):
+            return np.ma.filled(np.ma.asarray(raw).astype(np.result_type(raw.dtype, np.float32)), np.nan)
+
+    return ds, lon, lat, z, decode
+
+
+def load_bathymetry(path: Path, subsample: int = 1, extent: dict = None,
+                    decimate: str = "stride") -> tuple:
+    """Load bathymetry data, optionally subsampling and clipping to extent.
+
+    Only the index box covering `extent` is read, in bands of BATHY_BAND_ROWS
+    rows, and each band is decimated as it is read, so the full-resolution
+    window is never held in memory when `subsample` > 1.
+
+    Args:
+        path: NetCDF/GMT grid with `lon` (or `x`), `lat` (or `y`) and `z`
+        subsample: Decimation factor in both directions
+        extent: Dict with lon_min, lon_max, lat_min, lat_max (default: whole grid)
+        decimate: "stride" keeps every `subsample`-th cell, as the original
+            ds.isel slicing; "mean" averages subsample x subsample blocks
+            (dropping a trailing partial block), which avoids aliasing
+
+    Returns:
+        Tuple of (lon, lat, z)
+    """
     print(f"Loading bathymetry from {path.name}...")
-    ds = xr.open_dataset(path)
+    ds, lon, lat, z_var, decode = _open_grid(path)
 
     # Clip to extent if provided
+    rows, cols = slice(0, len(lat)), slice(0, len(lon))
     if extent:
-        ds = ds.sel(lon=slice(extent['lon_min'], extent['lon_max']),
-                    lat=slice(extent['lat_min'], extent['lat_max']))
+        rows = _index_range(lat, extent['lat_min'], extent['lat_max'])
+        cols = _index_range(lon, extent['lon_min'], extent['lon_max'])
         print(f"  Clipped to extent: {extent['lon_min']:.3f} to {extent['lon_max']:.3f}°E, "
               f"{extent['lat_min']:.3f} to {extent['lat_max']:.3f}°N")
+    lon, lat = lon[cols], lat[rows]
+
+    n_rows = rows.stop - rows.start
+    n_out = n_rows // subsample if decimate == "mean" else -(-n_rows // subsample)
+    band = max(BATHY_BAND_ROWS // subsample, 1) * subsample
+    z = None
+    for r0 in range(rows.start, rows.stop, band):
+        block = decode(z_var[r0:min(r0 + band, rows.stop), cols.start:cols.stop])
+        if subsample > 1 and decimate == "mean":
+            block = _block_mean(block, subsample)
+        elif subsample > 1:
+            block = block[::subsample, ::subsample]
+        if z is None:
+            z = np.empty((n_out, block.shape[1]), dtype=block.dtype)
+        out0 = (r0 - rows.start) // subsample
+        z[out0:out0 + len(block)] = block
+    del z_var
+    if z is None:
+        z = np.empty((0, len(lon)))
 
     if subsample > 1:
-        ds = ds.isel(lon=slice(None, None, subsample), lat=slice(None, None, subsample))
-        print(f"  Subsampled by {subsample}x")
-
-    lon = ds.coords['lon'].values
-    lat = ds.coords['lat'].values
-    z = ds['z'].values
+        if decimate == "mean":
+            n_lat, n_lon = z.shape
+            lon = lon[:n_lon * subsample].reshape(n_lon, subsample).mean(axis=1)
+            lat = lat[:n_lat * subsample].reshape(n_lat, subsample).mean(axis=1)
+        else:
+            lon, lat = lon[::subsample], lat[::subsample]
+        print(f"  Subsampled by {subsample}x ({decimate})")
 
     print(f"  Grid size: {len(lon)} x {len(lat)}")
     print(f"  Depth range: {np.nanmin(z):.0f} to {np.nanmax(z):.0f} m")
@@ -74,35 +232,339 @@ def load_bathymetry(path: Path, subsample: int = 1, extent: dict = None) -> tupl
     return lon, lat, z
 
 
-def plot_caldera_map(lon, lat, z, output_path: Path, subsample: int = 1):
-    """Create shaded relief map of the caldera with annotations."""
+def _reduce2(a: np.ndarray, ufunc) -> np.ndarray:
+    """Reduce 2 x 2 blocks of `a` (even shape) with a ufunc such as np.add or np.minimum."""
+    rows, cols = a.shape[0] // 2, a.shape[1] // 2
+    return ufunc.reduce(ufunc.reduce(a.reshape(rows, 2, cols, 2), axis=3), axis=1)
+
+
+def _pyramid_manifest(source: Path) -> dict:
+    """What a pyramid was built from; it is rebuilt when this changes."""
+    stat = source.stat()
+    return {"source": str(source.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "levels": BATHY_PYRAMID_LEVELS}
+
+
+def pyramid_levels(source: Path = BATHY_PATH, pyramid_dir: Path = BATHY_PYRAMID_DIR) -> dict[int, Path]:
+    """Overview files of an up-to-date pyramid, by decimation factor (empty if stale or missing)."""
+    manifest_path = pyramid_dir / "manifest.json"
+    if not manifest_path.exists() or json.loads(manifest_path.read_text()) != _pyramid_manifest(source):
+        return {}
+    return {2**k: pyramid_dir / f"{source.stem}_{2**k}x.nc" for k in range(1, BATHY_PYRAMID_LEVELS + 1)}
+
+
+def build_bathy_pyramid(source: Path = BATHY_PATH, pyramid_dir: Path = BATHY_PYRAMID_DIR) -> dict[int, Path]:
+    """Build overview levels of a bathymetry grid in one banded pass over the source.
+
+    Level k averages 2**k x 2**k source cells, ignoring NaN, and also keeps the
+    block minimum and maximum (`z_min`, `z_max`) so peaks and pits survive.
+    Coarser levels are reduced from the finer level's sums and counts while the
+    band is in memory, so the source is read once. Rows and columns past the
+    last whole coarsest block are dropped (at most 2**BATHY_PYRAMID_LEVELS - 1
+    cells at the north and east edges).
+
+    Returns:
+        Overview file paths by decimation factor
+    """
+    factors = [2**k for k in range(1, BATHY_PYRAMID_LEVELS + 1)]
+    print(f"Building bathymetry pyramid ({', '.join(f'{f}x' for f in factors)}) from {source.name}...")
+    pyramid_dir.mkdir(parents=True, exist_ok=True)
+    (pyramid_dir / "manifest.json").unlink(missing_ok=True)
+
+    ds, lon, lat, z_var, decode = _open_grid(source)
+    n_rows = len(lat) // factors[-1] * factors[-1]
+    n_cols = len(lon) // factors[-1] * factors[-1]
+
+    levels = {}
+    outputs = {}
+    for f in factors:
+        levels[f] = pyramid_dir / f"{source.stem}_{f}x.nc"
+        nc = netCDF4.Dataset(levels[f], "w", format="NETCDF4")
+        nc.createDimension("lat", n_rows // f)
+        nc.createDimension("lon", n_cols // f)
+        nc.createVariable("lon", "f8", ("lon",))[:] = lon[:n_cols].reshape(-1, f).mean(axis=1)
+        nc.createVariable("lat", "f8", ("lat",))[:] = lat[:n_rows].reshape(-1, f).mean(axis=1)
+        for name in ("z", "z_min", "z_max"):
+            var = nc.createVariable(name, "f4", ("lat", "lon"), zlib=True, fill_value=np.float32(np.nan),
+                                    chunksizes=(min(BATHY_CHUNK, n_rows // f), min(BATHY_CHUNK, n_cols // f)))
+            var.units = "m"
+        nc.decimation = f
+        outputs[f] = nc
+
+    band = max(BATHY_BAND_ROWS // factors[-1], 1) * factors[-1]
+    for r0 in range(0, n_rows, band):
+        raw = decode(z_var[r0:min(r0 + band, n_rows), :n_cols])
+        valid = ~np.isnan(raw)
+        total = np.where(valid, raw, 0).astype(np.float64)
+        count = valid.astype(np.int32)
+        low = np.where(valid, raw, np.inf)
+        high = np.where(valid, raw, -np.inf)
+        del raw, valid
+        for f in factors:
+            total, count = _reduce2(total, np.add), _reduce2(count, np.add)
+            low, high = _reduce2(low, np.minimum), _reduce2(high, np.maximum)
+            empty = count == 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                outputs[f]["z"][r0 // f:r0 // f + len(total)] = np.where(empty, np.nan, total / count)
+            outputs[f]["z_min"][r0 // f:r0 // f + len(total)] = np.where(empty, np.nan, low)
+            outputs[f]["z_max"][r0 // f:r0 // f + len(total)] = np.where(empty, np.nan, high)
+    del z_var
+    ds.close()
+    for nc in outputs.values():
+        nc.close()
+
+    (pyramid_dir / "manifest.json").write_text(json.dumps(_pyramid_manifest(source)))
+    print(f"  Wrote {len(levels)} levels to {pyramid_dir}")
+    return levels
+
+
+def select_bathymetry(extent: dict, dpi: int = MAP_DPI, width_in: float = MAP_WIDTH_IN,
+                      source: Path = BATHY_PATH, pyramid_dir: Path = BATHY_PYRAMID_DIR) -> tuple[Path, int]:
+    """Pick the coarsest pyramid level with at least one cell per output pixel.
+
+    Falls back to the source grid when no pyramid has been built (or it is
+    stale) or when the map needs full resolution.
+
+    Returns:
+        Tuple of (grid file to read, its decimation factor relative to the source)
+    """
+    with netCDF4.Dataset(source) as probe:
+        lon_name = "lon" if "lon" in probe.variables else "x"
+        spacing = float(abs(probe.variables[lon_name][1] - probe.variables[lon_name][0]))
+    pixel = (extent['lon_max'] - extent['lon_min']) / (width_in * dpi)
+
+    best = (source, 1)
+    for factor, path in sorted(pyramid_levels(source, pyramid_dir).items()):
+        if factor * spacing <= pixel:
+            best = (path, factor)
+    return best
+
+
+def _tile_bounds(shape: tuple[int, int], tile: int) -> list[tuple[int, int, int, int]]:
+    """(row0, row1, col0, col1) of each tile covering a grid of `shape`."""
+    return [(r0, min(r0 + tile, shape[0]), c0, min(c0 + tile, shape[1]))
+            for r0 in range(0, shape[0], tile) for c0 in range(0, shape[1], tile)]
+
+
+def _tile_block(z: np.ndarray, bounds: tuple[int, int, int, int]) -> tuple[np.ndarray, tuple]:
+    """Cut a tile with a one-cell halo, so np.gradient sees the same neighbours as on the full grid.
+
+    Returns:
+        Tuple of (block including the halo, the tile's slices within the block)
+    """
+    r0, r1, c0, c1 = bounds
+    h0, w0 = max(r0 - 1, 0), max(c0 - 1, 0)
+    block = z[h0:min(r1 + 1, z.shape[0]), w0:min(c1 + 1, z.shape[1])]
+    return block, (slice(r0 - h0, r1 - h0), slice(c0 - w0, c1 - w0))
+
+
+def _tile_intensity(block: np.ndarray, inner: tuple) -> np.ndarray:
+    """Unscaled hillshade intensity of one tile, as in LightSource.hillshade/shade_normals.
+
+    At the grid edges there is no halo, and np.gradient falls back to the same
+    one-sided differences it uses on the full grid.
+    """
+    # dy is negative because the first row is the top of the image
+    e_dy, e_dx = np.gradient(block, -1, 1)
+    e_dy, e_dx = e_dy[inner], e_dx[inner]
+    direction = LightSource(azdeg=LIGHT_AZDEG, altdeg=LIGHT_ALTDEG).direction
+    return (direction[2] - e_dx * direction[0] - e_dy * direction[1]) / np.sqrt(e_dx**2 + e_dy**2 + 1)
+
+
+def _tile_intensity_range(block: np.ndarray, inner: tuple) -> tuple[float, float]:
+    """Intensity min/max of one tile (NaN if the tile has gaps, like ndarray.min)."""
+    intensity = _tile_intensity(block, inner)
+    return float(intensity.min()), float(intensity.max())
+
+
+def _shade_tile(block: np.ndarray, inner: tuple, vmin: float, vmax: float,
+                imin: float, imax: float, path: Path):
+    """Shade one tile with the grid-wide intensity range and save it as uint8 RGBA."""
+    intensity = _tile_intensity(block, inner)
+    if (imax - imin) > 1e-6:
+        intensity = (intensity - imin) / (imax - imin)
+    intensity = np.clip(intensity, 0, 1)[..., np.newaxis]
+
+    rgba = plt.get_cmap(RELIEF_CMAP)(plt.Normalize(vmin=vmin, vmax=vmax)(block[inner]))
+    rgb = rgba[..., :3]
+    # Soft light blend, as LightSource.blend_soft_light
+    rgba[..., :3] = 2 * intensity * rgb + (1 - 2 * intensity) * rgb**2
+    np.save(path, np.round(np.nan_to_num(rgba) * 255).astype(np.uint8))
+
+
+def _grid_key(z: np.ndarray, lon: np.ndarray, lat: np.ndarray, source: Path | None,
+              decimation: tuple[int, str], *settings) -> str:
+    """Cache key for a grid: its source file and how it was read (or its contents), extent and
+    derived-product settings."""
+    digest = hashlib.sha256()
+    if source is not None:
+        stat = source.stat()
+        digest.update(f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{decimation}".encode())
+    else:
+        digest.update(np.ascontiguousarray(z).tobytes())
+    digest.update(repr((
+        z.shape, str(z.dtype), float(lon.min()), float(lon.max()), float(lat.min()), float(lat.max()),
+        *settings,
+    )).encode())
+    return digest.hexdigest()[:16]
+
+
+def shaded_relief(z: np.ndarray, lon: np.ndarray, lat: np.ndarray, source: Path | None = None,
+                  decimation: tuple[int, str] = (1, "stride"),
+                  cache_dir: Path = HILLSHADE_CACHE_DIR,
+                  workers: int = HILLSHADE_WORKERS) -> tuple[np.ndarray, tuple[float, float]]:
+    """Soft-light shaded relief of a bathymetry grid, computed in cached tiles.
+
+    Matches LightSource(LIGHT_AZDEG, LIGHT_ALTDEG).shade(z, cmap, blend_mode='soft')
+    over the whole grid, colored between the RELIEF_PERCENTILES of depth. Tiles of
+    HILLSHADE_TILE cells are shaded in parallel, so no process holds more than one
+    float tile, and the result is 8-bit RGBA. The intensity is still scaled by the
+    whole grid's range, found in a first pass over the tiles.
+
+    Tiles are cached under `cache_dir`, keyed by the source file and the
+    decimation it was read with (or the grid's contents when `source` is None),
+    the extent, the illumination, the colormap and the tile size. A cache hit skips the shading and the percentile computation.
+
+    Args:
+        z: Elevation grid (lat x lon)
+        lon: Longitudes of the grid columns
+        lat: Latitudes of the grid rows
+        source: Grid file the data was read from
+        decimation: (subsample, decimate) arguments `source` was read with by load_bathymetry
+        cache_dir: Root of the tile cache
+        workers: Processes to shade tiles with (1 = serial)
+
+    Returns:
+        Tuple of (uint8 RGBA image, (vmin, vmax) color scale)
+    """
+    tile_dir = cache_dir / _grid_key(z, lon, lat, source, decimation, HILLSHADE_CACHE_VERSION, LIGHT_AZDEG,
+                                     LIGHT_ALTDEG, RELIEF_CMAP, RELIEF_PERCENTILES, HILLSHADE_TILE)
+    manifest_path = tile_dir / "manifest.json"
+    tiles = _tile_bounds(z.shape, HILLSHADE_TILE)
+
+    if manifest_path.exists():
+        print(f"  Using cached hillshade tiles ({tile_dir.name})")
+        vmin, vmax = json.loads(manifest_path.read_text())["z_range"]
+    else:
+        print(f"  Shading {len(tiles)} tile(s) with {workers} worker(s)...")
+        vmin, vmax = (float(v) for v in np.nanpercentile(z, RELIEF_PERCENTILES))
+        tile_dir.mkdir(parents=True, exist_ok=True)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        run = map if pool is None else pool.map
+        try:
+            blocks = [_tile_block(z, b) for b in tiles]
+            ranges = list(run(_tile_intensity_range, *zip(*blocks)))
+            # Whole-grid range; any NaN propagates, as with ndarray.min on the full grid
+            lows, highs = np.array(ranges).T
+            imin, imax = lows.min(), highs.max()
+            paths = [tile_dir / f"r{r0}_c{c0}.npy" for r0, _, c0, _ in tiles]
+            n = len(tiles)
+            list(run(_shade_tile, *zip(*blocks), [vmin] * n, [vmax] * n, [imin] * n, [imax] * n, paths))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        manifest_path.write_text(json.dumps({"z_range": [vmin, vmax], "shape": list(z.shape)}))
+
+    rgba = np.empty(z.shape + (4,), dtype=np.uint8)
+    for r0, r1, c0, c1 in tiles:
+        rgba[r0:r1, c0:c1] = np.load(tile_dir / f"r{r0}_c{c0}.npy", mmap_mode="r")
+    return rgba, (vmin, vmax)
+
+
+def _snap_line(line: np.ndarray, origin: np.ndarray, pixel: float) -> np.ndarray | None:
+    """Snap a contour line to the output pixel grid and drop repeated vertices.
+
+    Returns None if less than two distinct pixels remain.
+    """
+    snapped = np.round((line - origin) / pixel) * pixel + origin
+    keep = np.r_[True, np.any(snapped[1:] != snapped[:-1], axis=1)]
+    snapped = snapped[keep]
+    return snapped if len(snapped) >= 2 else None
+
+
+def caldera_contours(z: np.ndarray, lon: np.ndarray, lat: np.ndarray, pixel: float,
+                     levels: np.ndarray = CONTOUR_LEVELS, source: Path | None = None,
+                     decimation: tuple[int, str] = (1, "stride"),
+                     cache_dir: Path = CONTOUR_CACHE_DIR) -> list[list[np.ndarray]]:
+    """Depth contour lines of a grid, simplified to the output resolution and cached.
+
+    Lines are traced with contourpy over the 1-D lon/lat axes (no meshgrid),
+    snapped to a grid of `pixel` degrees and stripped of repeated vertices,
+    which removes the sub-pixel detail of the 1 m grid. The result is cached as
+    an .npz (vertices and offsets per level) keyed by the source file and its
+    decimation (or the grid's contents), the extent, the levels and `pixel`.
+
+    Args:
+        z: Elevation grid (lat x lon), NaN for gaps
+        lon: Longitudes of the grid columns
+        lat: Latitudes of the grid rows
+        pixel: Output pixel size in degrees
+        levels: Contour levels (m)
+        source: Grid file the data was read from
+        decimation: (subsample, decimate) arguments `source` was read with by load_bathymetry
+        cache_dir: Directory of cached contour files
+
+    Returns:
+        For each level, a list of (N, 2) lon/lat vertex arrays (matplotlib's allsegs layout)
+    """
+    key = _grid_key(z, lon, lat, source, decimation, CONTOUR_CACHE_VERSION,
+                    [float(level) for level in levels], float(pixel))
+    path = cache_dir / f"{key}.npz"
+    if path.exists():
+        print(f"  Using cached contours ({path.name})")
+        with np.load(path) as cached:
+            return [np.split(cached[f"vertices{i}"], cached[f"offsets{i}"][1:-1])
+                    for i in range(len(levels))]
+
+    print(f"  Tracing {len(levels)} contour levels...")
+    generator = contourpy.contour_generator(lon, lat, np.ma.masked_invalid(z), name="serial",
+                                            line_type=contourpy.LineType.Separate)
+    origin = np.array([lon.min(), lat.min()])
+    allsegs = []
+    for level in levels:
+        lines = (_snap_line(line, origin, pixel) for line in generator.lines(level))
+        allsegs.append([line for line in lines if line is not None])
+
+    arrays = {}
+    for i, segs in enumerate(allsegs):
+        arrays[f"vertices{i}"] = np.concatenate(segs) if segs else np.empty((0, 2))
+        arrays[f"offsets{i}"] = np.cumsum([0] + [len(seg) for seg in segs])
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.savez(path, **arrays)
+    return allsegs
+
+
+def plot_caldera_map(lon, lat, z, output_path: Path, subsample: int = 1, source: Path | None = None,
+                     dpi: int = MAP_DPI, decimation: tuple[int, str] = (1, "stride")):
+    """Create shaded relief map of the caldera with annotations.
+
+    `source` is the grid file `z` was read from and `decimation` the (subsample,
+    decimate) arguments it was read with; together they key the hillshade and
+    contour caches. `subsample` only names the output (caldera_map_<N>x.png when
+    above 1); `main` passes the stride given with --subsample, or 1 when it picked
+    a pyramid level itself.
+    """
 
     print("Creating shaded relief map...")
 
     # Set up figure
-    fig, ax = plt.subplots(figsize=(10, 10))
-
-    # Create meshgrid for contours
-    lon_grid, lat_grid = np.meshgrid(lon, lat)
-
-    # Create shaded relief
-    ls = LightSource(azdeg=315, altdeg=45)
-    z_min, z_max = np.nanpercentile(z, [2, 98])
+    fig, ax = plt.subplots(figsize=(MAP_WIDTH_IN, MAP_WIDTH_IN))
 
-    rgb = ls.shade(z, cmap=plt.cm.terrain, blend_mode='soft',
-                   vmin=z_min, vmax=z_max)
+    # Create shaded relief (tiled and cached, see shaded_relief)
+    rgb, (z_min, z_max) = shaded_relief(z, lon, lat, source=source, decimation=decimation)
 
     # Plot shaded relief
     ax.imshow(rgb, extent=[lon.min(), lon.max(), lat.min(), lat.max()],
               origin='lower', aspect='equal')
 
-    # Add depth contours
+    # Add depth contours (traced once per grid and resolution, see caldera_contours)
     print("  Adding depth contours...")
-    contour_levels = np.arange(-2200, -1400, 50)
-    cs = ax.contour(lon_grid, lat_grid, z, levels=contour_levels,
+    pixel = (lon.max() - lon.min()) / (MAP_WIDTH_IN * dpi)
+    allsegs = caldera_contours(z, lon, lat, pixel, source=source, decimation=decimation)
+    cs = ContourSet(ax, CONTOUR_LEVELS, allsegs,
                     colors='black', linewidths=0.5, alpha=0.6)
     # Label contours
-    ax.clabel(cs, levels=contour_levels[::2], fontsize=7, fmt='%d m', inline=True)
+    ax.clabel(cs, levels=CONTOUR_LEVELS[::CONTOUR_LABEL_EVERY], fontsize=7, fmt='%d m', inline=True)
 
     # Add vent locations
     print("  Adding vent locations...")
@@ -130,13 +592,8 @@ def plot_caldera_map(lon, lat, z, output_path: Path, subsample: int = 1):
     for station, info in STATIONS.items():
         ax.plot(info['lon'], info['lat'], 'r^', markersize=14,
                 markeredgecolor='white', markeredgewidth=2, zorder=10)
-        # Position labels
-        if station == "MJ03F":
-            offset = (12, 8)
-        else:
-            offset = (12, -15)
         ax.annotate(info['label'], (info['lon'], info['lat']),
-                    xytext=offset, textcoords='offset points',
+                    xytext=info['label_offset'], textcoords='offset points',
                     fontsize=10, fontweight='bold',
                     bbox=dict(boxstyle='round,pad=0.3', facecolor='white',
                              alpha=0.9, edgecolor='gray'),
@@ -185,14 +642,32 @@ def plot_caldera_map(lon, lat, z, output_path: Path, subsample: int = 1):
     # Save
     resolution_note = f"_{subsample}x" if subsample > 1 else ""
     output_file = output_path / f"caldera_map{resolution_note}.png"
-    plt.savefig(output_file, dpi=600, facecolor='white', bbox_inches='tight')
+    plt.savefig(output_file, dpi=dpi, facecolor='white', bbox_inches='tight')
     plt.close()
 
     print(f"Saved: {output_file}")
     return output_file
 
 
-def main():
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Shaded relief map of the Axial Seamount caldera")
+    parser.add_argument("command", nargs="?", choices=["map", "pyramid"], default="map",
+                        help="draw the map (default) or build the bathymetry overview pyramid")
+    parser.add_argument("--dpi", type=int, default=MAP_DPI, help=f"output resolution (default: {MAP_DPI})")
+    parser.add_argument("--subsample", type=int, default=None,
+                        help="read the source grid at this stride instead of picking a pyramid level")
+    config.apply_defaults(parser, "map")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+
+    if args.command == "pyramid":
+        build_bathy_pyramid()
+        print("\nDone!")
+        return
+
     print("=" * 60)
     print("Axial Seamount Caldera Map")
     print("=" * 60)
@@ -214,12 +689,19 @@ def main():
         'lat_max': center_lat + half_height,
     }
 
-    # Generate full resolution version (1m)
-    print("Generating full resolution map (1m)...")
-    subsample = 1
-
-    lon, lat, z = load_bathymetry(BATHY_PATH, subsample=subsample, extent=extent)
-    output_file = plot_caldera_map(lon, lat, z, OUTPUT_DIR, subsample=subsample)
+    if args.subsample is not None:
+        grid, subsample, read_stride = BATHY_PATH, args.subsample, args.subsample
+    else:
+        # Coarsest pyramid level that still resolves every output pixel
+        grid, subsample = select_bathymetry(extent, dpi=args.dpi)
+        read_stride = 1
+    print(f"Generating map from {grid.name} ({subsample}x) at {args.dpi} dpi...")
+
+    decimation = (read_stride, "stride")
+    lon, lat, z = load_bathymetry(grid, subsample=read_stride, extent=extent, decimate=decimation[1])
+    # An automatically picked pyramid level keeps the usual file name
+    output_file = plot_caldera_map(lon, lat, z, OUTPUT_DIR, subsample=read_stride, source=grid, dpi=args.dpi,
+                                   decimation=decimation)
 
     print("\nDone!")
 
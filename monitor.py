@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+monitor.py - Near-real-time differential uplift monitor for Axial Seamount
+
+Polls the station data directories for new 15s files and keeps the hourly
+differential, the spike filters and the daily "current state" up to date
+incrementally, so each cycle costs O(new data) instead of a batch rerun.
+
+Pipeline per station, as in analysis.py: 15s samples -> hourly means ->
+24-hour MAD despike (5 MAD). Then the hourly differential of the headline
+pair (stations.DIFFERENTIAL_PAIRS[0]) -> 24-hour MAD despike (3.5 MAD) ->
+mean of the current day, referenced to the 2015 eruption threshold.
+
+The despike filters are centered, so a value's final flag needs about a day
+of later data. Final values come from StreamingDespiker.push; the newest
+hours use StreamingDespiker.peek, which flags them as if the stream ended
+now. The reported value therefore follows new files within one poll.
+
+When the referenced value moves between zones (below the ±ALERT_BAND_M band,
+inside it below or above the threshold, above the band), an event is printed
+and appended to outputs/monitor_events.jsonl. Zone changes need to clear the
+boundary by ALERT_HYSTERESIS_M, so noise around a boundary does not flap.
+
+The reference datum comes from the exported daily product (run analysis.py
+first) and is kept, with the current zone, in outputs/cache/monitor_state.json.
+It is recomputed when the product is re-exported (its mtime or size changes).
+
+Usage:
+    uv run python monitor.py [--interval 30] [--band 0.30] [--once]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from stations import DIFFERENTIAL_PAIRS, station_path
+
+POLL_SECONDS = 30
+ALERT_BAND_M = 0.30
+ALERT_HYSTERESIS_M = 0.02
+
+# Hours replayed at startup to fill the rolling windows, and hours of final values kept
+# once both stations have them (unpaired station hours are kept until they are paired)
+WARMUP_HOURS = 96
+HISTORY_HOURS = 72
+
+# The monitor follows live data, so samples are read up to LIVE_TIME_END instead of TIME_END
+LIVE_TIME_END = pd.Period("2100-12-31").end_time
+
+EVENTS_PATH = analysis.OUTPUT_DIR / "monitor_events.jsonl"
+STATE_PATH = analysis.CACHE_DIR / "monitor_state.json"
+
+ZONES = ["below band", "within band, below threshold", "within band, above threshold", "above band"]
+
+
+def _latest_sample_time(station_name: str, catalog_path: Path) -> pd.Timestamp | None:
+    """Last sample time of a station's catalogued files."""
+    with analysis._connect_catalog(catalog_path) as conn:
+        (last,) = conn.execute("SELECT MAX(last_time) FROM files WHERE station = ? AND n_samples > 0",
+                               (station_name,)).fetchone()
+    return None if last is None else pd.Timestamp(last)
+
+
+class StationFeed:
+    """Incremental hourly depth for one station: new 15s samples in, despiked hours out.
+
+    Samples of the newest (incomplete) hour are held back until a later sample
+    arrives. Completed hourly means go through a StreamingDespiker with the
+    batch settings (24 hours, 5 MAD), on a continuous hourly grid: hours without
+    samples, within a poll or between polls, are pushed as NaN, as the batch
+    path's hourly resample has them, so the rolling windows span the same hours.
+    `final` keeps every despiked hour until the differential has paired it
+    (see `trim`).
+    """
+
+    def __init__(self, name: str, data_path: Path, start: pd.Timestamp):
+        self.name = name
+        self.data_path = data_path
+        self.start = start
+        self.last_time = None
+        self.despiker = analysis.StreamingDespiker(analysis.STATION_SPIKE_WINDOW, analysis.STATION_SPIKE_THRESHOLD)
+        self.final = pd.Series(dtype="float64", index=pd.DatetimeIndex([]))
+        self._pending = (np.array([], dtype="datetime64[ns]"), np.array([], dtype="float64"))
+        # Last hour pushed into the despiker; the next push continues the grid from it
+        self._last_hour = None
+
+    def poll(self, catalog_path: Path) -> int:
+        """Read samples newer than the last one seen; returns how many were added."""
+        analysis.update_catalog(self.data_path, self.name, catalog_path)
+        since = self.start if self.last_time is None else self.last_time + pd.Timedelta(1, "ns")
+        files = analysis.catalog_files(self.name, since, pd.Timestamp.max, catalog_path, self.data_path)
+        n_new = 0
+        for times, depth in analysis.iter_raw_samples(files, since=since, end=LIVE_TIME_END):
+            self._ingest(times, depth)
+            n_new += len(times)
+        return n_new
+
+    def _ingest(self, times: np.ndarray, depth: np.ndarray):
+        times = np.concatenate([self._pending[0], times])
+        depth = np.concatenate([self._pending[1], depth])
+        self.last_time = pd.Timestamp(times[-1])
+
+        # Hold back the newest hour; it may still receive samples
+        complete = times.astype("datetime64[h]") < times[-1].astype("datetime64[h]")
+        self._pending = (times[~complete], depth[~complete])
+        if not complete.any():
+            return
+        hourly = pd.Series(depth[complete], index=pd.DatetimeIndex(times[complete])).resample("1h").mean()
+        if self._last_hour is not None:
+            hourly = hourly.reindex(pd.date_range(self._last_hour + pd.Timedelta(hours=1), hourly.index[-1],
+                                                  freq="1h"))
+        self._last_hour = hourly.index[-1]
+        out_times, out_values = self.despiker.push(hourly.index.to_numpy(), hourly.to_numpy())
+        if len(out_times):
+            final = pd.Series(out_values, index=pd.DatetimeIndex(out_times))
+            self.final = pd.concat([self.final, final])
+
+    def trim(self, paired_until: pd.Timestamp):
+        """Drop final hours the differential has consumed, beyond HISTORY_HOURS of them."""
+        keep_from = paired_until - pd.Timedelta(hours=HISTORY_HOURS - 1)
+        self.final = self.final[self.final.index >= keep_from]
+
+    def provisional(self) -> pd.Series:
+        """Final hours plus provisional flags for the newest hours, including the incomplete one."""
+        extra_times, extra_values = self._pending[0][:0], self._pending[1][:0]
+        if len(self._pending[0]):
+            extra_times = self._pending[0][:1].astype("datetime64[h]").astype("datetime64[ns]")
+            extra_values = np.array([np.mean(self._pending[1])])
+        times, values = self.despiker.peek(extra_times, extra_values)
+        return pd.concat([self.final, pd.Series(values, index=pd.DatetimeIndex(times))])
+
+
+class DifferentialMonitor:
+    """Incremental differential (reference - target depth) with threshold-band alerts.
+
+    Hours that are final at both stations are differenced and pushed through the
+    differential despiker (24 hours, 3.5 MAD); newer hours are estimated with
+    `peek`. The current value is the mean of the latest day's hourly
+    differentials minus the 2015 threshold, as `differential_metrics` reports it.
+    """
+
+    def __init__(self, reference: StationFeed, target: StationFeed, threshold: float,
+                 band: float = ALERT_BAND_M, hysteresis: float = ALERT_HYSTERESIS_M,
+                 zone: str | None = None):
+        self.reference = reference
+        self.target = target
+        self.threshold = threshold
+        self.band = band
+        self.hysteresis = hysteresis
+        self.zone = zone
+        self.despiker = analysis.StreamingDespiker(analysis.DIFFERENTIAL_SPIKE_WINDOW,
+                                                    analysis.DIFFERENTIAL_SPIKE_THRESHOLD)
+        self.final = pd.Series(dtype="float64", index=pd.DatetimeIndex([]))
+        self._last_final = None
+
+    def _zone(self, value: float) -> str:
+        return ZONES[int(np.searchsorted([-self.band, 0.0, self.band], value, side="right"))]
+
+    def update(self) -> tuple[pd.Timestamp, float, dict | None] | None:
+        """Fold in the stations' new hours.
+
+        Returns:
+            Tuple of (latest hour, value relative to the threshold, event or None),
+            or None if no hour has data at both stations yet
+        """
+        both = pd.DataFrame({"ref": self.reference.final, "tgt": self.target.final}).dropna()
+        if self._last_final is not None:
+            both = both[both.index > self._last_final]
+        if len(both):
+            times, values = self.despiker.push(both.index.to_numpy(), (both["ref"] - both["tgt"]).to_numpy())
+            self._last_final = both.index[-1]
+            self.reference.trim(self._last_final)
+            self.target.trim(self._last_final)
+            if len(times):
+                final = pd.Series(values, index=pd.DatetimeIndex(times))
+                self.final = pd.concat([self.final, final]).iloc[-HISTORY_HOURS:]
+
+        newest = pd.DataFrame({"ref": self.reference.provisional(), "tgt": self.target.provisional()}).dropna()
+        if self._last_final is not None:
+            newest = newest[newest.index > self._last_final]
+        times, values = self.despiker.peek(newest.index.to_numpy(), (newest["ref"] - newest["tgt"]).to_numpy())
+        hourly = pd.concat([self.final, pd.Series(values, index=pd.DatetimeIndex(times))])
+        if len(hourly) == 0:
+            return None
+
+        latest = hourly.index[-1]
+        value = hourly[latest.floor("D"):].mean() - self.threshold
+        if np.isnan(value):
+            return latest, value, None
+
+        zone = self._zone(value)
+        event = None
+        if zone != self.zone:
+            nearest = min(abs(value - b) for b in (-self.band, 0.0, self.band))
+            if self.zone is None or nearest >= self.hysteresis:
+                event = {
+                    "detected": pd.Timestamp.now(tz="UTC").isoformat(),
+                    "data_time": latest.isoformat(),
+                    "value_m": float(value),
+                    "zone": zone,
+                    "previous_zone": self.zone,
+                    "band_m": self.band,
+                    "threshold_m": float(self.threshold),
+                }
+                self.zone = zone
+        return latest, value, event
+
+
+def _reference_datum(state: dict) -> tuple[float, list | None]:
+    """2015 threshold and the identity of the daily product it was computed from.
+
+    The saved threshold is reused while the exported daily product has the
+    identity (mtime and size) saved with it; otherwise it is recomputed from the
+    product. Without a product, a saved threshold is kept.
+
+    Returns:
+        Tuple of (threshold in m, [mtime_ns, size] of the product or None)
+    """
+    daily_path = analysis.DATA_DIR / "differential_uplift_daily.parquet"
+    if not daily_path.exists():
+        if "threshold_m" in state:
+            return state["threshold_m"], state.get("threshold_source")
+        raise SystemExit(f"No reference datum: run analysis.py first to export {daily_path.name}")
+    stat = daily_path.stat()
+    source = [stat.st_mtime_ns, stat.st_size]
+    if "threshold_m" in state and state.get("threshold_source") == source:
+        return state["threshold_m"], source
+    return float(analysis.differential_metrics(pd.read_parquet(daily_path))["threshold_2015"]), source
+
+
+def _emit(event: dict):
+    """Print an event and append it to EVENTS_PATH."""
+    print(f"  EVENT: {event['previous_zone']} -> {event['zone']} "
+          f"({event['value_m']:+.3f} m at {event['data_time']})")
+    EVENTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(EVENTS_PATH, "a") as events:
+        events.write(json.dumps(event) + "\n")
+
+
+async def run_monitor(interval: float = POLL_SECONDS, band: float = ALERT_BAND_M,
+                      hysteresis: float = ALERT_HYSTERESIS_M, once: bool = False,
+                      catalog_path: Path = analysis.CATALOG_PATH):
+    """Poll for new files and update the differential until interrupted.
+
+    Stations are polled concurrently (file scans and reads run in threads).
+
+    Args:
+        interval: Seconds between polls
+        band: Half-width (m) of the alert band around the 2015 threshold
+        hysteresis: Distance (m) a value must clear a zone boundary by to change zone
+        once: Poll once and exit (e.g. when run from cron)
+        catalog_path: File catalog used to find new files
+    """
+    state = json.loads(STATE_PATH.read_text()) if STATE_PATH.exists() else {}
+    threshold, source = _reference_datum(state)
+
+    reference_name, target_name = DIFFERENTIAL_PAIRS[0]
+    feeds = {}
+    for name in (reference_name, target_name):
+        await asyncio.to_thread(analysis.update_catalog, station_path(name), name, catalog_path)
+        latest = _latest_sample_time(name, catalog_path)
+        start = pd.Timestamp(analysis.TIME_START) if latest is None else latest - pd.Timedelta(hours=WARMUP_HOURS)
+        feeds[name] = StationFeed(name, station_path(name), start)
+    monitor = DifferentialMonitor(feeds[reference_name], feeds[target_name], threshold,
+                                  band, hysteresis, state.get("zone"))
+    print(f"Monitoring {target_name} - {reference_name} every {interval:g} s "
+          f"(threshold {threshold:.3f} m, band ±{band:.2f} m)")
+
+    while True:
+        t0 = time.perf_counter()
+        counts = await asyncio.gather(*(asyncio.to_thread(feed.poll, catalog_path) for feed in feeds.values()))
+        # A re-exported product moves the datum
+        threshold, source = _reference_datum({"threshold_m": threshold, "threshold_source": source})
+        if threshold != monitor.threshold:
+            print(f"  Reference datum updated: threshold {threshold:.3f} m")
+            monitor.threshold = threshold
+        if any(counts):
+            result = monitor.update()
+            if result is not None:
+                latest, value, event = result
+                print(f"{pd.Timestamp.now():%Y-%m-%d %H:%M:%S}  data to {latest:%Y-%m-%d %H:00}  "
+                      f"current state {value:+.3f} m  ({sum(counts)} new samples, "
+                      f"{time.perf_counter() - t0:.2f} s)")
+                if event is not None:
+                    _emit(event)
+                STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                STATE_PATH.write_text(json.dumps({"threshold_m": threshold, "threshold_source": source,
+                                                  "zone": monitor.zone}))
+        if once:
+            return
+        await asyncio.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-real-time differential uplift monitor")
+    parser.add_argument("--interval", type=float, default=POLL_SECONDS, help="seconds between polls")
+    parser.add_argument("--band", type=float, default=ALERT_BAND_M,
+                        help=f"alert band half-width around the 2015 threshold in m (default: {ALERT_BAND_M})")
+    parser.add_argument("--hysteresis", type=float, default=ALERT_HYSTERESIS_M,
+                        help="distance in m a value must clear a band edge by to change zone")
+    parser.add_argument("--once", action="store_true", help="poll once and exit")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_monitor(args.interval, args.band, args.hysteresis, args.once))
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
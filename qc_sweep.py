@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+qc_sweep.py - Compare spike-filter settings for the differential uplift
+
+The hourly spike filters in analysis.py (a 24-hour window with 5 MADs at the
+stations and 3.5 MADs on the differential) were picked by hand. This script
+loads the headline pair's hourly means once, without despiking, and evaluates
+a grid of station and differential window/threshold settings. For each setting
+it reports the spike rates and the resulting differential metrics: the 2015
+threshold datum, the co-eruption deflation and the current state.
+
+The hourly means are placed in shared memory, and the grid is evaluated by
+worker processes that attach to it without copying. Rolling statistics depend
+on the window but not the threshold, so they are computed once and shared:
+    1. The station median/MAD for each station window, one task per window,
+       written to shared memory.
+    2. One task per (station window, station threshold, differential window)
+       masks the stations, forms the differential and computes its rolling
+       median/MAD once. Each differential threshold then only needs a
+       comparison and the daily means.
+
+Each setting reproduces the batch pipeline exactly: the row with the default
+settings matches a plain analysis.py run on the same files.
+
+Usage:
+    uv run python qc_sweep.py [--station-windows 12 24 48] [--station-thresholds 3 4 5 6]
+                              [--diff-windows 12 24 48] [--diff-thresholds 2.5 3 3.5 4 5]
+                              [--pair REFERENCE:TARGET] [--workers N] [--no-cache]
+                              [--no-catalog] [--from-store]
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+import analysis
+from stations import DIFFERENTIAL_PAIRS, STATIONS, station_path
+
+# Default grid; each list includes the pipeline's own setting
+SWEEP_STATION_WINDOWS = [12, 24, 48]
+SWEEP_STATION_THRESHOLDS = [3.0, 4.0, 5.0, 6.0]
+SWEEP_DIFF_WINDOWS = [12, 24, 48]
+SWEEP_DIFF_THRESHOLDS = [2.5, 3.0, 3.5, 4.0, 5.0]
+
+SWEEP_WORKERS = os.cpu_count() or 1
+SWEEP_RESULTS_PATH = analysis.OUTPUT_DIR / "qc_sweep.csv"
+
+# Arrays shared with the worker processes: name -> (SharedMemory, ndarray view)
+_shared: dict[str, tuple[SharedMemory, np.ndarray]] = {}
+
+
+def _share(name: str, shape: tuple, dtype: str, values: np.ndarray | None = None) -> tuple:
+    """Create a shared array (optionally filled with `values`); returns its spec for `_attach`."""
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = SharedMemory(create=True, size=size)
+    array = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    if values is not None:
+        array[...] = values
+    _shared[name] = (shm, array)
+    return name, shm.name, shape, dtype
+
+
+def _attach(specs: list[tuple]):
+    """Worker initializer: map the shared arrays described by `specs`."""
+    for name, shm_name, shape, dtype in specs:
+        shm = SharedMemory(name=shm_name)
+        _shared[name] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _release():
+    """Unmap and remove the shared arrays (parent process)."""
+    for shm, _ in _shared.values():
+        shm.close()
+        shm.unlink()
+    _shared.clear()
+
+
+def _array(name: str) -> np.ndarray:
+    """View of a shared array."""
+    return _shared[name][1]
+
+
+def _spikes(values: np.ndarray, median: np.ndarray, mad: np.ndarray, threshold: float) -> np.ndarray:
+    """Spike flags from precomputed rolling statistics, with the arithmetic of `analysis.spike_mask`."""
+    return np.abs(values - median) > mad * analysis.MAD_SCALE * threshold
+
+
+def _station_stats(i_window: int, window: int, n_stations: int):
+    """Task: rolling median/MAD of each station's hourly depth for one window, into shared memory."""
+    for k in range(n_stations):
+        median, mad = analysis.rolling_median_mad(_array(f"depth{k}"), window)
+        _array(f"median{k}")[i_window] = median
+        _array(f"mad{k}")[i_window] = mad
+
+
+def _evaluate(i_window: int, station_window: int, station_threshold: float, diff_window: int,
+              diff_thresholds: list[float]) -> list[dict]:
+    """Task: metrics of every differential threshold for one station setting and differential window.
+
+    Mirrors load_station (station despike), compute_differentials (alignment on the
+    hours both stations have, differential despike) and differential_metrics.
+    """
+    setting = {"station_window": station_window, "station_threshold": station_threshold,
+               "diff_window": diff_window}
+    rates = {}
+    cleaned = []
+    for k, suffix in enumerate(("ref", "tgt")):
+        depth = _array(f"depth{k}")
+        is_spike = _spikes(depth, _array(f"median{k}")[i_window], _array(f"mad{k}")[i_window], station_threshold)
+        rates[f"{suffix}_spikes_pct"] = 100 * np.count_nonzero(is_spike) / max(len(depth), 1)
+        valid = ~np.isnan(depth) & ~is_spike
+        cleaned.append((_array(f"times{k}")[valid], depth[valid]))
+
+    # Hours where both stations have data: -(depth_target - depth_reference)
+    times, i_ref, i_tgt = np.intersect1d(cleaned[0][0], cleaned[1][0], assume_unique=True, return_indices=True)
+    differential = cleaned[0][1][i_ref] - cleaned[1][1][i_tgt]
+    index = pd.DatetimeIndex(times.view("datetime64[ns]"))
+    median, mad = analysis.rolling_median_mad(differential, diff_window)
+
+    results = []
+    for diff_threshold in diff_thresholds:
+        is_spike = _spikes(differential, median, mad, diff_threshold)
+        hourly = pd.Series(np.where(is_spike, np.nan, differential), index=index)
+        metrics = analysis.differential_metrics(pd.DataFrame({"differential_m": hourly.resample("1D").mean()}))
+        results.append({
+            **setting,
+            "diff_threshold": diff_threshold,
+            **rates,
+            "diff_spikes_pct": 100 * np.count_nonzero(is_spike) / max(len(differential), 1),
+            "threshold_2015_m": float(metrics["threshold_2015"]),
+            "deflation_m": float(metrics["deflation_magnitude"]),
+            "current_m": float(metrics["current_value"]),
+        })
+    return results
+
+
+def run_sweep(depths: dict[str, pd.Series], station_windows: list[int], station_thresholds: list[float],
+              diff_windows: list[int], diff_thresholds: list[float],
+              workers: int = SWEEP_WORKERS) -> pd.DataFrame:
+    """Evaluate every combination of spike-filter settings on undespiked hourly depths.
+
+    Args:
+        depths: Reference and target station hourly depths, in that order, as from
+            `analysis.load_stations(..., despike=False)`
+        station_windows: Station filter windows (hours)
+        station_thresholds: Station filter thresholds (scaled MADs)
+        diff_windows: Differential filter windows (hours)
+        diff_thresholds: Differential filter thresholds (scaled MADs)
+        workers: Worker processes
+
+    Returns:
+        DataFrame with one row per setting: the four parameters, the percentage of
+        hours flagged at each station (`ref_spikes_pct`, `tgt_spikes_pct`) and on
+        the differential (`diff_spikes_pct`), and the differential metrics
+        (`threshold_2015_m`, `deflation_m`, `current_m`)
+    """
+    specs = []
+    try:
+        for k, depth in enumerate(depths.values()):
+            n = len(depth)
+            times = depth.index.to_numpy().astype("datetime64[ns]").view("int64")
+            specs.append(_share(f"times{k}", (n,), "int64", times))
+            specs.append(_share(f"depth{k}", (n,), "float64", depth.to_numpy(dtype="float64", na_value=np.nan)))
+            specs.append(_share(f"median{k}", (len(station_windows), n), "float64"))
+            specs.append(_share(f"mad{k}", (len(station_windows), n), "float64"))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(specs,)) as pool:
+            t0 = time.perf_counter()
+            list(pool.map(_station_stats, range(len(station_windows)), station_windows,
+                          itertools.repeat(len(depths))))
+            print(f"  Station rolling statistics: {len(station_windows)} window(s) "
+                  f"({time.perf_counter() - t0:.1f} s)")
+
+            t0 = time.perf_counter()
+            tasks = list(itertools.product(enumerate(station_windows), station_thresholds, diff_windows))
+            futures = [pool.submit(_evaluate, i, window, threshold, diff_window, diff_thresholds)
+                       for (i, window), threshold, diff_window in tasks]
+            rows = [row for future in futures for row in future.result()]
+            print(f"  Differential settings: {len(tasks)} rolling pass(es), {len(rows)} combination(s) "
+                  f"({time.perf_counter() - t0:.1f} s)")
+    finally:
+        _release()
+
+    return pd.DataFrame(rows)
+
+
+def print_sweep(table: pd.DataFrame):
+    """Print the sweep table, marking the pipeline's current settings."""
+    current = ((table["station_window"] == analysis.STATION_SPIKE_WINDOW)
+               & (table["station_threshold"] == analysis.STATION_SPIKE_THRESHOLD)
+               & (table["diff_window"] == analysis.DIFFERENTIAL_SPIKE_WINDOW)
+               & (table["diff_threshold"] == analysis.DIFFERENTIAL_SPIKE_THRESHOLD))
+    shown = table.assign(current=np.where(current, "*", ""))
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(shown.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print("* = current settings")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Compare spike-filter settings for the differential uplift")
+    parser.add_argument("--station-windows", type=int, nargs="+", default=SWEEP_STATION_WINDOWS,
+                        metavar="HOURS", help="station filter windows")
+    parser.add_argument("--station-thresholds", type=float, nargs="+", default=SWEEP_STATION_THRESHOLDS,
+                        metavar="MADS", help="station filter thresholds")
+    parser.add_argument("--diff-windows", type=int, nargs="+", default=SWEEP_DIFF_WINDOWS,
+                        metavar="HOURS", help="differential filter windows")
+    parser.add_argument("--diff-thresholds", type=float, nargs="+", default=SWEEP_DIFF_THRESHOLDS,
+                        metavar="MADS", help="differential filter thresholds")
+    parser.add_argument("--pair", type=analysis._parse_pair, default=DIFFERENTIAL_PAIRS[0],
+                        metavar="REFERENCE:TARGET",
+                        help="station pair (default: {}:{})".format(*DIFFERENTIAL_PAIRS[0]))
+    parser.add_argument("--workers", type=int, default=SWEEP_WORKERS,
+                        help=f"worker processes for loading and the sweep (default: {SWEEP_WORKERS})")
+    parser.add_argument("--no-cache", action="store_true", help="decode every NetCDF file")
+    parser.add_argument("--no-catalog", action="store_true", help="select files by the year in their name")
+    parser.add_argument("--from-store", action="store_true", help="read 15s samples from the columnar store")
+    args = parser.parse_args(argv)
+
+    reference, target = args.pair
+    print(f"Loading {reference} ({STATIONS[reference]['name']}) and {target} ({STATIONS[target]['name']}) "
+          f"without despiking...")
+    cache = None if args.no_cache else analysis.HourlyChunkCache(analysis.CACHE_DIR / "hourly")
+    depths = analysis.load_stations({name: station_path(name) for name in (reference, target)},
+                                    workers=args.workers, cache=cache,
+                                    catalog_path=None if args.no_catalog else analysis.CATALOG_PATH,
+                                    store_dir=analysis.STORE_DIR if args.from_store else None,
+                                    despike=False)
+    if cache is not None:
+        cache.save()
+
+    print(f"\nSweeping {len(args.station_windows) * len(args.station_thresholds)} station x "
+          f"{len(args.diff_windows) * len(args.diff_thresholds)} differential settings "
+          f"with {args.workers} worker(s)...")
+    table = run_sweep(depths, args.station_windows, args.station_thresholds,
+                      args.diff_windows, args.diff_thresholds, args.workers)
+
+    print()
+    print_sweep(table)
+    SWEEP_RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(SWEEP_RESULTS_PATH, index=False)
+    print(f"\nSaved: {SWEEP_RESULTS_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
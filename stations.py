@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+stations.py - Registry of Axial Seamount bottom pressure stations
+
+One entry per BPR: OOI reference designator (which locates its 15s stream
+under KDATA_DIR), map position and plot styling. Used by analysis.py to load
+any set of stations and by make_caldera_map.py to place the markers.
+
+Stations outside the OOI archive (e.g. campaign reference benchmarks) are
+added with an explicit "path" to a directory of files in the same 15s format.
+Stations without verified coordinates are loaded but not drawn on the map.
+
+botpt.toml can set the archive location ([paths] kdata_dir), the differential
+pairs ([stations] pairs = ["MJ03E:MJ03F"]) and add or override stations with
+[stations.<NAME>] tables using the keys below.
+"""
+
+from pathlib import Path
+
+import config
+
+KDATA_DIR = config.path_setting("paths", "kdata_dir", Path("/home/jovyan/ooi/kdata"))
+STREAM_SUFFIX = "streamed-botpt_nano_sample_15s"
+
+# BPR stations (coordinates verified from OOI NetCDF metadata where given)
+STATIONS = {
+    "MJ03E": {
+        "refdes": "RS03ECAL-MJ03E-06-BOTPTA302",
+        "name": "Eastern Caldera",
+        "lon": -129.974113, "lat": 45.939888,
+        "label": "MJ03E\n(Eastern Caldera)", "label_offset": (12, -15),
+        "color": "blue",
+    },
+    "MJ03F": {
+        "refdes": "RS03CCAL-MJ03F-05-BOTPTA301",
+        "name": "Central Caldera",
+        "lon": -130.008772, "lat": 45.95485,
+        "label": "MJ03F\n(Central Caldera)", "label_offset": (12, 8),
+        "color": "red",
+    },
+    "MJ03B": {
+        "refdes": "RS03ASHS-MJ03B-09-BOTPTA304",
+        "name": "ASHES",
+        "lon": None, "lat": None,
+        "label": "MJ03B\n(ASHES)", "label_offset": (12, 8),
+        "color": "green",
+    },
+    "MJ03D": {
+        "refdes": "RS03INT2-MJ03D-06-BOTPTA303",
+        "name": "International District",
+        "lon": None, "lat": None,
+        "label": "MJ03D\n(Int'l District)", "label_offset": (12, -15),
+        "color": "purple",
+    },
+}
+
+# Stations added or changed in botpt.toml; new ones default to unmapped, black markers
+for _name, _entry in config.CONFIG.get("stations", {}).items():
+    if isinstance(_entry, dict):
+        STATIONS.setdefault(_name, {"refdes": None, "name": _name, "lon": None, "lat": None,
+                                    "label": _name, "label_offset": (12, 8), "color": "black"})
+        STATIONS[_name].update(_entry)
+        STATIONS[_name]["label_offset"] = tuple(STATIONS[_name]["label_offset"])
+        if "path" in _entry:
+            STATIONS[_name]["path"] = config.resolve_path(_entry["path"])
+
+# Differentials computed by the pipeline, as (reference, target): target uplift minus
+# reference uplift. The first pair is the headline caldera-center signal.
+DIFFERENTIAL_PAIRS = [tuple(pair.split(":")) for pair in config.setting("stations", "pairs", ["MJ03E:MJ03F"])]
+
+
+def station_path(name: str) -> Path:
+    """Directory of a station's 15s NetCDF files."""
+    info = STATIONS[name]
+    if "path" in info:
+        return Path(info["path"])
+    return KDATA_DIR / f"{info['refdes']}-{STREAM_SUFFIX}"
+
+
+def depth_column(name: str) -> str:
+    """Column name of a station's depth in the exported products."""
+    return f"depth_{name.lower()}_m"
+
+
+def differential_column(reference: str, target: str) -> str:
+    """Column name of a differential; the headline pair keeps the original `differential_m`."""
+    if (reference, target) == DIFFERENTIAL_PAIRS[0]:
+        return "differential_m"
+    return f"differential_{target.lower()}_{reference.lower()}_m"
+
+
+def mapped_stations() -> dict[str, dict]:
+    """Stations with coordinates, for drawing on maps."""
+    return {name: info for name, info in STATIONS.items() if info["lon"] is not None}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+synthetic_botpt.py - Generate synthetic OOI BOTPT 15s NetCDF files
+
+Writes files that look like the OOI Cabled Array BOTPT 15s stream, so the
+pipeline and benchmarks can run without /home/jovyan/ooi/kdata:
+
+    deployment0001_<refdes>-streamed-botpt_nano_sample_15s_YYYYMMDDTHHMMSS-YYYYMMDDTHHMMSS.nc
+
+Each file has an `obs` dimension, a `time` variable in seconds since
+1900-01-01 and `botsflu_meandepth` (negative, below sea surface).
+
+Signal model (depth in m, positive down before the sign flip):
+    - Ocean tides common to both stations (M2, S2, K1, O1 constituents)
+    - Linear sensor drift, different for each station
+    - Volcanic inflation at the caldera center station (MJ03F), with a
+      co-eruption deflation step on ERUPTION_DATE
+    - White noise at the mm level, injected spikes and recording gaps
+
+Usage:
+    uv run python synthetic_botpt.py <output dir> [--days 365] [--file-days 30]
+"""
+
+import argparse
+from pathlib import Path
+
+import netCDF4
+import numpy as np
+import pandas as pd
+
+SAMPLE_SECONDS = 15
+NC_EPOCH = pd.Timestamp("1900-01-01")
+
+# Reference designators, as in the real stream names
+REFDES = {
+    "MJ03E": "RS03ECAL-MJ03E-06-BOTPTA302",
+    "MJ03F": "RS03CCAL-MJ03F-05-BOTPTA301",
+}
+
+# Station depths (m) and drift (m/year); inflation only at the caldera center
+BASE_DEPTH = {"MJ03E": 1517.0, "MJ03F": 1542.0}
+DRIFT_M_PER_YEAR = {"MJ03E": 0.02, "MJ03F": 0.03}
+INFLATION_M_PER_YEAR = {"MJ03E": 0.10, "MJ03F": 0.30}
+ERUPTION_DATE = pd.Timestamp("2015-04-24")
+ERUPTION_DEFLATION_M = {"MJ03E": 1.0, "MJ03F": 2.4}
+
+# Tidal constituents: (period in hours, amplitude in m, phase in radians)
+TIDES = [(12.4206, 0.9, 0.0), (12.0, 0.3, 0.7), (23.9345, 0.4, 1.9), (25.8193, 0.25, 2.6)]
+
+
+def synthetic_depth(times: pd.DatetimeIndex, station: str, rng: np.random.Generator,
+                    spike_rate: float = 2e-4) -> np.ndarray:
+    """Positive depth (m) for one station at the given times."""
+    hours = (times - ERUPTION_DATE).total_seconds().to_numpy() / 3600
+    years = hours / (24 * 365.25)
+
+    depth = np.full(len(times), BASE_DEPTH[station])
+    for period, amplitude, phase in TIDES:
+        depth += amplitude * np.sin(2 * np.pi * hours / period + phase)
+    depth += DRIFT_M_PER_YEAR[station] * years
+
+    # Inflation lowers depth; the eruption drops the seafloor (depth increases)
+    depth -= INFLATION_M_PER_YEAR[station] * years
+    depth += np.where(hours >= 0, ERUPTION_DEFLATION_M[station], 0.0)
+
+    depth += rng.normal(0, 0.002, len(times))
+
+    # Spikes of a few cm to a few m, either sign
+    n_spikes = rng.binomial(len(times), spike_rate)
+    where = rng.integers(0, len(times), n_spikes)
+    depth[where] += rng.choice([-1, 1], n_spikes) * rng.uniform(0.05, 5.0, n_spikes)
+    return depth
+
+
+def write_file(path: Path, times: pd.DatetimeIndex, depth: np.ndarray):
+    """Write one OOI-style 15s NetCDF file."""
+    with netCDF4.Dataset(path, "w") as nc:
+        nc.createDimension("obs", len(times))
+        obs = nc.createVariable("obs", "i4", ("obs",))
+        obs[:] = np.arange(len(times))
+        time_var = nc.createVariable("time", "f8", ("obs",))
+        time_var.units = "seconds since 1900-01-01 0:00:00"
+        time_var.standard_name = "time"
+        time_var[:] = (times - NC_EPOCH).total_seconds().to_numpy()
+        depth_var = nc.createVariable("botsflu_meandepth", "f8", ("obs",), fill_value=-9999999.0)
+        depth_var.units = "m"
+        depth_var.long_name = "Seafloor Uplift and Deflation - Mean Seafloor Depth"
+        depth_var[:] = -depth
+        # A second variable so readers that load everything pay for it, as with real files
+        pressure_var = nc.createVariable("bottom_pressure", "f4", ("obs",))
+        pressure_var.units = "psia"
+        pressure_var[:] = depth / 0.670 + 14.7
+
+
+def file_name(station: str, times: pd.DatetimeIndex, deployment: int) -> str:
+    """OOI-style name of a 15s file holding `times`."""
+    return (f"deployment{deployment:04d}_{REFDES[station]}-streamed-botpt_nano_sample_15s_"
+            f"{times[0]:%Y%m%dT%H%M%S}-{times[-1]:%Y%m%dT%H%M%S}.nc")
+
+
+def write_synthetic_archive(out_dir: Path, station: str, start: str = "2015-01-01", days: int = 365,
+                            file_days: int = 30, gap_fraction: float = 0.02, seed: int = 0) -> list[Path]:
+    """Write `days` of 15s data for one station, split into files of `file_days`.
+
+    Each file is a new deployment. A fraction `gap_fraction` of files also has a
+    recording gap of up to a day.
+
+    Returns:
+        Paths of the written files
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed + sum(map(ord, station)))
+    start = pd.Timestamp(start)
+    paths = []
+    for i, file_start in enumerate(pd.date_range(start, start + pd.Timedelta(days=days),
+                                                 freq=f"{file_days}D", inclusive="left")):
+        file_end = min(file_start + pd.Timedelta(days=file_days), start + pd.Timedelta(days=days))
+        times = pd.date_range(file_start, file_end, freq=f"{SAMPLE_SECONDS}s", inclusive="left")
+        if rng.random() < gap_fraction:
+            gap_start = rng.integers(0, len(times))
+            times = times.delete(np.arange(gap_start, min(len(times), gap_start + 5760)))
+        depth = synthetic_depth(times, station, rng)
+
+        name = file_name(station, times, i + 1)
+        write_file(out_dir / name, times, depth)
+        paths.append(out_dir / name)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic OOI BOTPT 15s NetCDF files")
+    parser.add_argument("out_dir", type=Path, help="output directory (one subdirectory per station)")
+    parser.add_argument("--start", default="2015-01-01", help="first sample time")
+    parser.add_argument("--days", type=int, default=365, help="days of data per station")
+    parser.add_argument("--file-days", type=int, default=30, help="days per NetCDF file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for station in REFDES:
+        paths = write_synthetic_archive(args.out_dir / station, station, args.start, args.days,
+                                        args.file_days, seed=args.seed)
+        print(f"{station}: wrote {len(paths)} files to {args.out_dir / station}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The analysis scripts live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analysis  # noqa: E402
+import synthetic_botpt  # noqa: E402
+
+
+@pytest.fixture
+def write_nc():
+    """Write one synthetic 15s NetCDF file of [start, end) into a station directory; returns its path.
+
+    `offset_seconds` shifts the sample clock; `spike_rate` is passed to
+    `synthetic_botpt.synthetic_depth`.
+    """
+    def write(directory: Path, station: str, start: str, end: str, deployment: int = 1, seed: int = 0,
+              offset_seconds: int = 0, spike_rate: float = 2e-4) -> Path:
+        times = pd.date_range(start, end, freq=f"{synthetic_botpt.SAMPLE_SECONDS}s", inclusive="left")
+        times = times + pd.Timedelta(seconds=offset_seconds)
+        depth = synthetic_botpt.synthetic_depth(times, station, np.random.default_rng(seed), spike_rate)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / synthetic_botpt.file_name(station, times, deployment)
+        synthetic_botpt.write_file(path, times, depth)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """Point the analysis at a scratch output tree and scratch station directories."""
+    out = tmp_path / "out"
+    monkeypatch.setattr(analysis, "DATA_DIR", out / "data")
+    monkeypatch.setattr(analysis, "FIGURES_DIR", out / "figures")
+    monkeypatch.setattr(analysis, "CACHE_DIR", out / "cache")
+    monkeypatch.setattr(analysis, "CATALOG_PATH", out / "cache" / "catalog.sqlite")
+    monkeypatch.setattr(analysis, "RUN_REPORT_PATH", out / "run_report.json")
+    for name in ("MJ03E", "MJ03F"):
+        monkeypatch.setitem(analysis.STATIONS, name, {**analysis.STATIONS[name], "path": tmp_path / name})
+    return tmp_path
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+import botpt
+
+
+def _daily(output_dir, index, values):
+    (output_dir / "data").mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({"differential_m": np.asarray(values, dtype="float64")},
+                 index=pd.DatetimeIndex(index, name="time")).to_parquet(
+        output_dir / "data" / "differential_uplift_daily.parquet")
+
+
+def test_status_of_a_product_without_data(tmp_path, capsys):
+    for index, values in (([], []), (pd.date_range("2015-01-01", periods=3), [np.nan] * 3)):
+        _daily(tmp_path, index, values)
+        result = botpt.read_status(tmp_path)
+        assert result == {"latest_day": None, "current_m": None, "threshold_2015_m": None}
+        botpt.print_status(result)
+        assert "no differential data" in capsys.readouterr().out
+
+
+def test_status_skips_trailing_gap_days(tmp_path, capsys):
+    index = [*pd.date_range("2015-01-01", periods=3), *pd.date_range("2020-01-01", periods=3)]
+    _daily(tmp_path, index, [1.0, 1.5, 1.2, 1.7, np.nan, np.nan])
+    result = botpt.read_status(tmp_path)
+    assert result["latest_day"] == "2020-01-01"
+    assert np.isclose(result["current_m"], 0.2)
+    assert result["threshold_2015_m"] == 1.5
+
+    # Without pre-eruption days there is no threshold to reference the value to
+    _daily(tmp_path, index[3:], [1.7, np.nan, np.nan])
+    result = botpt.read_status(tmp_path)
+    assert result["latest_day"] == "2020-01-01"
+    assert result["current_m"] is None and result["threshold_2015_m"] is None
+    botpt.print_status(result)
+    assert "unknown" in capsys.readouterr().out
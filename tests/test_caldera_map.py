@@ -0,0 +1,58 @@
+import netCDF4
+import numpy as np
+
+import make_caldera_map
+
+
+def _write_grid(path, n=40):
+    """Small NetCDF-4 grid of a rough cone, with an even size so stride and mean reads match in shape."""
+    rng = np.random.default_rng(0)
+    lon = np.linspace(-130.05, -129.95, n)
+    lat = np.linspace(45.90, 46.00, n)
+    r = np.hypot(*np.meshgrid((lon - lon.mean()) / 0.05, (lat - lat.mean()) / 0.05))
+    z = -1500 - 300 * r + rng.normal(0, 20, (n, n))
+    with netCDF4.Dataset(path, "w") as ds:
+        ds.createDimension("lon", n)
+        ds.createDimension("lat", n)
+        ds.createVariable("lon", "f8", ("lon",))[:] = lon
+        ds.createVariable("lat", "f8", ("lat",))[:] = lat
+        ds.createVariable("z", "f4", ("lat", "lon"))[:] = z
+
+
+def test_contour_cache_is_keyed_by_decimation(tmp_path):
+    grid = tmp_path / "grid.grd"
+    _write_grid(grid)
+    levels = np.arange(-1800, -1500, 50)
+    cache_dir = tmp_path / "contours"
+
+    def contours(decimate, cache):
+        lon, lat, z = make_caldera_map.load_bathymetry(grid, subsample=2, decimate=decimate)
+        return make_caldera_map.caldera_contours(z, lon, lat, 1e-4, levels=levels, source=grid,
+                                                 decimation=(2, decimate), cache_dir=cache)
+
+    stride = contours("stride", cache_dir)
+    mean = contours("mean", cache_dir)
+    fresh = contours("mean", tmp_path / "fresh")
+
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+    for a, b in zip(mean, fresh):
+        assert len(a) == len(b) and all(np.array_equal(x, y) for x, y in zip(a, b))
+    assert any(len(a) != len(b) or not all(np.array_equal(x, y) for x, y in zip(a, b))
+               for a, b in zip(stride, mean))
+
+
+
+def test_auto_selected_level_keeps_the_default_file_name(tmp_path, monkeypatch):
+    grid = tmp_path / "grid.grd"
+    _write_grid(grid)
+    monkeypatch.setattr(make_caldera_map, "BATHY_PATH", grid)
+    # As if a 4x pyramid level had been picked for the output resolution
+    monkeypatch.setattr(make_caldera_map, "select_bathymetry", lambda extent, dpi: (grid, 4))
+    names = []
+    monkeypatch.setattr(make_caldera_map, "plot_caldera_map",
+                        lambda *args, subsample, **kwargs: names.append(subsample))
+
+    make_caldera_map.main(["--dpi", "20"])
+    make_caldera_map.main(["--dpi", "20", "--subsample", "2"])
+    # plot_caldera_map adds the _<N>x suffix for subsample > 1
+    assert names == [1, 2]
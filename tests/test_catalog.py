@@ -0,0 +1,38 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import analysis
+import synthetic_botpt
+
+
+def test_catalog_matches_the_exact_directory(tmp_path):
+    catalog = tmp_path / "catalog.sqlite"
+    # A sibling directory whose name starts with the station's directory name
+    own = synthetic_botpt.write_synthetic_archive(tmp_path / "MJ03E", "MJ03E", days=2, file_days=1,
+                                                  gap_fraction=0)
+    synthetic_botpt.write_synthetic_archive(tmp_path / "MJ03E2", "MJ03E", days=2, file_days=1, gap_fraction=0)
+
+    analysis.update_catalog(tmp_path / "MJ03E2", "MJ03E", catalog)
+    analysis.update_catalog(tmp_path / "MJ03E", "MJ03E", catalog)
+    files = analysis.catalog_files("MJ03E", pd.Timestamp("2015-01-01"), pd.Timestamp("2015-01-03"),
+                                   catalog, tmp_path / "MJ03E")
+    assert files == sorted((f.resolve() for f in own), key=lambda f: f.name)
+
+    # Re-listing the station's directory must not drop the sibling's rows, or touch them
+    (tmp_path / "MJ03E" / own[0].name).unlink()
+    analysis.update_catalog(tmp_path / "MJ03E", "MJ03E", catalog)
+    remaining = analysis.catalog_files("MJ03E", pd.Timestamp("2015-01-01"), pd.Timestamp("2015-01-03"), catalog)
+    assert len(remaining) == 3
+
+
+def test_catalog_connection_closed_on_error(tmp_path):
+    with pytest.raises(RuntimeError):
+        with analysis._connect_catalog(tmp_path / "catalog.sqlite") as conn:
+            conn.execute("INSERT INTO scans VALUES ('x', 1)")
+            raise RuntimeError
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with analysis._connect_catalog(tmp_path / "catalog.sqlite") as conn:
+        assert conn.execute("SELECT COUNT(*) FROM scans").fetchone() == (0,)
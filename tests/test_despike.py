@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+
+
+def _noisy(n, seed, columns=None):
+    """Random walk with spikes, NaN runs and an inf, shaped (n,) or (n, columns)."""
+    rng = np.random.default_rng(seed)
+    shape = (n,) if columns is None else (n, columns)
+    values = 1500 + np.cumsum(rng.normal(0, 0.01, shape), axis=0)
+    values[rng.random(shape) < 0.02] += rng.choice([-1, 1], 1) * 0.5
+    values[rng.random(shape) < 0.05] = np.nan
+    values[100:130] = np.nan
+    values[n // 2] = np.inf
+    return values
+
+
+def _reference_mask(values, window, threshold):
+    """The original pandas implementation: rolling median, then rolling median of |deviation|."""
+    frame = pd.DataFrame(values).replace([np.inf, -np.inf], np.nan)
+    rolling = dict(window=window, center=True, min_periods=1)
+    median = frame.rolling(**rolling).median().to_numpy()
+    mad = pd.DataFrame(np.abs(frame.to_numpy() - median)).rolling(**rolling).median().to_numpy()
+    mask = np.abs(values.reshape(median.shape) - median) > mad * analysis.MAD_SCALE * threshold
+    return mask.reshape(values.shape)
+
+
+@pytest.mark.parametrize("window", [3, 24, 25, analysis.ROLLING_BLOCK_MAX_WINDOW,
+                                    analysis.ROLLING_BLOCK_MAX_WINDOW + 1, 240])
+@pytest.mark.parametrize("columns", [None, 3])
+def test_spike_mask_matches_pandas_rolling(window, columns):
+    for seed in range(3):
+        values = _noisy(2000, seed, columns)
+        for threshold in (3.5, 5.0):
+            mask = analysis.spike_mask(values, window, threshold)
+            np.testing.assert_array_equal(mask, _reference_mask(values, window, threshold))
+
+
+@pytest.mark.parametrize("window", [24, analysis.RAW_QC_WINDOW_SAMPLES])
+def test_despike_stream_matches_spike_mask_for_any_chunking(window):
+    rng = np.random.default_rng(window)
+    values = _noisy(3 * window + 1000, window)
+    times = pd.date_range("2015-01-01", periods=len(values), freq="15s").to_numpy().astype("datetime64[ns]")
+    expected = np.where(analysis.spike_mask(values, window, 5.0), np.nan, values)
+
+    for _ in range(5):
+        # Random cut points, including empty and single-sample chunks
+        cuts = np.sort(rng.integers(0, len(values), rng.integers(1, 40)))
+        chunks = [(t, v) for t, v in zip(np.split(times, cuts), np.split(values, cuts))]
+        despiker = analysis.StreamingDespiker(window, 5.0)
+        out = list(analysis.despike_stream(chunks, despiker=despiker))
+
+        np.testing.assert_array_equal(np.concatenate([t for t, _ in out]), times)
+        np.testing.assert_array_equal(np.concatenate([v for _, v in out]), expected)
+        assert despiker.n_samples == len(values)
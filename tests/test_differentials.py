@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+
+def _hourly(start: str, hours: int, level: float, seed: int) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=hours, freq="h")
+    return pd.Series(level + 0.01 * rng.standard_normal(hours), index=index)
+
+
+def test_short_station_does_not_truncate_other_pairs():
+    depths = {
+        "MJ03E": _hourly("2015-01-01", 24 * 40, 1520.0, 0),
+        "MJ03F": _hourly("2015-01-01", 24 * 40, 1510.0, 1),
+        # MJ03B only covers ten days in the middle of the span
+        "MJ03B": _hourly("2015-01-15", 24 * 10, 1530.0, 2),
+    }
+    headline, _ = analysis.compute_differentials(depths, [("MJ03E", "MJ03F")])
+    both, _ = analysis.compute_differentials(depths, [("MJ03E", "MJ03F"), ("MJ03B", "MJ03F")])
+
+    assert len(both) == len(headline) == 24 * 40
+    pd.testing.assert_series_equal(both["differential_m"], headline["differential_m"])
+
+    second = both["differential_mj03f_mj03b_m"]
+    covered = (both.index >= "2015-01-15") & (both.index < "2015-01-25")
+    assert second[~covered].isna().all()
+    assert second[covered].notna().sum() > 0.9 * covered.sum()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+
+def _products():
+    return [pd.read_parquet(analysis.DATA_DIR / f"differential_uplift_{product}.parquet")
+            for product in ("hourly", "daily")]
+
+
+def test_incremental_matches_full_run_after_gap_near_tail(outputs, write_nc):
+    # MJ03F stops for four days shortly before the end of the first export, so the last
+    # 48 rows span far more than 48 hours
+    write_nc(outputs / "MJ03E", "MJ03E", "2015-01-01", "2015-01-13", 1, seed=1, spike_rate=2e-3)
+    write_nc(outputs / "MJ03F", "MJ03F", "2015-01-01", "2015-01-08", 1, seed=2, spike_rate=2e-3)
+    write_nc(outputs / "MJ03F", "MJ03F", "2015-01-12", "2015-01-13", 2, seed=3, spike_rate=2e-3)
+    options = ["--workers", "1", "--no-cache", "--no-catalog", "--no-plots"]
+    analysis.main(options)
+
+    write_nc(outputs / "MJ03E", "MJ03E", "2015-01-13", "2015-01-16", 2, seed=4, spike_rate=2e-3)
+    write_nc(outputs / "MJ03F", "MJ03F", "2015-01-13", "2015-01-16", 3, seed=5, spike_rate=2e-3)
+    analysis.main(options + ["--incremental"])
+    incremental = _products()
+
+    for path in analysis.DATA_DIR.glob("*.parquet"):
+        path.unlink()
+    analysis.main(options)
+    for updated, full in zip(incremental, _products()):
+        pd.testing.assert_frame_equal(updated, full, check_freq=False)
+
+
+def test_incremental_bounds_count_pair_rows(outputs):
+    index = pd.date_range("2015-01-01", periods=400, freq="h")
+    hourly = pd.DataFrame({"depth_mj03e_m": 1.0, "depth_mj03f_m": 2.0, "differential_m": -1.0}, index=index)
+    # The last 60 MJ03F hours are missing
+    hourly.iloc[-60:, 1:] = np.nan
+    analysis.export_parquet(hourly, hourly.resample("1D").mean())
+
+    rewrite_from, since = analysis.incremental_bounds(analysis.DATA_DIR / "differential_uplift_hourly.parquet",
+                                                      [("MJ03E", "MJ03F")])
+    pair_rows = index[:-60]
+    assert rewrite_from == pair_rows[-analysis.INCREMENTAL_REWRITE_ROWS]
+    assert since == pair_rows[-2 * analysis.INCREMENTAL_REWRITE_ROWS]
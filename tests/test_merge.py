@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+
+def _chunk(hours, depths, counts):
+    index = pd.DatetimeIndex(pd.to_datetime(hours)).as_unit("ns")
+    return pd.DataFrame({"depth_m": np.asarray(depths, dtype="float64"), "count": np.asarray(counts)},
+                        index=index)
+
+
+def test_partial_hours_split_by_deployment():
+    # 10:00 is split between two deployments (120 + 100 samples, under one full hour);
+    # 11:00 between two files of the newer deployment
+    old = _chunk(["2020-01-01 09:00", "2020-01-01 10:00"], [1500.0, 1500.2], [240, 120])
+    new_a = _chunk(["2020-01-01 10:00", "2020-01-01 11:00"], [1501.0, 1501.1], [100, 140])
+    new_b = _chunk(["2020-01-01 11:00", "2020-01-01 12:00"], [1501.3, 1501.4], [100, 240])
+    chunks = [(4, old), (5, new_a), (5, new_b)]
+
+    newer = analysis.merge_hourly_chunks(chunks, "newer")
+    assert newer.loc["2020-01-01 10:00", "depth_m"] == 1501.0
+    assert newer.loc["2020-01-01 10:00", "count"] == 100
+    # Files of one deployment are pooled, under either policy
+    assert np.isclose(newer.loc["2020-01-01 11:00", "depth_m"], (1501.1 * 140 + 1501.3 * 100) / 240)
+    assert newer.loc["2020-01-01 11:00", "count"] == 240
+
+    average = analysis.merge_hourly_chunks(chunks, "average")
+    assert np.isclose(average.loc["2020-01-01 10:00", "depth_m"], (1500.2 * 120 + 1501.0 * 100) / 220)
+    assert average.loc["2020-01-01 10:00", "count"] == 220
+    assert average.loc["2020-01-01 11:00", "depth_m"] == newer.loc["2020-01-01 11:00", "depth_m"]
+
+    # Single-file hours are kept as they are
+    for merged in (newer, average):
+        assert merged.loc["2020-01-01 09:00", "depth_m"] == 1500.0
+        assert merged.loc["2020-01-01 12:00", "depth_m"] == 1501.4
+
+
+def test_newer_pools_the_newest_deployments_files():
+    # A full overlap hour: the newer deployment's two files are pooled, the older one dropped
+    old = _chunk(["2020-01-01 10:00"], [1500.0], [240])
+    new_a = _chunk(["2020-01-01 10:00"], [1501.0], [60])
+    new_b = _chunk(["2020-01-01 10:00"], [1502.0], [180])
+
+    merged = analysis.merge_hourly_chunks([(1, old), (2, new_a), (2, new_b)], "newer")
+    assert np.isclose(merged["depth_m"].iloc[0], (1501.0 * 60 + 1502.0 * 180) / 240)
+    assert merged["count"].iloc[0] == 240
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+import monitor
+import synthetic_botpt
+
+
+def test_read_since_matches_a_full_read(tmp_path, write_nc):
+    path = write_nc(tmp_path / "MJ03E", "MJ03E", "2015-01-01", "2015-01-03", seed=1)
+    since = pd.Timestamp("2015-01-02 06:00:07")
+
+    times, depth = analysis._read_file_samples(path)
+    keep = times >= since.to_datetime64()
+    since_times, since_depth = analysis._read_file_samples(path, since)
+    np.testing.assert_array_equal(since_times, times[keep])
+    np.testing.assert_array_equal(since_depth, depth[keep])
+    assert analysis._read_file_samples(path, pd.Timestamp("2015-02-01")) is None
+
+
+def test_poll_reads_past_time_end_without_changing_it(tmp_path, monkeypatch, write_nc):
+    monkeypatch.setattr(analysis, "TIME_END", "2015-01-02")
+    directory = tmp_path / "MJ03E"
+    write_nc(directory, "MJ03E", "2015-01-01", "2015-01-05", seed=1)
+
+    feed = monitor.StationFeed("MJ03E", directory, pd.Timestamp("2015-01-03"))
+    n_new = feed.poll(tmp_path / "catalog.sqlite")
+
+    assert n_new == 2 * 24 * 3600 // synthetic_botpt.SAMPLE_SECONDS
+    assert feed.last_time == pd.Timestamp("2015-01-04 23:59:45")
+    assert analysis.TIME_END == "2015-01-02"
+    assert feed.poll(tmp_path / "catalog.sqlite") == 0
+
+
+def _samples(start, end, seed=0):
+    times = pd.date_range(start, end, freq=f"{synthetic_botpt.SAMPLE_SECONDS}s", inclusive="left")
+    depth = 1500 + np.random.default_rng(seed).normal(0, 0.002, len(times))
+    return times.to_numpy().astype("datetime64[ns]"), depth
+
+
+def test_gaps_between_polls_match_the_batch_hourly_grid():
+    times, depth = _samples("2015-01-01", "2015-01-06", seed=1)
+    hours = times.astype("datetime64[h]")
+    # Hourly spikes either side of a 12-hour outage that falls between two polls
+    for hour in ("2015-01-02T20", "2015-01-03T13"):
+        depth[hours == np.datetime64(hour)] += 0.05
+    keep = (times < np.datetime64("2015-01-03")) | (times >= np.datetime64("2015-01-03T12"))
+    times, depth = times[keep], depth[keep]
+
+    feed = monitor.StationFeed("MJ03E", None, pd.Timestamp("2015-01-01"))
+    split = np.searchsorted(times, np.datetime64("2015-01-03"))
+    feed._ingest(times[:split], depth[:split])
+    feed._ingest(times[split:], depth[split:])
+
+    hourly = pd.Series(depth, index=pd.DatetimeIndex(times)).resample("1h").mean()
+    batch = analysis.remove_spikes(hourly, analysis.STATION_SPIKE_WINDOW, analysis.STATION_SPIKE_THRESHOLD)
+    assert feed.final.index[0] == batch.index[0] and feed.final.index[-1] > pd.Timestamp("2015-01-04")
+    pd.testing.assert_series_equal(feed.final, batch[:feed.final.index[-1]],
+                                   check_freq=False, check_names=False)
+
+
+def test_hours_of_a_lagging_station_are_kept_until_paired():
+    reference = monitor.StationFeed("MJ03F", None, pd.Timestamp("2015-01-01"))
+    target = monitor.StationFeed("MJ03E", None, pd.Timestamp("2015-01-01"))
+    differential = monitor.DifferentialMonitor(reference, target, threshold=0.0)
+
+    reference._ingest(*_samples("2015-01-01", "2015-01-10", seed=1))
+    differential.update()
+    assert len(reference.final) > 2 * monitor.HISTORY_HOURS
+
+    # The target catches up: every hour final at both stations is differenced
+    target._ingest(*_samples("2015-01-01", "2015-01-10", seed=2))
+    differential.update()
+    paired = reference.final.index.intersection(target.final.index)
+    assert differential._last_final == paired[-1]
+    assert differential.despiker.n_samples + differential.despiker.lookahead >= 8 * 24
+    assert len(reference.final) == monitor.HISTORY_HOURS
+
+
+def test_reference_datum_follows_the_exported_product(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, "DATA_DIR", tmp_path)
+    path = tmp_path / "differential_uplift_daily.parquet"
+    index = pd.date_range("2015-01-01", "2015-06-30", freq="1D", name="time")
+
+    pd.DataFrame({"differential_m": np.full(len(index), 1.0)}, index=index).to_parquet(path)
+    threshold, source = monitor._reference_datum({})
+    assert threshold == 1.0
+    assert monitor._reference_datum({"threshold_m": 1.0, "threshold_source": source}) == (1.0, source)
+
+    # A re-export with other values moves the datum
+    pd.DataFrame({"differential_m": np.full(len(index), 2.5)}, index=index).to_parquet(path)
+    threshold, changed = monitor._reference_datum({"threshold_m": 1.0, "threshold_source": source})
+    assert threshold == 2.5 and changed != source
@@ -0,0 +1,45 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import analysis
+
+
+def test_workers_use_the_parents_time_range(tmp_path, monkeypatch, write_nc):
+    directory = tmp_path / "MJ03E"
+    for day in range(1, 5):
+        write_nc(directory, "MJ03E", f"2015-01-0{day}", f"2015-01-0{day + 1}", seed=day)
+    monkeypatch.setattr(analysis, "TIME_START", "2015-01-02")
+    monkeypatch.setattr(analysis, "TIME_END", "2015-01-03")
+
+    serial = analysis.load_station(directory, "MJ03E", despike=False)
+    # Spawned workers import analysis afresh, with the configured time range
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pooled = analysis.load_station(directory, "MJ03E", pool, despike=False)
+    assert serial.index[0] == pd.Timestamp("2015-01-02") and serial.index[-1] == pd.Timestamp("2015-01-03 23:00")
+    pd.testing.assert_series_equal(pooled, serial)
+
+
+def _products():
+    return [pd.read_parquet(analysis.DATA_DIR / f"differential_uplift_{product}.parquet")
+            for product in ("hourly", "daily")]
+
+
+def test_pool_cache_and_catalog_match_a_serial_run(outputs, write_nc):
+    # Two deployments per station, overlapping by half a day, and a gap at MJ03F
+    for name, seed in (("MJ03E", 1), ("MJ03F", 3)):
+        write_nc(outputs / name, name, "2015-01-01", "2015-01-08", 1, seed=seed, spike_rate=2e-3)
+        write_nc(outputs / name, name, "2015-01-07 12:00", "2015-01-15", 2, seed=seed + 1, spike_rate=2e-3)
+    write_nc(outputs / "MJ03F", "MJ03F", "2015-01-17", "2015-01-20", 3, seed=5, spike_rate=2e-3)
+
+    analysis.main(["--workers", "1", "--no-cache", "--no-catalog", "--no-plots"])
+    serial = _products()
+
+    # Cold cache and new catalog, then both warm
+    for _ in range(2):
+        analysis.main(["--workers", "3", "--no-plots"])
+        for pooled, expected in zip(_products(), serial):
+            pd.testing.assert_frame_equal(pooled, expected)
+    assert any((analysis.CACHE_DIR / "hourly").iterdir())
+    assert analysis.CATALOG_PATH.exists()
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+
+
+def _products(start, end, level):
+    index = pd.date_range(start, end, freq="1h", inclusive="left", name="time")
+    hourly = pd.DataFrame({"differential_m": np.full(len(index), level)}, index=index)
+    return hourly, hourly.resample("1D").mean()
+
+
+def test_exports_leave_no_stale_year_partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis, "DATA_DIR", tmp_path)
+    partitions = analysis._partition_dir(tmp_path / "differential_uplift_hourly.parquet")
+
+    analysis.export_parquet(*_products("2015-01-01", "2018-01-01", 1.0), partition_years=True)
+    assert sorted(p.name for p in partitions.iterdir()) == ["year=2015", "year=2016", "year=2017"]
+
+    # A shorter re-export drops the years it no longer has
+    analysis.export_parquet(*_products("2016-01-01", "2018-01-01", 2.0), partition_years=True)
+    assert sorted(p.name for p in partitions.iterdir()) == ["year=2016", "year=2017"]
+    hourly = analysis.query_products(data_dir=tmp_path)
+    assert hourly.index[0] == pd.Timestamp("2016-01-01") and (hourly["differential_m"] == 2.0).all()
+
+    # A re-export without partitions removes the copy, so queries read the new file
+    analysis.export_parquet(*_products("2016-06-01", "2017-01-01", 3.0))
+    assert not partitions.exists()
+    for product in ("hourly", "daily"):
+        rows = analysis.query_products("2016-01-01", "2018-01-01", product=product, data_dir=tmp_path)
+        assert rows.index[0] == pd.Timestamp("2016-06-01") and (rows["differential_m"] == 3.0).all()
@@ -0,0 +1,53 @@
+import netCDF4
+import numpy as np
+import pandas as pd
+
+import analysis
+import qc_sweep
+import synthetic_botpt
+from stations import depth_column
+
+
+def test_current_settings_row_matches_the_exported_product(outputs, monkeypatch):
+    monkeypatch.setattr(qc_sweep, "SWEEP_RESULTS_PATH", outputs / "out" / "qc_sweep.csv")
+    for seed, name in enumerate(("MJ03E", "MJ03F")):
+        paths = synthetic_botpt.write_synthetic_archive(outputs / name, name, days=160, gap_fraction=0.5)
+        # Whole-hour offsets, which survive hourly averaging as station spikes
+        with netCDF4.Dataset(paths[1], "a") as nc:
+            depth = nc.variables["botsflu_meandepth"]
+            for start in np.random.default_rng(seed).integers(0, len(depth) - 240, 5):
+                depth[start:start + 240] = depth[start:start + 240] - 10.0
+    options = ["--workers", "2", "--no-cache", "--no-catalog"]
+    analysis.main(options + ["--no-plots"])
+    qc_sweep.main(options + ["--station-windows", "12", str(analysis.STATION_SPIKE_WINDOW),
+                             "--station-thresholds", str(analysis.STATION_SPIKE_THRESHOLD), "6",
+                             "--diff-windows", str(analysis.DIFFERENTIAL_SPIKE_WINDOW),
+                             "--diff-thresholds", str(analysis.DIFFERENTIAL_SPIKE_THRESHOLD), "5"])
+
+    table = pd.read_csv(qc_sweep.SWEEP_RESULTS_PATH)
+    row = table[(table["station_window"] == analysis.STATION_SPIKE_WINDOW)
+                & (table["station_threshold"] == analysis.STATION_SPIKE_THRESHOLD)
+                & (table["diff_threshold"] == analysis.DIFFERENTIAL_SPIKE_THRESHOLD)].iloc[0]
+    hourly = pd.read_parquet(analysis.DATA_DIR / "differential_uplift_hourly.parquet")
+    daily = pd.read_parquet(analysis.DATA_DIR / "differential_uplift_daily.parquet")
+
+    # Differential spikes: the exported rows are the hours both stations kept
+    n_spikes = int(hourly["differential_m"].isna().sum())
+    assert n_spikes > 0
+    assert np.isclose(row["diff_spikes_pct"], 100 * n_spikes / len(hourly))
+
+    # Station spikes: hours the product's despiked depths lost beyond the raw gaps
+    stations = {name: outputs / name for name in ("MJ03E", "MJ03F")}
+    raw = analysis.load_stations(stations, workers=1, despike=False)
+    cleaned = analysis.load_stations(stations, workers=1)
+    for name, suffix in zip(raw, ("ref", "tgt")):
+        pd.testing.assert_series_equal(hourly[depth_column(name)], cleaned[name].reindex(hourly.index),
+                                       check_names=False, check_freq=False)
+        n_station = int(cleaned[name].isna().sum() - raw[name].isna().sum())
+        assert n_station > 0
+        assert np.isclose(row[f"{suffix}_spikes_pct"], 100 * n_station / len(raw[name]))
+
+    metrics = analysis.differential_metrics(daily)
+    assert np.isclose(row["threshold_2015_m"], metrics["threshold_2015"], rtol=0, atol=1e-12)
+    assert np.isclose(row["deflation_m"], metrics["deflation_magnitude"], rtol=0, atol=1e-12)
+    assert np.isclose(row["current_m"], metrics["current_value"], rtol=0, atol=1e-12)
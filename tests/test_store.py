@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analysis
+
+
+@pytest.mark.parametrize("overlap", analysis.OVERLAP_POLICIES)
+def test_store_and_streams_resolve_overlaps_like_hourly_chunks(tmp_path, write_nc, overlap):
+    # Two deployments overlapping by a day, with sample clocks 7 s apart
+    source = tmp_path / "MJ03E"
+    write_nc(source, "MJ03E", "2015-01-30", "2015-02-02", 1, seed=1, spike_rate=0)
+    write_nc(source, "MJ03E", "2015-02-01", "2015-02-04", 2, seed=2, offset_seconds=7, spike_rate=0)
+
+    store = tmp_path / "store"
+    analysis.convert_to_store(source, "MJ03E", store)
+    start, end = pd.Timestamp("2015-01-01"), pd.Timestamp("2015-03-01")
+    stored = list(analysis.iter_store_samples("MJ03E", start, end, store, overlap))
+    raw = list(analysis.iter_raw_samples(sorted(source.glob("*.nc")), overlap=overlap))
+
+    times = np.concatenate([t for t, _ in stored])
+    depth = np.concatenate([d for _, d in stored])
+    np.testing.assert_array_equal(times, np.concatenate([t for t, _ in raw]))
+    np.testing.assert_array_equal(depth, np.concatenate([d for _, d in raw]))
+    assert np.all(np.diff(times) >= np.timedelta64(0))
+
+    per_hour = pd.Series(1, index=pd.DatetimeIndex(times)).resample("1h").sum()
+    overlap_hours = per_hour["2015-02-01":"2015-02-01 23:00"]
+    expected = analysis.SAMPLES_PER_HOUR * (1 if overlap == "newer" else 2)
+    assert (overlap_hours == expected).all()
+    assert per_hour.drop(overlap_hours.index).max() == analysis.SAMPLES_PER_HOUR
+
+    # Every input path gives the same hourly means
+    chunked = analysis.load_station(source, "MJ03E", overlap=overlap, despike=False)
+    from_store = analysis.load_station(source, "MJ03E", store_dir=store, overlap=overlap, despike=False)
+    pd.testing.assert_series_equal(from_store, chunked, check_freq=False, check_index_type=False,
+                                   rtol=0, atol=1e-9)
+
+
+def test_files_without_deployment_numbers_rank_by_file_order():
+    files = [Path(name) for name in (
+        "deployment0003_a_15s_1.nc", "deployment0003_a_15s_2.nc", "deployment0004_a_15s_1.nc",
+        "other_15s_1.nc", "other_15s_2.nc")]
+    assert analysis._file_ranks(files) == [0, 0, 1, 2, 3]
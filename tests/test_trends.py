@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+import analysis
+import trends
+
+
+def _product(path, index, rate=0.25):
+    t = trends._years(index.to_numpy())
+    y = 0.5 + rate * t + np.random.default_rng(0).normal(0, 0.01, len(t))
+    pd.DataFrame({"differential_m": y}, index=index).to_parquet(path, row_group_size=720)
+
+
+def test_state_is_refit_when_settled_rows_change(tmp_path, monkeypatch):
+    path = tmp_path / "hourly.parquet"
+    monkeypatch.setitem(trends.PRODUCTS, "hourly", path)
+    state_dir = tmp_path / "state"
+    index = pd.date_range("2016-01-01", "2018-12-31", freq="1h")
+    half = index[:len(index) // 2]
+
+    _product(path, half)
+    trends.fit_trend(state_dir=state_dir)
+    # An appended product resumes and reads only the new rows and the unsettled tail
+    _product(path, index)
+    appended = trends.fit_trend(state_dir=state_dir)
+    assert appended["rows_read"] < len(index) - len(half) + 24 * 30
+
+    # A product re-exported with other values is read in full
+    _product(path, index, rate=0.40)
+    changed = trends.fit_trend(state_dir=state_dir)
+    assert changed["rows_read"] == len(index)
+    rebuilt = trends.fit_trend(rebuild=True, state_dir=state_dir)
+    assert np.isclose(changed["segments"][-1]["rate_m_per_yr"], rebuilt["segments"][-1]["rate_m_per_yr"])
+    assert np.isclose(changed["segments"][-1]["rate_m_per_yr"], 0.40, atol=1e-3)
+
+
+def test_latest_deployment_span_is_open_ended(tmp_path, write_nc):
+    directory = tmp_path / "MJ03F"
+    catalog = tmp_path / "catalog.sqlite"
+
+    def write(deployment, start, end):
+        write_nc(directory, "MJ03F", start, end, deployment, seed=deployment)
+        analysis.update_catalog(directory, "MJ03F", catalog)
+
+    write(1, "2015-01-01", "2015-01-03")
+    write(2, "2015-01-03", "2015-01-05")
+    spans = trends.deployment_spans(["MJ03F"], catalog)
+    assert spans == {"MJ03F_2": ("2015-01-03T00:00:00", pd.Timestamp.max.isoformat())}
+    # New files of the latest deployment leave the spec unchanged
+    write(2, "2015-01-05", "2015-01-07")
+    assert trends.deployment_spans(["MJ03F"], catalog) == spans
+
+    # A new deployment closes the previous span
+    write(3, "2015-01-07", "2015-01-08")
+    spans = trends.deployment_spans(["MJ03F"], catalog)
+    assert spans["MJ03F_2"] == ("2015-01-03T00:00:00", "2015-01-06T23:59:45")
+    assert spans["MJ03F_3"][1] == pd.Timestamp.max.isoformat()
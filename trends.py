@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+trends.py - Long-term trend and drift fits for the differential uplift products
+
+Fits a model to one column of the exported products (or a station's depth in the
+15s store) by streaming over it in chunks and accumulating the normal equations
+X'X b = X'y, so memory is bounded by one chunk whatever the length of the record.
+
+Models (time in years):
+    linear       An offset and a rate per inter-eruption segment, so each
+                 eruption is a step and the segment rates are the
+                 inter-eruption inflation rates. Optional knots add continuous
+                 rate changes within a segment (piecewise-linear inflation).
+    exponential  An offset plus an amplitude times 1 - exp(-(t - t_segment) / tau)
+                 per segment: inflation that slows as the segment ages. tau is
+                 shared by all segments and chosen from TREND_TAU_YEARS by least
+                 squares; the normal equations of every candidate are accumulated
+                 in the same pass.
+
+With --deployments, each station deployment after the first also gets an offset
+(deployment spans come from the file catalog). These are the instrument
+re-levelling steps that analysis.py leaves in the data. The latest deployment's
+span is left open-ended, so new data from it does not change the model.
+
+The accumulated normal equations are kept under outputs/cache/trends/, so a
+refresh after `analysis.py --incremental` only reads the rows that are new since
+the last fit. Rows within TREND_SETTLE_LAG of the newest row may still be
+rewritten by the next incremental export, so they are re-read on every refresh.
+The saved state also records the product rows it was built from (see
+`product_identity`); if those have changed, e.g. after a full re-export with
+other settings or a new deployment, the fit starts over.
+
+Usage:
+    uv run python trends.py [--column differential_m] [--product hourly|daily|15s|store]
+                            [--model linear|exponential] [--knots YYYY-MM-DD ...]
+                            [--deployments] [--rebuild]
+"""
+
+import argparse
+import copy
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+import analysis
+from stations import STATIONS, depth_column, differential_column
+
+# Eruption onsets: trend segments start at each one
+ERUPTIONS = ["2015-04-24"]
+
+MODELS = ["linear", "exponential"]
+
+# Candidate e-folding times for the exponential model
+TREND_TAU_YEARS = [0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0]
+
+# Rows per chunk when streaming a product
+TREND_CHUNK_ROWS = 2**18
+
+# Rows newer than (newest row - TREND_SETTLE_LAG) are kept out of the saved state. For the
+# exported products the cutoff is also no later than the day where the next incremental
+# export starts rewriting (analysis.incremental_bounds counts that in rows, so after gaps
+# it can reach further back than the lag)
+TREND_SETTLE_LAG = pd.Timedelta(hours=analysis.INCREMENTAL_REWRITE_ROWS) + pd.Timedelta(days=1)
+
+TREND_STATE_DIR = analysis.CACHE_DIR / "trends"
+TREND_OUTPUT_DIR = analysis.DATA_DIR / "trends"
+
+# Product files; the 15s level of the resolution pyramid stores `<column>_mean`
+PRODUCTS = {
+    "hourly": analysis.DATA_DIR / "differential_uplift_hourly.parquet",
+    "daily": analysis.DATA_DIR / "differential_uplift_daily.parquet",
+    "15s": analysis.PYRAMID_DIR / "differential_uplift_15s.parquet",
+    "store": analysis.STORE_DIR,
+}
+
+EPOCH = pd.Timestamp(analysis.TIME_START)
+NS_PER_YEAR = 365.25 * 86400 * 10**9
+
+
+def _years(times: np.ndarray) -> np.ndarray:
+    """Times as years since EPOCH."""
+    return (np.asarray(times, dtype="datetime64[ns]").astype("int64") - EPOCH.value) / NS_PER_YEAR
+
+
+class TrendFit:
+    """Normal equations of a trend model, accumulated one chunk at a time.
+
+    The design matrix has, per segment (EPOCH, then each eruption onset), an
+    offset column and a rate (linear) or amplitude (exponential) column, then a
+    hinge column per knot and an indicator column per deployment span.
+
+    Args:
+        model: One of MODELS
+        eruptions: Segment starts after EPOCH (eruption onsets)
+        knots: Continuous rate changes within their segment (linear model only)
+        deployments: Offset spans as {label: (start, end)} ISO timestamps
+    """
+
+    def __init__(self, model: str = "linear", eruptions: list[str] = ERUPTIONS,
+                 knots: list[str] = (), deployments: dict[str, tuple[str, str]] | None = None):
+        if model not in MODELS:
+            raise ValueError(f"unknown model {model!r}; expected one of {MODELS}")
+        if knots and model != "linear":
+            raise ValueError("knots are only supported by the linear model")
+        self.model = model
+        self.eruptions = [pd.Timestamp(e).isoformat() for e in eruptions]
+        self.knots = [pd.Timestamp(k).isoformat() for k in knots]
+        self.deployments = {label: tuple(pd.Timestamp(t).isoformat() for t in span)
+                            for label, span in (deployments or {}).items()}
+        self.taus = TREND_TAU_YEARS if model == "exponential" else [None]
+
+        self._origins = _years(np.array([EPOCH.isoformat(), *self.eruptions], dtype="datetime64[ns]"))
+        self._knots = _years(np.array(self.knots, dtype="datetime64[ns]"))
+        self._spans = np.array([span for span in self.deployments.values()],
+                               dtype="datetime64[ns]").reshape(-1, 2)
+
+        k = len(self.columns)
+        self.xtx = np.zeros((len(self.taus), k, k))
+        self.xty = np.zeros((len(self.taus), k))
+        self.yty = 0.0
+        self.n = 0
+        self.last_time = None
+        # Every row at or before this time has been accumulated, and none after it
+        self.settled_until = None
+        # Identity of the product rows accumulated so far (see `product_identity`)
+        self.source = None
+
+    @property
+    def spec(self) -> dict:
+        """Model definition; saved state is only reused for an identical spec."""
+        return {"model": self.model, "epoch": EPOCH.isoformat(), "eruptions": self.eruptions,
+                "knots": self.knots, "deployments": self.deployments, "taus": self.taus}
+
+    @property
+    def columns(self) -> list[str]:
+        """Coefficient names, in design-matrix order."""
+        slope = "rate" if self.model == "linear" else "amplitude"
+        names = [f"{kind}_{s}" for s in range(len(self.eruptions) + 1) for kind in ("offset", slope)]
+        names += [f"knot_{k[:10]}" for k in self.knots]
+        names += [f"deployment_{label}" for label in self.deployments]
+        return names
+
+    def design(self, times: np.ndarray, tau: float | None = None) -> np.ndarray:
+        """Design matrix rows for `times` (tau: e-folding time for the exponential model)."""
+        times = np.asarray(times, dtype="datetime64[ns]")
+        t = _years(times)
+        segment = np.searchsorted(self._origins[1:], t, side="right")
+        x = np.zeros((len(t), len(self.columns)))
+        for s, origin in enumerate(self._origins):
+            inside = segment == s
+            age = np.where(inside, t - origin, 0.0)
+            x[:, 2 * s] = inside
+            x[:, 2 * s + 1] = age if tau is None else -np.expm1(-age / tau)
+        col = 2 * len(self._origins)
+        # Hinges bend the rate within the knot's own segment only
+        knot_segments = np.searchsorted(self._origins[1:], self._knots, side="right")
+        for j, (knot, s) in enumerate(zip(self._knots, knot_segments)):
+            x[:, col + j] = np.where(segment == s, np.maximum(t - knot, 0.0), 0.0)
+        col += len(self._knots)
+        for j, (start, end) in enumerate(self._spans):
+            x[:, col + j] = (times >= start) & (times <= end)
+        return x
+
+    def accumulate(self, times: np.ndarray, values: np.ndarray):
+        """Add a chunk of (times, values) to the normal equations; NaN values are skipped."""
+        valid = np.isfinite(values)
+        times, y = np.asarray(times)[valid], np.asarray(values, dtype="float64")[valid]
+        if len(y) == 0:
+            return
+        for i, tau in enumerate(self.taus):
+            x = self.design(times, tau)
+            self.xtx[i] += x.T @ x
+            self.xty[i] += x.T @ y
+        self.yty += float(y @ y)
+        self.n += len(y)
+        last = pd.Timestamp(times.max())
+        self.last_time = last if self.last_time is None else max(self.last_time, last)
+
+    def solve(self) -> dict:
+        """Least-squares coefficients of the best candidate model.
+
+        Rank-deficient systems (e.g. a segment without data, or a deployment
+        boundary that coincides with an eruption) get the minimum-norm solution.
+
+        Returns:
+            Dict with the model, tau (exponential), row count, RMS residual, all
+            coefficients, a summary per segment (offset, rate or amplitude and the
+            rate at the segment's end), the knot rate changes and deployment offsets
+        """
+        if self.n == 0:
+            raise ValueError("no data accumulated")
+        best = None
+        for i, tau in enumerate(self.taus):
+            beta = np.linalg.lstsq(self.xtx[i], self.xty[i], rcond=None)[0]
+            sse = self.yty - 2 * beta @ self.xty[i] + beta @ self.xtx[i] @ beta
+            if best is None or sse < best[2]:
+                best = (i, beta, sse)
+        i, beta, sse = best
+        tau = self.taus[i]
+
+        starts = [EPOCH.isoformat(), *self.eruptions]
+        last = _years(np.array([self.last_time.to_datetime64()]))[0]
+        segments = []
+        for s, origin in enumerate(self._origins):
+            n_rows = int(round(self.xtx[i][2 * s, 2 * s]))
+            end = self._origins[s + 1] if s + 1 < len(self._origins) else last
+            segment = {"start": starts[s], "end": starts[s + 1] if s + 1 < len(starts) else None,
+                       "n": n_rows, "offset_m": float(beta[2 * s])}
+            if n_rows == 0:
+                segment["offset_m"] = None
+            elif tau is None:
+                inside = [j for j, knot in enumerate(self._knots) if origin <= knot < end]
+                segment["rate_m_per_yr"] = float(beta[2 * s + 1])
+                segment["end_rate_m_per_yr"] = float(beta[2 * s + 1]
+                                                     + sum(beta[2 * len(self._origins) + j] for j in inside))
+            else:
+                amplitude = float(beta[2 * s + 1])
+                segment["amplitude_m"] = amplitude
+                segment["end_rate_m_per_yr"] = amplitude / tau * float(np.exp(-(end - origin) / tau))
+            segments.append(segment)
+
+        col = 2 * len(self._origins)
+        return {
+            "model": self.model,
+            "tau_years": tau,
+            "n": self.n,
+            "first_segment_start": starts[0],
+            "last_time": self.last_time.isoformat(),
+            "rmse_m": float(np.sqrt(max(sse, 0.0) / self.n)),
+            "coefficients": dict(zip(self.columns, map(float, beta))),
+            "segments": segments,
+            "knot_rate_changes_m_per_yr": {knot: float(beta[col + j]) for j, knot in enumerate(self.knots)},
+            "deployment_offsets_m": {label: float(beta[col + len(self.knots) + j])
+                                     for j, label in enumerate(self.deployments)},
+        }
+
+    def predict(self, times: np.ndarray, result: dict, offsets_only: bool = False) -> np.ndarray:
+        """Fitted values at `times` from a `solve` result.
+
+        With `offsets_only`, only the deployment offsets are returned; subtracting
+        them from the data removes the re-levelling steps (drift correction).
+        """
+        beta = np.array([result["coefficients"][name] for name in self.columns])
+        if offsets_only:
+            keep = np.array([name.startswith("deployment_") for name in self.columns])
+            beta = np.where(keep, beta, 0.0)
+        return self.design(times, result["tau_years"]) @ beta
+
+    def save(self, path: Path):
+        """Write the accumulated normal equations, the spec and the source they belong to."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, spec=json.dumps(self.spec), source=json.dumps(self.source),
+                     xtx=self.xtx, xty=self.xty, yty=self.yty, n=self.n,
+                     last_time=-1 if self.last_time is None else self.last_time.value,
+                     settled_until=-1 if self.settled_until is None else self.settled_until.value)
+
+    def load(self, path: Path) -> bool:
+        """Restore saved normal equations if they were built for the same spec.
+
+        The caller checks `source` against the product before resuming.
+        """
+        if not path.exists():
+            return False
+        with np.load(path) as state:
+            if "source" not in state or json.loads(str(state["spec"])) != json.loads(json.dumps(self.spec)):
+                return False
+            self.xtx, self.xty = state["xtx"], state["xty"]
+            self.yty, self.n = float(state["yty"]), int(state["n"])
+            self.last_time = None if state["last_time"] < 0 else pd.Timestamp(int(state["last_time"]))
+            self.settled_until = None if state["settled_until"] < 0 else pd.Timestamp(int(state["settled_until"]))
+            self.source = json.loads(str(state["source"]))
+        return True
+
+
+def column_stations(column: str) -> list[str]:
+    """Stations whose data make up a product column (one for depths, two for differentials)."""
+    for name in STATIONS:
+        if column == depth_column(name):
+            return [name]
+    for reference in STATIONS:
+        for target in STATIONS:
+            if reference != target and column == differential_column(reference, target):
+                return [reference, target]
+    raise ValueError(f"unknown product column {column!r}")
+
+
+def deployment_spans(station_names: list[str], catalog_path: Path = analysis.CATALOG_PATH
+                     ) -> dict[str, tuple[str, str]]:
+    """Time span of each station deployment after the first, from the file catalog.
+
+    The first deployment of each station is the reference, so the offsets are
+    relative to it. The latest deployment is still recording, so its span is
+    open-ended; its end would otherwise move with every new file and change the
+    model spec, and with it the saved state, on every refresh.
+    """
+    if not catalog_path.exists():
+        return {}
+    spans = {}
+    with analysis._connect_catalog(catalog_path) as conn:
+        for name in station_names:
+            rows = conn.execute(
+                "SELECT deployment, MIN(first_time), MAX(last_time) FROM files "
+                "WHERE station = ? AND deployment IS NOT NULL AND n_samples > 0 "
+                "GROUP BY deployment ORDER BY deployment", (name,)).fetchall()
+            for i, (deployment, first, last) in enumerate(rows[1:], start=1):
+                end = pd.Timestamp.max if i == len(rows) - 1 else pd.Timestamp(last)
+                spans[f"{name}_{deployment}"] = (pd.Timestamp(first).isoformat(), end.isoformat())
+    return spans
+
+
+def product_identity(column: str, product: str, settled_until: pd.Timestamp | None) -> list:
+    """What the rows at or before `settled_until` were read from, for checking saved state.
+
+    For the Parquet products: the file and, for each row group that ends at or
+    before `settled_until`, its row count and index and value statistics. These
+    groups are month- or year-aligned, so an incremental export leaves them as
+    they were, while a full re-export that changes their data does not. For the
+    store: the name, size and modification time of each part in the months
+    that end at or before `settled_until`.
+    """
+    if settled_until is None:
+        return []
+    if product == "store":
+        (name,) = column_stations(column)
+        station_dir = PRODUCTS["store"] / f"station={name}"
+        parts = []
+        for month_dir in sorted(station_dir.glob("year=*/month=*")):
+            year = int(month_dir.parent.name.split("=")[1])
+            month = int(month_dir.name.split("=")[1])
+            if pd.Timestamp(year=year, month=month, day=1) + pd.offsets.MonthBegin(1) > settled_until:
+                continue
+            for part in sorted(month_dir.glob("*.parquet")):
+                stat = part.stat()
+                parts.append([str(part.relative_to(station_dir)), stat.st_size, stat.st_mtime_ns])
+        return [str(station_dir.resolve()), parts]
+
+    path = PRODUCTS[product]
+    pf = pq.ParquetFile(path)
+    index_col = analysis._index_column(pf.schema_arrow)
+    value_col = f"{column}_mean" if product == "15s" else column
+    positions = [pf.schema_arrow.get_field_index(c) for c in (index_col, value_col)]
+    groups = []
+    for i in range(pf.metadata.num_row_groups):
+        row_group = pf.metadata.row_group(i)
+        stats = [row_group.column(position).statistics for position in positions]
+        if stats[0] is None or not stats[0].has_min_max or pd.Timestamp(stats[0].max) > settled_until:
+            continue
+        summary = [row_group.num_rows]
+        for stat in stats:
+            summary += [stat.null_count, str(stat.min), str(stat.max)] if stat is not None and stat.has_min_max \
+                else [None, None, None]
+        groups.append(summary)
+    return [str(path.resolve()), groups]
+
+
+def product_chunks(column: str, product: str, after: pd.Timestamp | None = None
+                   ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield (times, values) chunks of a product column, in time order, newer than `after`.
+
+    Parquet row groups that end at or before `after` are skipped using their
+    statistics. The "store" product streams a station's 15s depth month by month.
+    """
+    if product == "store":
+        (name,) = column_stations(column)
+        start, end = analysis._time_bounds()
+        if after is not None:
+            start = max(start, after + pd.Timedelta(1, "ns"))
+        yield from analysis.iter_store_samples(name, start, end, PRODUCTS["store"])
+        return
+
+    path = PRODUCTS[product]
+    pf = pq.ParquetFile(path)
+    index_col = analysis._index_column(pf.schema_arrow)
+    value_col = f"{column}_mean" if product == "15s" else column
+    row_groups = list(range(pf.metadata.num_row_groups))
+    if after is not None:
+        position = pf.schema_arrow.get_field_index(index_col)
+        keep = []
+        for i in row_groups:
+            stats = pf.metadata.row_group(i).column(position).statistics
+            if stats is None or not stats.has_min_max or pd.Timestamp(stats.max) > after:
+                keep.append(i)
+        row_groups = keep
+    if not row_groups:
+        return
+
+    for batch in pf.iter_batches(batch_size=TREND_CHUNK_ROWS, row_groups=row_groups,
+                                 columns=[index_col, value_col]):
+        times = batch.column(0).to_numpy().astype("datetime64[ns]")
+        values = batch.column(1).to_numpy(zero_copy_only=False).astype("float64")
+        if after is not None:
+            newer = times > after.to_datetime64()
+            times, values = times[newer], values[newer]
+        if len(times):
+            yield times, values
+
+
+def fit_trend(column: str = "differential_m", product: str = "hourly", model: str = "linear",
+              knots: list[str] = (), deployments: bool = False, rebuild: bool = False,
+              state_dir: Path = TREND_STATE_DIR) -> dict:
+    """Fit a trend model to a product column, reusing the saved normal equations.
+
+    Only rows newer than the saved state are read. Rows newer than the newest
+    row minus TREND_SETTLE_LAG, or in the span the next incremental export will
+    rewrite, are added for this fit but not saved, so they are read again next time.
+    Saved state whose rows no longer match the product (see `product_identity`)
+    is discarded.
+
+    Args:
+        column: Product column, e.g. "differential_m" or "depth_mj03f_m"
+        product: One of PRODUCTS
+        model: One of MODELS
+        knots: Extra rate-change dates (linear model)
+        deployments: Fit an offset per deployment after the first of each station
+        rebuild: Ignore saved state and read the whole product
+        state_dir: Directory of saved normal equations
+
+    Returns:
+        The `TrendFit.solve` result, plus the column, product and rows read
+    """
+    spans = deployment_spans(column_stations(column)) if deployments else {}
+    fit = TrendFit(model, ERUPTIONS, knots, spans)
+    state_path = state_dir / f"{column}_{product}_{model}.npz"
+    resumed = not rebuild and fit.load(state_path)
+    if resumed and fit.source != json.loads(json.dumps(product_identity(column, product, fit.settled_until))):
+        print("Product has changed since the saved state was built; refitting")
+        fit = TrendFit(model, ERUPTIONS, knots, spans)
+        resumed = False
+    if resumed:
+        print(f"Resuming from saved state ({fit.n} rows up to {fit.settled_until})")
+
+    # Rows are settled once they are TREND_SETTLE_LAG older than the newest row read, and
+    # before the first day the next incremental export may rewrite
+    settle_before = pd.Timestamp.max
+    if product in ("hourly", "daily"):
+        bounds = analysis.incremental_bounds(PRODUCTS["hourly"])
+        if bounds is not None:
+            settle_before = bounds[0].floor("1D")
+    pending_times = np.array([], dtype="datetime64[ns]")
+    pending_values = np.array([], dtype="float64")
+    n_read = 0
+    for times, values in product_chunks(column, product, fit.settled_until):
+        n_read += len(times)
+        pending_times = np.concatenate([pending_times, times])
+        pending_values = np.concatenate([pending_values, values])
+        cutoff = min(pd.Timestamp(times[-1]) - TREND_SETTLE_LAG, settle_before - pd.Timedelta(1, "ns"))
+        settled = pending_times <= cutoff.to_datetime64()
+        fit.accumulate(pending_times[settled], pending_values[settled])
+        if settled.any():
+            fit.settled_until = cutoff
+        pending_times, pending_values = pending_times[~settled], pending_values[~settled]
+    fit.source = product_identity(column, product, fit.settled_until)
+    fit.save(state_path)
+
+    current = copy.deepcopy(fit)
+    current.accumulate(pending_times, pending_values)
+    result = current.solve()
+    result.update({"column": column, "product": product, "rows_read": n_read})
+    return result
+
+
+def save_result(result: dict, output_dir: Path = TREND_OUTPUT_DIR) -> Path:
+    """Write a fit result as JSON."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"trend_{result['column']}_{result['product']}_{result['model']}.json"
+    path.write_text(json.dumps(result, indent=2))
+    return path
+
+
+def print_result(result: dict):
+    """Print the segment rates and deployment offsets of a fit."""
+    tau = "" if result["tau_years"] is None else f", tau {result['tau_years']:g} yr"
+    print(f"{result['column']} ({result['product']}, {result['model']}{tau}): "
+          f"{result['n']} rows, RMS residual {100 * result['rmse_m']:.2f} cm")
+    for segment in result["segments"]:
+        if segment["n"] == 0:
+            continue
+        span = f"{segment['start'][:10]} to {(segment['end'] or result['last_time'])[:10]}"
+        if result["tau_years"] is None:
+            print(f"  {span}: {100 * segment['rate_m_per_yr']:+.2f} cm/yr "
+                  f"(at end {100 * segment['end_rate_m_per_yr']:+.2f} cm/yr)")
+        else:
+            print(f"  {span}: amplitude {100 * segment['amplitude_m']:+.2f} cm, "
+                  f"rate at end {100 * segment['end_rate_m_per_yr']:+.2f} cm/yr")
+    for knot, change in result["knot_rate_changes_m_per_yr"].items():
+        print(f"  rate change at {knot[:10]}: {100 * change:+.2f} cm/yr")
+    for label, offset in result["deployment_offsets_m"].items():
+        print(f"  deployment {label} offset: {100 * offset:+.2f} cm")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Long-term trend and drift fits for the uplift products")
+    parser.add_argument("--column", default="differential_m", help="product column to fit (default: differential_m)")
+    parser.add_argument("--product", choices=list(PRODUCTS), default="hourly",
+                        help="hourly or daily export, the pyramid's 15s level, or a station's depth "
+                             "from the 15s store (default: hourly)")
+    parser.add_argument("--model", choices=MODELS, default="linear", help="trend model (default: linear)")
+    parser.add_argument("--knots", nargs="+", default=[], metavar="YYYY-MM-DD",
+                        help="continuous rate changes for the linear model")
+    parser.add_argument("--deployments", action="store_true",
+                        help="fit an offset for each deployment after the first (from the file catalog)")
+    parser.add_argument("--rebuild", action="store_true", help="ignore saved state and read the whole product")
+    args = parser.parse_args(argv)
+
+    result = fit_trend(args.column, args.product, args.model, args.knots, args.deployments, args.rebuild)
+    print_result(result)
+    print(f"Saved: {save_result(result)}")
+
+
+if __name__ == "__main__":
+    main()